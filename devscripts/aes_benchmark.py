@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import random
+import time
+
+from yt_dlp.aes import _cbc_decrypt_bytes, _ctr_bytes
+from yt_dlp.dependencies import Cryptodome
+
+SIZE = 1024 * 1024
+
+
+def benchmark(name, native, reference=None):
+    start = time.perf_counter()
+    native_result = native()
+    result = f'{name}: native {SIZE / 1024 / 1024 / (time.perf_counter() - start):.2f} MiB/s'
+    if reference:
+        start = time.perf_counter()
+        reference_result = reference()
+        result += f', pycryptodomex {SIZE / 1024 / 1024 / (time.perf_counter() - start):.2f} MiB/s'
+        assert native_result == reference_result, f'{name}: results differ'
+    print(result)
+
+
+data, key, iv = random.randbytes(SIZE), random.randbytes(16), random.randbytes(16)
+
+benchmark(
+    'AES-128-CBC decrypt', lambda: _cbc_decrypt_bytes(data, key, iv),
+    Cryptodome.AES and (lambda: Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv).decrypt(data)))
+benchmark(
+    'AES-128-CTR', lambda: _ctr_bytes(data, key, iv),
+    Cryptodome.AES and (lambda: Cryptodome.AES.new(
+        key, Cryptodome.AES.MODE_CTR, nonce=b'', initial_value=iv).encrypt(data)))
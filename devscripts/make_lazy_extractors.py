@@ -11,6 +11,7 @@
 
 from devscripts.utils import get_filename_args, read_file, write_file
 from yt_dlp.extractor import import_extractors
+from yt_dlp.extractor._dispatch import extractor_host_labels
 from yt_dlp.extractor.common import InfoExtractor, SearchInfoExtractor
 from yt_dlp.globals import extractors
 
@@ -69,13 +70,16 @@ def extra_ie_code(ie, base=None):
 
 
 def build_ies(ies, bases, attr_base):
-    names = []
+    names, dispatch_hosts = [], {}
     for ie in sort_ies(ies, bases):
         yield build_lazy_ie(ie, ie.__name__, attr_base)
         if ie in ies:
             names.append(ie.__name__)
+            dispatch_hosts[ie.__name__] = extractor_host_labels(ie)
 
     yield '\n_CLASS_LOOKUP = {%s}' % ', '.join(f'{name!r}: {name}' for name in names)
+    # Used by yt_dlp/extractor/_dispatch.py to narrow down the extractors to try for a URL
+    yield '\n_DISPATCH_HOSTS = {%s}' % ', '.join(f'{name!r}: {hosts!r}' for name, hosts in dispatch_hosts.items())
 
 
 def sort_ies(ies, ignored_bases):
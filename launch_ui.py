@@ -60,7 +60,8 @@ def main():
     
     try:
         # Import and run the server
-        from server import app
+        from server import app, resume_interrupted_jobs
+        resume_interrupted_jobs()
         app.run(debug=False, host='0.0.0.0', port=5000)
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")
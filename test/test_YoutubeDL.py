@@ -14,6 +14,8 @@
 import contextlib
 import copy
 import json
+import threading
+import time
 
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from yt_dlp import YoutubeDL
@@ -27,6 +29,7 @@
     int_or_none,
     match_filter_func,
 )
+from yt_dlp.utils.outtmpl import OutputTemplate
 from yt_dlp.utils.traversal import traverse_obj
 
 TEST_URL = 'http://localhost/sample.mp4'
@@ -951,6 +954,16 @@ def gen():
         test('%(title3)s', ('foo/bar\\test', 'foo⧸bar⧹test'))
         test('folder/%(title3)s', ('folder/foo/bar\\test', f'folder{os.path.sep}foo⧸bar⧹test'))
 
+    def test_compiled_outtmpl(self):
+        ydl = YoutubeDL({'outtmpl_na_placeholder': 'none'})
+        outtmpl = '%(id)s-%(title,fulltitle|x)s-%(duration+5)d-%(tags)l.%(ext)s'
+        compiled = OutputTemplate.compile(outtmpl)
+        self.assertIs(OutputTemplate.compile(outtmpl), compiled)
+        self.assertEqual(ydl.evaluate_outtmpl(outtmpl, {'id': 'a', 'ext': 'mp4', 'duration': 1}), 'a-x-6-none.mp4')
+        self.assertEqual(
+            ydl.evaluate_outtmpl(outtmpl, {'id': 'b', 'ext': 'mkv', 'fulltitle': 'T', 'tags': ['c', 'd']}),
+            'b-T-none-c, d.mkv')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -1235,6 +1248,90 @@ def _real_extract(self, url):
         self.assertEqual(downloaded['extractor'], 'testex')
         self.assertEqual(downloaded['extractor_key'], 'TestEx')
 
+    def test_info_dict_cache(self):
+        from yt_dlp.cache import InfoDictCache
+
+        ydl = YDL({'info_dict_cache': InfoDictCache()})
+        calls = []
+
+        class CachedIE(InfoExtractor):
+            _VALID_URL = r'cached:(?P<id>\w+)'
+
+            def _real_extract(self, url):
+                calls.append(url)
+                return _make_result([{'url': TEST_URL}], id=self._match_id(url))
+
+        ydl.add_info_extractor(CachedIE(ydl))
+        first = ydl.extract_info('cached:a', download=False)
+        second = ydl.extract_info('cached:a', download=False)
+        ydl.extract_info('cached:b', download=False)
+        self.assertEqual(calls, ['cached:a', 'cached:b'])
+        self.assertEqual(first['id'], second['id'])
+        self.assertEqual(first['url'], second['url'])
+
+        # The same video with a different URL or different options is extracted again
+        ydl.extract_info('cached:a?t=10', download=False)
+        ydl.params['extractor_args'] = {'cachedie': {'foo': ['bar']}}
+        ydl.extract_info('cached:a', download=False)
+        self.assertEqual(calls, ['cached:a', 'cached:b', 'cached:a?t=10', 'cached:a'])
+
+        # An instance that only differs in how it downloads reuses the results
+        cache = InfoDictCache()
+        analyze = YDL({'info_dict_cache': cache, 'extract_flat': 'in_playlist'})
+        analyze.add_info_extractor(CachedIE(analyze))
+        analyze.extract_info('cached:c', download=False, process=False)
+        download = YDL({
+            'info_dict_cache': cache, 'format': 'worst', 'outtmpl': '%(id)s.%(ext)s',
+            'progress_hooks': [lambda _: None]})
+        download.add_info_extractor(CachedIE(download))
+        download.extract_info('cached:c')
+        self.assertEqual(calls.count('cached:c'), 1)
+        self.assertEqual(download.downloaded_info_dicts[0]['id'], 'c')
+
+    def test_concurrent_playlist_entries(self):
+        ydl = YDL({'concurrent_playlist_entries': 3, 'ignoreerrors': True})
+        ydl.trouble = lambda *args, **kwargs: None
+        threads = {}
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+            _RETURN_TYPE = 'video'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                threads[video_id] = threading.current_thread().name
+                # Later entries finish extracting first
+                time.sleep(0.05 * (6 - int(video_id)))
+                if video_id == '3':
+                    raise ExtractorError('foo', expected=True)
+                return _make_result([{'url': TEST_URL}], id=video_id)
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(
+                    self.url_result(f'video:{n}', VideoIE) for n in range(1, 7))
+
+        ydl.add_info_extractor(VideoIE(ydl))
+        ydl.add_info_extractor(PlaylistIE(ydl))
+        ydl.extract_info('playlist:')
+
+        downloaded = ydl.downloaded_info_dicts
+        self.assertEqual([info['id'] for info in downloaded], ['1', '2', '4', '5', '6'])
+        self.assertEqual([info['playlist_index'] for info in downloaded], [1, 2, 4, 5, 6])
+        self.assertEqual([info['playlist_autonumber'] for info in downloaded], [1, 2, 4, 5, 6])
+        self.assertTrue(all(name.startswith('playlist-entry') for name in threads.values()))
+        self.assertEqual(len(threads), 6)
+
+        # Entries rejected by the match filter are not extracted
+        threads.clear()
+        ydl.params['match_filter'] = match_filter_func('playlist_index != 2')
+        ydl.downloaded_info_dicts = []
+        ydl.extract_info('playlist:')
+        self.assertEqual([info['id'] for info in ydl.downloaded_info_dicts], ['1', '4', '5', '6'])
+        self.assertNotIn('2', threads)
+
     # Test case for https://github.com/ytdl-org/youtube-dl/issues/27064
     def test_ignoreerrors_for_playlist_with_url_transparent_iterable_entries(self):
 
@@ -9,6 +9,7 @@
 
 
 import base64
+import random
 
 from yt_dlp.aes import (
     aes_cbc_decrypt,
@@ -158,6 +159,34 @@ def test_pad_block(self):
         for mode in ('pkcs7', 'iso7816', 'whitespace', 'zero'):
             self.assertEqual(pad_block(block, mode), block, mode)
 
+    def test_bulk_modes(self):
+        rng = random.Random(0)
+        for key_size in (16, 24, 32):
+            key = [rng.randrange(256) for _ in range(key_size)]
+            iv = [rng.randrange(256) for _ in range(16)]
+            data = [rng.randrange(256) for _ in range(5 * 16 + 3)]
+            expanded_key = key_expansion(key)
+
+            blocks = [data[i:i + 16] for i in range(0, len(data), 16)]
+            blocks[-1] += [0] * (16 - len(blocks[-1]))
+            decrypted, previous = [], iv
+            for block in blocks:
+                decrypted += [x ^ y for x, y in zip(aes_decrypt(block, expanded_key), previous)]
+                previous = block
+            self.assertEqual(aes_cbc_decrypt(data, key, iv), decrypted[:len(data)], key_size)
+            self.assertEqual(bytes(aes_cbc_decrypt(aes_cbc_encrypt(data, key, iv), key, iv))[:len(data)], bytes(data))
+
+            counter = int.from_bytes(bytes(iv), 'big')
+            key_stream = []
+            for i in range(len(blocks)):
+                key_stream += aes_encrypt(list((counter + i).to_bytes(16, 'big')), expanded_key)
+            self.assertEqual(aes_ctr_encrypt(data, key, iv), [x ^ y for x, y in zip(data, key_stream)], key_size)
+
+        # The counter wraps around
+        self.assertEqual(
+            aes_ctr_decrypt(list(range(32)), self.key, [0xFF] * 16)[16:],
+            [x ^ y for x, y in zip(range(16, 32), aes_encrypt([0] * 16, key_expansion(self.key)))])
+
 
 if __name__ == '__main__':
     unittest.main()
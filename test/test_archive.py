@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import shutil
+from unittest.mock import patch
+
+from test.helper import FakeYDL
+from yt_dlp.archive import (
+    SetArchive,
+    SQLiteArchive,
+    TextArchive,
+    is_sqlite_archive,
+    open_download_archive,
+)
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'archive_test')
+
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        self.tearDown()
+        os.makedirs(TEST_DIR)
+
+    def tearDown(self):
+        if os.path.exists(TEST_DIR):
+            shutil.rmtree(TEST_DIR)
+
+    def test_open(self):
+        self.assertIsNone(open_download_archive(None))
+        ids = {'youtube a'}
+        archive = open_download_archive(ids)
+        self.assertIsInstance(archive, SetArchive)
+        archive.add('youtube b')
+        self.assertEqual(ids, {'youtube a', 'youtube b'})
+        self.assertIs(open_download_archive(archive), archive)
+        self.assertIsInstance(open_download_archive(os.path.join(TEST_DIR, 'a.txt')), TextArchive)
+        sqlite_archive = open_download_archive(os.path.join(TEST_DIR, 'a.sqlite'))
+        self.assertIsInstance(sqlite_archive, SQLiteArchive)
+        sqlite_archive.close()
+
+    def test_text_archive(self):
+        fn = os.path.join(TEST_DIR, 'archive.txt')
+        with open(fn, 'w', encoding='utf-8') as f:
+            f.write('youtube a\nyoutube b\n')
+        archive = TextArchive(fn)
+        self.assertIn('youtube a', archive)
+        self.assertNotIn('youtube c', archive)
+        archive.add('youtube c')
+        self.assertIn('youtube c', archive)
+        with open(fn, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'youtube a\nyoutube b\nyoutube c\n')
+
+    def test_sqlite_archive(self):
+        fn = os.path.join(TEST_DIR, 'archive.sqlite')
+        archive = SQLiteArchive(fn)
+        other = SQLiteArchive(fn)
+        archive.add('youtube a')
+        # Entries are visible to other processes as soon as they are added
+        self.assertIn('youtube a', archive)
+        self.assertIn('youtube a', other)
+        archive.add('youtube b')
+        archive.close()
+        self.assertEqual(list(other), ['youtube a', 'youtube b'])
+        other.close()
+
+    def test_detect_sqlite(self):
+        text_fn = os.path.join(TEST_DIR, 'archive.db')
+        with open(text_fn, 'w', encoding='utf-8') as f:
+            f.write('youtube a\n')
+        self.assertFalse(is_sqlite_archive(text_fn))
+        archive = open_download_archive(text_fn)
+        self.assertIsInstance(archive, TextArchive)
+        self.assertIn('youtube a', archive)
+
+        sqlite_fn = os.path.join(TEST_DIR, 'archive.txt')
+        SQLiteArchive(sqlite_fn).close()
+        self.assertTrue(is_sqlite_archive(sqlite_fn))
+        archive = open_download_archive(sqlite_fn)
+        self.assertIsInstance(archive, SQLiteArchive)
+        archive.close()
+
+        self.assertTrue(is_sqlite_archive(os.path.join(TEST_DIR, 'new.sqlite3')))
+        self.assertFalse(is_sqlite_archive(os.path.join(TEST_DIR, 'new.txt')))
+
+    @patch('yt_dlp.archive.sqlite3', None)
+    def test_no_sqlite(self):
+        self.assertIsInstance(open_download_archive(os.path.join(TEST_DIR, 'a.txt')), TextArchive)
+        with self.assertRaisesRegex(ImportError, 'sqlite3 is not available'):
+            open_download_archive(os.path.join(TEST_DIR, 'a.sqlite'))
+
+    def test_text_import_export(self):
+        text_fn = os.path.join(TEST_DIR, 'archive.txt')
+        with open(text_fn, 'w', encoding='utf-8') as f:
+            f.write('youtube b\n\nyoutube a\nyoutube b\n')
+        archive = SQLiteArchive(os.path.join(TEST_DIR, 'archive.db'))
+        archive.import_text(text_fn)
+        self.assertIn('youtube a', archive)
+        self.assertIn('youtube b', archive)
+
+        exported_fn = os.path.join(TEST_DIR, 'exported.txt')
+        archive.export_text(exported_fn)
+        archive.close()
+        with open(exported_fn, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'youtube a\nyoutube b\n')
+
+    def test_youtubedl_archive(self):
+        fn = os.path.join(TEST_DIR, 'archive.sqlite')
+        info = {'id': 'a', 'extractor_key': 'Youtube'}
+        with FakeYDL({'download_archive': fn}) as ydl:
+            self.assertFalse(ydl.in_download_archive(info))
+            ydl.record_download_archive(info)
+            self.assertTrue(ydl.in_download_archive(info))
+        with FakeYDL({'download_archive': fn}) as ydl:
+            self.assertTrue(ydl.in_download_archive(info))
+            self.assertTrue(ydl.in_download_archive({'id': 'b', '_old_archive_ids': ['youtube a']}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,9 +9,11 @@
 
 
 import shutil
+import time
 
 from test.helper import FakeYDL
-from yt_dlp.cache import Cache
+from yt_dlp.cache import Cache, InfoDictCache, ResultCache
+from yt_dlp.version import __version__
 
 
 def _is_empty(d):
@@ -52,6 +54,102 @@ def test_cache(self):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def test_result_cache(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+        results = Cache(ydl).results('test_results')
+        self.assertIsNone(results.get('player', 'a'))
+        results.store('player', 'a', 'A')
+        self.assertEqual(results.get('player', 'a'), 'A')
+        self.assertIsNone(results.get('other', 'a'))
+
+        # Another process sees the results, and what is appended later
+        other = ResultCache(Cache(ydl), 'test_results')
+        self.assertEqual(other.get('player', 'a'), 'A')
+        results.store('player', 'b', 'B')
+        self.assertEqual(other.get('player', 'b'), 'B')
+
+        self.assertIsNone(ResultCache(Cache(FakeYDL({'cachedir': False})), 'test_results').get('player', 'a'))
+
+        # Results written by older versions are ignored
+        fn = Cache(ydl)._get_cache_fn('test_results', 'player', 'jsonl')
+        with open(fn, 'a') as f:
+            f.write(f'["c", "C", "2022.01.01"]\n["d", "D"]\n["e", "E", "{__version__}"]\n')
+        other = ResultCache(Cache(ydl), 'test_results', min_ver='2025.03.31')
+        self.assertEqual(other.get('player', 'a'), 'A')
+        self.assertIsNone(other.get('player', 'c'))
+        self.assertIsNone(other.get('player', 'd'))
+        self.assertEqual(other.get('player', 'e'), 'E')
+
+    def test_result_cache_eviction(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+        results = ResultCache(Cache(ydl), 'test_results', max_entries=2, max_bytes=200, max_files=2)
+        for i in range(20):
+            results.store('player', f'{i:02d}', 'x' * 10)
+        self.assertEqual(len(results._entries), 2)
+        fn = Cache(ydl)._get_cache_fn('test_results', 'player', 'jsonl')
+        self.assertLessEqual(os.path.getsize(fn), 200)
+        # The newest entries survive compaction
+        other = ResultCache(Cache(ydl), 'test_results')
+        self.assertEqual(other.get('player', '19'), 'x' * 10)
+        self.assertIsNone(other.get('player', '00'))
+
+        results.store('player2', 'a', 'A')
+        time.sleep(0.01)
+        results.store('player3', 'a', 'A')
+        self.assertEqual(sorted(os.listdir(os.path.dirname(fn))), [
+            'player2.jsonl', 'player2.jsonl.lock', 'player3.jsonl', 'player3.jsonl.lock'])
+        self.assertFalse(os.path.exists(fn))
+
+
+class TestInfoDictCache(unittest.TestCase):
+    def test_store_and_copy(self):
+        cache = InfoDictCache()
+        info = {'id': 'x', 'formats': [{'url': 'http://a'}]}
+        self.assertIsNone(cache.get('Test', 'x'))
+        cache.store('Test', 'x', info)
+        cached = cache.get('Test', 'x')
+        self.assertEqual(cached, info)
+        cached['formats'].append({'url': 'http://b'})
+        self.assertEqual(cache.get('Test', 'x'), info)
+        self.assertIsNone(cache.get('Other', 'x'))
+        cache.store('Test', 'y', {'id': 'y', 'entries': (i for i in range(3))})
+        self.assertIsNone(cache.get('Test', 'y'))
+
+    def test_lru(self):
+        cache = InfoDictCache(max_entries=2)
+        cache.store('Test', 'a', {'id': 'a'})
+        cache.store('Test', 'b', {'id': 'b'})
+        cache.get('Test', 'a')
+        cache.store('Test', 'c', {'id': 'c'})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('Test', 'b'))
+        self.assertEqual(cache.get('Test', 'a'), {'id': 'a'})
+
+        cache = InfoDictCache(max_bytes=300)
+        cache.store('Test', 'a', {'id': 'a', 'data': 'x' * 200})
+        cache.store('Test', 'b', {'id': 'b', 'data': 'x' * 200})
+        self.assertIsNone(cache.get('Test', 'a'))
+        self.assertIsNotNone(cache.get('Test', 'b'))
+
+    def test_expiry(self):
+        cache = InfoDictCache(ttl=0)
+        cache.store('Test', 'a', {'id': 'a'})
+        self.assertIsNone(cache.get('Test', 'a'))
+
+        now = int(time.time())
+        cache = InfoDictCache(ttl=3600, expiry_margin=60)
+        cache.store('Test', 'a', {'id': 'a', 'formats': [
+            {'url': f'https://x.googlevideo.com/videoplayback?expire={now + 30}&id=a'}]})
+        self.assertIsNone(cache.get('Test', 'a'))
+        cache.store('Test', 'b', {'id': 'b', 'formats': [
+            {'manifest_url': f'https://x.googlevideo.com/api/manifest/hls/expire/{now + 600}/id/b'}]})
+        self.assertIsNotNone(cache.get('Test', 'b'))
+        self.assertLessEqual(cache._entries[('Test', 'b')][0], now + 540)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import glob
+import http.server
+import threading
+import time
+from unittest.mock import patch
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.hls import HlsFD
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+FRAGMENT_COUNT = 5
+FRAGMENT_SIZE = 1024
+
+
+def fragment_content(index):
+    return bytes([index]) * FRAGMENT_SIZE
+
+
+class FragmentTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    # Paths whose first request stalls
+    stalled = set()
+    stall_time = 5
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path in self.stalled:
+            self.stalled.discard(self.path)
+            time.sleep(self.stall_time)
+        index = int(self.path.lstrip('/'))
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp2t')
+        self.send_header('Content-Length', FRAGMENT_SIZE)
+        self.end_headers()
+        self.wfile.write(fragment_content(index))
+
+
+class TestFragmentFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), FragmentTestRequestHandler)
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+
+    def real_download(self, params, filename, progress_hooks=()):
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HlsFD(ydl, params)
+        for hook in progress_hooks:
+            downloader.add_progress_hook(hook)
+        playlist = '\n'.join((
+            '#EXTM3U', '#EXT-X-TARGETDURATION:10', '#EXT-X-MEDIA-SEQUENCE:0',
+            *(f'#EXTINF:10,\nhttp://127.0.0.1:{self.port}/{index}' for index in range(FRAGMENT_COUNT)),
+            '#EXT-X-ENDLIST'))
+        return downloader.real_download(filename, {
+            'url': f'http://127.0.0.1:{self.port}/index.m3u8',
+            'ext': 'ts',
+            'hls_media_playlist_data': playlist,
+        })
+
+    def download(self, params):
+        filename = 'testfile.ts'
+        try_rm(filename)
+        try:
+            self.assertTrue(self.real_download(params, filename))
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read(), b''.join(map(fragment_content, range(FRAGMENT_COUNT))))
+            self.assertEqual(glob.glob(f'{filename}*Frag*'), [])
+        finally:
+            try_rm(filename)
+
+    def test_buffered(self):
+        self.download({})
+        self.download({'concurrent_fragment_downloads': 3})
+
+    def test_spilled(self):
+        self.download({'fragment_buffer_size': FRAGMENT_SIZE // 3})
+        self.download({'fragment_buffer_size': FRAGMENT_SIZE // 3, 'concurrent_fragment_downloads': 3})
+
+    @patch('yt_dlp.downloader.hls.HlsFD._STRAGGLER_MIN_TIME', 0)
+    def test_straggler(self):
+        FragmentTestRequestHandler.stalled.add('/2')
+        start = time.monotonic()
+        self.download({'concurrent_fragment_downloads': 3})
+        self.assertLess(time.monotonic() - start, 4)
+
+    @patch('yt_dlp.downloader.hls.HlsFD._STRAGGLER_MIN_TIME', 0)
+    @patch.object(FragmentTestRequestHandler, 'stall_time', 3)
+    def test_straggler_progress(self):
+        FragmentTestRequestHandler.stalled.add('/2')
+        filename = 'testfile.ts'
+        statuses = []
+        try:
+            self.assertTrue(self.real_download(
+                {'concurrent_fragment_downloads': 3}, filename,
+                [lambda s: statuses.append((s['status'], s.get('fragment_index')))]))
+            # Let the abandoned copy of the stalled fragment finish
+            time.sleep(3)
+        finally:
+            FragmentTestRequestHandler.stalled.discard('/2')
+            for leftover in glob.glob(f'{filename}*'):
+                try_rm(leftover)
+        self.assertEqual(statuses[-1][0], 'finished')
+        self.assertEqual([status for status, _ in statuses].count('finished'), 1)
+        self.assertTrue(all(index <= FRAGMENT_COUNT for _, index in statuses if index is not None))
+
+    @patch.object(FragmentTestRequestHandler, 'stall_time', 1)
+    def test_error(self):
+        FragmentTestRequestHandler.stalled.add('/2')
+        filename = 'testfile.ts'
+        try_rm(filename)
+        try:
+            with patch('yt_dlp.downloader.hls.HlsFD._read_fragment', side_effect=OSError('Disk full')):
+                with self.assertRaises(OSError):
+                    self.real_download({'concurrent_fragment_downloads': 3}, filename)
+            # The running fragment downloads are waited for
+            self.assertFalse(any(thread.name.startswith('ThreadPoolExecutor') for thread in threading.enumerate()))
+        finally:
+            FragmentTestRequestHandler.stalled.discard('/2')
+            for leftover in glob.glob(f'{filename}*'):
+                try_rm(leftover)
+
+    def test_unbuffered(self):
+        self.download({'fragment_buffer_size': 0})
+        self.download({'fragment_buffer_size': 0, 'concurrent_fragment_downloads': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,7 @@
 import http.server
 import re
 import threading
+from unittest.mock import patch
 
 from test.helper import http_server_port, try_rm
 from yt_dlp import YoutubeDL
@@ -100,6 +101,59 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    @patch('yt_dlp.downloader.common.FileDownloader._PROGRESS_INTERVAL', 60)
+    def test_progress(self):
+        class ProgressLogger(FakeLogger):
+            lines = []
+
+            def debug(self, message):
+                self.lines.append(message)
+
+        statuses = []
+        params = {'logger': ProgressLogger(), 'buffersize': 1024, 'noresizebuffer': True}
+        downloader = HttpFD(YoutubeDL(params), params)
+        downloader.add_progress_hook(statuses.append)
+        filename = 'testfile.mp4'
+        try_rm(filename)
+        self.assertEqual(downloader.download(filename, {
+            'url': f'http://127.0.0.1:{self.port}/regular',
+        }), (True, True))
+        try_rm(filename)
+
+        # Only the final status is rendered and the status dicts are left untouched
+        self.assertGreater(len(statuses), 2)
+        progress_lines = [line for line in ProgressLogger.lines if '%' in line]
+        self.assertEqual(len(progress_lines), 1)
+        self.assertTrue(progress_lines[0].startswith('[download] 100% of'))
+        self.assertFalse(any('_percent_str' in s for s in statuses))
+        self.assertIsNone(downloader._progress_ticker)
+
+    @patch('yt_dlp.downloader.common.FileDownloader._PROGRESS_INTERVAL', 60)
+    def test_progress_error(self):
+        class ProgressLogger(FakeLogger):
+            lines = []
+
+            def debug(self, message):
+                self.lines.append(message)
+
+        def real_download(filename, info_dict):
+            downloader._hook_progress({
+                'status': 'downloading', 'filename': filename,
+                'downloaded_bytes': 512, 'total_bytes': 1024,
+            }, info_dict)
+            raise OSError('Connection reset')
+
+        params = {'logger': ProgressLogger()}
+        downloader = HttpFD(YoutubeDL(params), params)
+        downloader.real_download = real_download
+        with self.assertRaises(OSError):
+            downloader.download('testfile.mp4', {'url': f'http://127.0.0.1:{self.port}/regular'})
+
+        # The queued status is dropped instead of being rendered after the error
+        self.assertIsNone(downloader._progress_ticker)
+        self.assertFalse(downloader._progress_pending)
+        self.assertFalse([line for line in ProgressLogger.lines if '%' in line])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -486,6 +486,28 @@ def test_increment_decrement(self):
         self._test('function f() { var a = "test--"; return a; }', 'test--')
         self._test('function f() { var b = 1; var a = "b--"; return a; }', 'b--')
 
+    def test_parse_once(self):
+        jsi = JSInterpreter('''
+            function f(x) { var a = x.split(""), b = [a], n = 0;
+                for (var i = 0; i < 5; i++) { switch (i % 2) { case 0: (b[0]).push("z"); break; default: n++ } }
+                return [a.join(""), n] }
+        ''')
+        func = jsi.extract_function('f')
+        self.assertEqual(func(['ab']), ['abzzz', 2])
+        compiled = len(jsi._compiled)
+        for _ in range(3):
+            self.assertEqual(func(['xy']), ['xyzzz', 2])
+        # Intermediate values must not leak into the code that is parsed
+        self.assertEqual(len(jsi._compiled), compiled)
+
+        # The parsed statements are bounded
+        jsi = JSInterpreter('function f(x) { var a = x + 1; var b = a * 2; var c = b - 3; return [a, b, c] }')
+        jsi._MAX_COMPILED = 3
+        func = jsi.extract_function('f')
+        self.assertEqual(func([1]), [2, 4, 1])
+        self.assertEqual(func([2]), [3, 6, 3])
+        self.assertLessEqual(len(jsi._compiled), 3)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -8,18 +8,30 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import collections
+import json
+import shutil
 import subprocess
+import tempfile
+from unittest.mock import patch
 
+from test.helper import FakeYDL
 from yt_dlp import YoutubeDL
 from yt_dlp.utils import shell_quote
 from yt_dlp.postprocessor import (
     ExecPP,
+    FFmpegEmbedSubtitlePP,
+    FFmpegMergerPP,
+    FFmpegMetadataPP,
+    FFmpegPostProcessor,
     FFmpegThumbnailsConvertorPP,
     MetadataFromFieldPP,
     MetadataParserPP,
     ModifyChaptersPP,
+    PostProcessor,
     SponsorBlockPP,
 )
+from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessorError
 
 
 class TestMetadataFromField(unittest.TestCase):
@@ -627,5 +639,143 @@ def test_quote_for_concat_QuotesAtEnd(self):
             self._pp._quote_for_ffmpeg("special ' characters ' galore'''"))
 
 
+class FFmpegTestCase(unittest.TestCase):
+    """Runs every test in a temporary directory, with ffmpeg mocked by the subclass"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def _patch(self, *patchers):
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _touch(self, name, content='input'):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+
+class TestFusedPP(FFmpegTestCase):
+    def setUp(self):
+        super().setUp()
+        self.commands = []
+        self.fail_fused = False
+
+        def run_ffmpeg_multiple_files(pp, input_paths, out_path, opts, **kwargs):
+            self.commands.append((pp.pp_key(), [path for path in input_paths if path], list(opts)))
+            if self.fail_fused and pp.pp_key() == 'Fused':
+                raise FFmpegPostProcessorError('Invalid argument')
+            with open(out_path, 'w') as f:
+                f.write('output')
+
+        self._patch(
+            patch.object(FFmpegPostProcessor, 'available', True),
+            patch.object(FFmpegPostProcessor, 'run_ffmpeg_multiple_files', run_ffmpeg_multiple_files))
+
+    def _post_process(self, params=None, pps=()):
+        formats = [self._touch('video.f1.mkv'), self._touch('video.f2.mkv')]
+        info = {
+            'id': 'test',
+            'title': 'Test',
+            'ext': 'mkv',
+            'filepath': os.path.join(self.tmpdir, 'video.mkv'),
+            'vcodec': 'avc1',
+            'acodec': 'mp4a',
+            'requested_formats': [
+                {'url': 'https://example.com/v', 'vcodec': 'avc1', 'acodec': 'none', 'protocol': 'https', 'filepath': formats[0]},
+                {'url': 'https://example.com/a', 'vcodec': 'none', 'acodec': 'mp4a', 'protocol': 'https', 'filepath': formats[1]},
+            ],
+            '__files_to_merge': formats,
+            'chapters': [{'start_time': 0, 'end_time': 10, 'title': 'Intro'}],
+            'requested_subtitles': {'en': {'ext': 'vtt', 'filepath': self._touch('video.en.vtt')}},
+        }
+        with FakeYDL(params) as ydl:
+            for pp in (*pps, FFmpegEmbedSubtitlePP(ydl), FFmpegMetadataPP(ydl, add_infojson=False)):
+                ydl.add_post_processor(pp)
+            ydl.run_all_pps('post_process', info, additional_pps=[FFmpegMergerPP(ydl)])
+        self.assertEqual(os.listdir(self.tmpdir), ['video.mkv'])
+        return [key for key, _, _ in self.commands]
+
+    def test_single_pass(self):
+        self.assertEqual(self._post_process(), ['Fused'])
+        _, inputs, opts = self.commands[0]
+        self.assertEqual([os.path.basename(path) for path in inputs], [
+            'video.f1.mkv', 'video.f2.mkv', 'video.en.vtt', 'video.meta'])
+        opts = ' '.join(opts)
+        self.assertIn('-map 0:v:0 -map 1:a:0 -map -0:s -map 2:0 -metadata:s:s:0 language=eng', opts)
+        self.assertIn('-map_metadata 3', opts)
+        self.assertIn('-c copy', opts)
+
+    def test_flush(self):
+        test = self
+
+        class CheckFilePP(PostProcessor):
+            def run(self, info):
+                test.assertEqual(len(test.commands), 1)
+                with open(info['filepath']) as f:
+                    test.assertEqual(f.read(), 'output')
+                return [], info
+
+        self.assertEqual(self._post_process(pps=[CheckFilePP()]), ['Fused', 'Fused'])
+
+    def test_fallback(self):
+        self.fail_fused = True
+        self.assertEqual(self._post_process(), ['Fused', 'Merger', 'EmbedSubtitle', 'Metadata'])
+
+    def test_compat_option(self):
+        self.assertEqual(
+            self._post_process({'compat_opts': ['no-fused-postprocessors']}),
+            ['Merger', 'EmbedSubtitle', 'Metadata'])
+
+
+class TestFFmpegProbeCache(FFmpegTestCase):
+    METADATA = {
+        'streams': [
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+            {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac'},
+        ],
+        'format': {'duration': '12.5'},
+        'chapters': [],
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.probes = []
+
+        def run(cmd, *args, **kwargs):
+            self.probes.append(cmd)
+            return json.dumps(self.METADATA), '', 0
+
+        self._patch(
+            patch.object(FFmpegPostProcessor, 'basename', 'ffmpeg'),
+            patch.object(FFmpegPostProcessor, 'probe_basename', 'ffprobe'),
+            patch.object(FFmpegPostProcessor, '_version', '7.0'),
+            patch.object(FFmpegPostProcessor, '_probe_cache', collections.OrderedDict()),
+            patch('yt_dlp.postprocessor.ffmpeg.Popen.run', run))
+
+    def test_probe_once(self):
+        path = self._touch('video.mp4', 'video')
+        pp = FFmpegPostProcessor()
+        self.assertEqual(pp.get_audio_codec(path), 'aac')
+        self.assertEqual(pp.get_stream_number(path, ('codec_type',), 'audio'), (1, 2))
+        self.assertEqual(pp._get_real_video_duration(path), 12.5)
+        self.assertEqual(FFmpegPostProcessor().get_metadata_object(path), self.METADATA)
+        self.assertEqual(len(self.probes), 1)
+        self.assertIn('-show_chapters', self.probes[0])
+
+        pp.get_metadata_object(path)['streams'].clear()
+        self.assertEqual(pp.get_metadata_object(path), self.METADATA)
+        pp.get_metadata_object(path, ['-count_frames'])
+        self.assertEqual(len(self.probes), 2)
+
+        with open(path, 'w') as f:
+            f.write('changed video')
+        pp.get_metadata_object(path)
+        self.assertEqual(len(self.probes), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,141 @@
+import threading
+import time
+import pytest
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor.youtube.pot._provider import IEContentProvider, BuiltinIEContentProvider
+from yt_dlp.extractor.youtube.pot.cache import PoTokenCacheProviderError
+from yt_dlp.utils import bug_reports_message
+from yt_dlp.extractor.youtube.pot._builtin.sqlite_cache import SQLiteFilePCP, sqlitefile_preference
+from yt_dlp.extractor.youtube.pot._builtin.memory_cache import MemoryLRUPCP, memorylru_preference
+from yt_dlp.version import __version__
+from yt_dlp.extractor.youtube.pot._registry import _pot_cache_providers
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'pot.sqlite')
+
+
+def count_entries(pcp):
+    return pcp._execute(lambda conn: conn.execute('SELECT COUNT(*) FROM pot_cache').fetchone()[0])
+
+
+class TestSQLiteFilePCP:
+
+    def test_base_type(self):
+        assert issubclass(SQLiteFilePCP, IEContentProvider)
+        assert issubclass(SQLiteFilePCP, BuiltinIEContentProvider)
+
+    @pytest.fixture
+    def pcp(self, ie, logger, db_path):
+        pcp = SQLiteFilePCP(ie, logger, {}, db_path=db_path)
+        yield pcp
+        pcp.close()
+
+    def test_is_registered(self):
+        assert _pot_cache_providers.value.get('SQLiteFile') == SQLiteFilePCP
+
+    def test_initialization(self, pcp):
+        assert pcp.PROVIDER_NAME == 'sqlite'
+        assert pcp.PROVIDER_VERSION == __version__
+        assert pcp.BUG_REPORT_MESSAGE == bug_reports_message(before='')
+        assert pcp.is_available()
+        assert pcp.max_size == 1000
+
+    def test_store_and_get(self, pcp):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value1'
+        assert count_entries(pcp) == 1
+
+    def test_store_ignore_expired(self, pcp):
+        pcp.store('key1', 'value1', int(time.time()) - 1)
+        assert pcp.get('key1') is None
+        assert count_entries(pcp) == 0
+
+    def test_get_key_expired(self, pcp):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        pcp._execute(lambda conn: conn.execute('UPDATE pot_cache SET expires_at = ?', (int(time.time()) - 1,)))
+        assert pcp.get('key1') is None
+        # Expired entries are dropped on the next write
+        pcp.store('key2', 'value2', int(time.time()) + 60)
+        assert count_entries(pcp) == 1
+
+    def test_store_override_existing_key(self, pcp):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        pcp.store('key1', 'value2', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value2'
+        assert count_entries(pcp) == 1
+
+    def test_lru_eviction(self, ie, logger, db_path):
+        pcp = SQLiteFilePCP(ie, logger, {'max_size': ['2']}, db_path=db_path)
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        pcp.store('key2', 'value2', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value1'
+
+        pcp.store('key3', 'value3', int(time.time()) + 60)
+        assert count_entries(pcp) == 2
+        assert pcp.get('key2') is None
+        assert pcp.get('key1') == 'value1'
+        assert pcp.get('key3') == 'value3'
+        pcp.close()
+
+    @pytest.mark.parametrize('max_size', ['abc', '0', '-5'])
+    def test_invalid_max_size(self, ie, logger, db_path, max_size):
+        pcp = SQLiteFilePCP(ie, logger, {'max_size': [max_size]}, db_path=db_path)
+        assert pcp.max_size == 1000
+        assert logger.messages['warning'] == [
+            f'Invalid max_size "{max_size}" for the SQLite PO Token cache; using the default of 1000']
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value1'
+        pcp.close()
+
+    def test_delete(self, pcp):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        pcp.delete('key1')
+        assert pcp.get('key1') is None
+        assert count_entries(pcp) == 0
+
+    def test_shared_between_instances(self, pcp, ie, logger, db_path):
+        other = SQLiteFilePCP(ie, logger, {}, db_path=db_path)
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert other.get('key1') == 'value1'
+        other.delete('key1')
+        assert pcp.get('key1') is None
+        other.close()
+
+    def test_concurrent_access(self, ie, logger, db_path):
+        providers = [SQLiteFilePCP(ie, logger, {}, db_path=db_path) for _ in range(4)]
+
+        def worker(pcp, idx):
+            for i in range(25):
+                pcp.store(f'key{idx}-{i}', f'value{i}', int(time.time()) + 60)
+                assert pcp.get(f'key{idx}-{i}') == f'value{i}'
+
+        threads = [threading.Thread(target=worker, args=(pcp, idx)) for idx, pcp in enumerate(providers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert count_entries(providers[0]) == 100
+        for pcp in providers:
+            pcp.close()
+
+    def test_cache_dir(self, tmp_path, logger):
+        ie = YoutubeDL({'cachedir': str(tmp_path)}).get_info_extractor('Youtube')
+        pcp = SQLiteFilePCP(ie, logger, {})
+        assert pcp.is_available()
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert (tmp_path / 'youtube-pot' / 'tokens.sqlite').is_file()
+        pcp.close()
+
+        ie = YoutubeDL({'cachedir': False}).get_info_extractor('Youtube')
+        assert not SQLiteFilePCP(ie, logger, {}).is_available()
+
+    def test_error(self, ie, logger, tmp_path):
+        pcp = SQLiteFilePCP(ie, logger, {}, db_path=str(tmp_path))
+        with pytest.raises(PoTokenCacheProviderError):
+            pcp.get('key1')
+
+    def test_sqlitefile_preference(self, pcp, ie, pot_request):
+        assert sqlitefile_preference(pcp, pot_request) == 1000
+        assert sqlitefile_preference(pcp, pot_request) < memorylru_preference(MemoryLRUPCP, pot_request)
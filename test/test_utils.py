@@ -129,7 +129,11 @@
     xpath_text,
     xpath_with_ns,
 )
-from yt_dlp.utils._utils import _UnsafeExtensionError
+from yt_dlp.utils._utils import (
+    _UnsafeExtensionError,
+    _compile_format_filter,
+    _compile_match_str,
+)
 from yt_dlp.utils.networking import (
     HTTPHeaderDict,
     escape_rfc3986,
@@ -1556,6 +1560,32 @@ def test_match_str(self):
         self.assertTrue(match_str('!x', {'id': 'foo'}, True))
         self.assertFalse(match_str('x', {'id': 'foo'}, False))
 
+    def test_match_str_compiled(self):
+        filter_str = r'duration>?1:00 & title~=(?i)cats \& dogs & !is_live'
+        parts = _compile_match_str(filter_str)
+        self.assertIs(_compile_match_str(filter_str), parts)
+        self.assertEqual(len(parts), 3)
+        self.assertTrue(match_str(filter_str, {'title': 'Cats & Dogs', 'duration': 61}))
+        self.assertFalse(match_str(filter_str, {'title': 'Cats & Dogs', 'duration': 59}))
+        self.assertTrue(match_str(filter_str, {'title': 'Cats & Dogs'}))
+        self.assertTrue(match_str(filter_str, {'id': 'x'}, {'title', 'is_live'}))
+        self.assertFalse(match_str(filter_str, {'id': 'x'}, {'is_live'}))
+        # Numbers are compared as strings to string fields
+        self.assertTrue(match_str('x=1K', {'x': '1K'}))
+        self.assertTrue(match_str('x=1K', {'x': 1000}))
+        self.assertRaises(ValueError, match_str, 'x*=1', {'x': 1})
+        self.assertRaises(ValueError, match_str, 'x<', {'x': 1})
+
+    def test_compile_format_filter(self):
+        self.assertIs(_compile_format_filter('height<=?720'), _compile_format_filter('height<=?720'))
+        self.assertTrue(_compile_format_filter('height<=?720')({'height': 720}))
+        self.assertTrue(_compile_format_filter('height<=?720')({}))
+        self.assertFalse(_compile_format_filter('filesize>1M')({'filesize': 1000}))
+        self.assertTrue(_compile_format_filter('vcodec!^=avc1')({'vcodec': 'vp9'}))
+        self.assertTrue(_compile_format_filter('format_note~="(?i)^premium"')({'format_note': 'Premium'}))
+        self.assertTrue(_compile_format_filter('language!=en')({'language': 'de'}))
+        self.assertRaises(SyntaxError, _compile_format_filter, 'height<=>720')
+
     def test_parse_dfxp_time_expr(self):
         self.assertEqual(parse_dfxp_time_expr(None), None)
         self.assertEqual(parse_dfxp_time_expr(''), None)
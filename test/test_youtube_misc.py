@@ -8,6 +8,10 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import threading
+from unittest.mock import patch
+
+from test.helper import FakeYDL
 from yt_dlp.extractor import YoutubeIE
 
 
@@ -21,6 +25,30 @@ def test_youtube_extract(self):
         assertExtractId('http://www.youtube.com/watch?v=BaW_jenozKcsharePLED17F32AD9753930', 'BaW_jenozKc')
         assertExtractId('BaW_jenozKc', 'BaW_jenozKc')
 
+    def test_concurrent_player_responses(self):
+        clients = ['tv', 'ios', 'mweb']
+        barrier = threading.Barrier(len(clients), timeout=10)
+        requested = []
+
+        def extract_player_response(self, client, video_id, **kwargs):
+            requested.append(client)
+            if client in clients:
+                # Fails unless the requests of all the clients are in flight at once
+                barrier.wait()
+            reason = 'Sign in to confirm your age' if client in ('tv', 'ios') else None
+            return {'videoDetails': {'videoId': video_id}, 'playabilityStatus': {'reason': reason}}
+
+        ydl = FakeYDL({'extractor_args': {'youtube': {'player_skip': ['configs', 'js']}}})
+        ie = YoutubeIE(ydl)
+        with patch.object(YoutubeIE, '_extract_player_response', extract_player_response), \
+                patch.object(YoutubeIE, 'fetch_po_token', lambda *args, **kwargs: None):
+            prs, _ = ie._extract_player_responses(clients, 'BaW_jenozKc', None, {}, {})
+
+        # The age-gate fallback is ordered right after the client that needed it
+        self.assertEqual(sorted(requested), ['ios', 'mweb', 'tv', 'web_embedded'])
+        self.assertEqual(
+            [pr['streamingData']['__yt_dlp_client'] for pr in prs], ['tv', 'web_embedded', 'ios', 'mweb'])
+
 
 if __name__ == '__main__':
     unittest.main()
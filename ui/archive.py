@@ -0,0 +1,44 @@
+"""
+YouTube Downloader Pro - Streaming ZIP archives
+Moves finished downloads into a ZIP archive one file at a time
+"""
+
+import os
+import zipfile
+
+# Media is already compressed, so only small text side files are deflated
+DEFLATED_EXTENSIONS = ('.vtt', '.srt', '.ass', '.lrc', '.json', '.txt', '.description')
+
+# Files that yt-dlp is still working on
+INCOMPLETE_EXTENSIONS = ('.part', '.ytdl', '.temp')
+
+
+class StreamingZipArchive:
+    """ZIP archive that finished files are moved into as soon as they are done
+
+    Each file is removed from disk after it has been added, so at most one
+    downloaded file exists next to the archive at any time
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+
+    def add(self, file_path, arcname):
+        compress_type = zipfile.ZIP_DEFLATED if file_path.lower().endswith(DEFLATED_EXTENSIONS) else zipfile.ZIP_STORED
+        self._zip.write(file_path, arcname, compress_type=compress_type)
+        os.remove(file_path)
+        self.count += 1
+
+    def add_finished_files(self, directory):
+        """Move every completed file below directory into the archive"""
+        for root, dirs, files in os.walk(directory):
+            for file in sorted(files):
+                if file.endswith(INCOMPLETE_EXTENSIONS) or '.part-Frag' in file:
+                    continue
+                file_path = os.path.join(root, file)
+                self.add(file_path, os.path.relpath(file_path, directory))
+
+    def close(self):
+        self._zip.close()
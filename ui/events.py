@@ -0,0 +1,101 @@
+"""
+YouTube Downloader Pro - Progress push channel
+Fans out coalesced progress updates of downloads to Server-Sent Events streams
+"""
+
+import json
+import threading
+import time
+
+TERMINAL_STATUSES = ('completed', 'error', 'cancelled')
+
+
+class _Client:
+    def __init__(self):
+        self.downloads = set()
+        self.pending = {}
+        self.wakeup = threading.Event()
+
+
+class ProgressBroker:
+    """Pushes progress deltas of downloads to the clients that subscribed to them
+
+    Every client has a single stream that carries all of its downloads. Updates
+    are merged into a pending delta per download and flushed at most once per
+    `interval` seconds, so the amount of work depends on how often the state
+    actually changes and not on how often anything is sent
+    """
+
+    def __init__(self, interval=0.25, keepalive=15):
+        self.interval = interval
+        self.keepalive = keepalive
+        self._lock = threading.Lock()
+        self._states = {}
+        self._clients = {}
+
+    def publish(self, download_id, state):
+        """Record the current state of a download and queue what changed"""
+        with self._lock:
+            previous = self._states.get(download_id, {})
+            delta = {key: value for key, value in state.items() if previous.get(key) != value}
+            if not delta:
+                return
+            state = self._states[download_id] = {**previous, **delta}
+            for client in self._clients.values():
+                if download_id in client.downloads:
+                    client.pending.setdefault(download_id, {}).update(delta)
+                    client.wakeup.set()
+            if state.get('status') in TERMINAL_STATUSES:
+                # The subscribers have it queued; nothing is sent for the download after that
+                del self._states[download_id]
+
+    def subscribe(self, client_id, download_id):
+        """Add a download to the stream of a client; the full state is sent first
+
+        Finished downloads are not kept, so their final state has to be published again
+        """
+        with self._lock:
+            client = self._clients.setdefault(client_id, _Client())
+            client.downloads.add(download_id)
+            state = self._states.get(download_id)
+            if state:
+                client.pending[download_id] = dict(state)
+                client.wakeup.set()
+
+    def unsubscribe(self, client_id, download_id):
+        with self._lock:
+            client = self._clients.get(client_id)
+            if client:
+                client.downloads.discard(download_id)
+                client.pending.pop(download_id, None)
+
+    def _take(self, client):
+        with self._lock:
+            pending, client.pending = client.pending, {}
+            client.wakeup.clear()
+            for download_id, delta in pending.items():
+                if delta.get('status') in TERMINAL_STATUSES:
+                    client.downloads.discard(download_id)
+        return pending
+
+    def stream(self, client_id):
+        """Generate the Server-Sent Events of a client until it disconnects"""
+        with self._lock:
+            client = self._clients.setdefault(client_id, _Client())
+        try:
+            yield 'retry: 2000\n\n'
+            while True:
+                if not client.wakeup.wait(self.keepalive):
+                    yield ': keepalive\n\n'
+                    continue
+                pending = self._take(client)
+                if pending:
+                    yield f'data: {json.dumps(pending)}\n\n'
+                time.sleep(self.interval)
+        finally:
+            with self._lock:
+                if self._clients.get(client_id) is client:
+                    del self._clients[client_id]
+
+
+progress_broker = ProgressBroker()
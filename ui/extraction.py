@@ -0,0 +1,185 @@
+"""
+YouTube Downloader Pro - In-process extraction service
+Keeps a pool of warm yt-dlp instances so that the API endpoints do not have
+to start a new `python -m yt_dlp` process for every request
+"""
+
+import atexit
+import contextlib
+import os
+import queue
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yt_dlp
+from yt_dlp.cache import InfoDictCache
+from yt_dlp.utils import filesize_from_tbr
+
+# Extractor results shared by the analyze and download handlers, so that one user
+# action does not hit the site once per endpoint. The options that change the
+# extraction are part of the keys, so the download handler has to use the same ones
+info_cache = InfoDictCache(ttl=600, max_entries=256)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Equivalent of the command line flags the server used to pass to yt-dlp
+BASE_PARAMS = {
+    'quiet': True,
+    'no_warnings': True,
+    'noprogress': True,
+    'skip_download': True,
+    'nocheckcertificate': True,
+    'extractor_retries': 3,
+    'http_headers': {'User-Agent': USER_AGENT},
+    'info_dict_cache': info_cache,
+}
+
+
+def estimate_format_size(fmt, duration=None):
+    """Return (size, exact) for a selected format
+
+    Merged formats are summed over their parts. Parts without a known size are
+    estimated from their bitrate and the duration; size is 0 if that is not possible
+    """
+    size, exact = 0, True
+    for part in fmt.get('requested_formats') or [fmt]:
+        if part.get('filesize'):
+            size += part['filesize']
+            continue
+        exact = False
+        part_size = part.get('filesize_approx') or filesize_from_tbr(
+            part.get('tbr') or part.get('vbr') or part.get('abr'), duration)
+        if not part_size:
+            return 0, False
+        size += part_size
+    return size, exact
+
+
+class ExtractionService:
+    """Pool of long-lived YoutubeDL instances used for metadata extraction
+
+    All instances share the cookie jar and the request director of the first
+    instance, so connections and cookies are reused across requests. Every
+    instance keeps its own extractor instances (and their caches) warm.
+    """
+
+    def __init__(self, params=None, size=4):
+        self.params = {**BASE_PARAMS, **(params or {})}
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._owner = None
+        self._detached = set()
+        self._closed = False
+
+    def _create(self):
+        ydl = yt_dlp.YoutubeDL(dict(self.params))
+        if self._owner is None:
+            self._owner = ydl
+        else:
+            # cached properties; seeding them makes the instance use the shared ones
+            ydl.__dict__['cookiejar'] = self._owner.cookiejar
+            ydl.__dict__['_request_director'] = self._owner._request_director
+        return ydl
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._create()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    @contextlib.contextmanager
+    def acquire(self, **overrides):
+        """Borrow an instance, temporarily applying the given params"""
+        if self._closed:
+            raise RuntimeError('Extraction service has been closed')
+        ydl = self._checkout()
+        saved = {key: ydl.params.get(key) for key in overrides}
+        saved_selector = ydl.format_selector
+        try:
+            ydl.params.update(overrides)
+            if overrides.get('format'):
+                # The selector is normally compiled once in YoutubeDL.__init__
+                ydl.format_selector = ydl.build_format_selector(overrides['format'])
+            yield ydl
+        finally:
+            if id(ydl) in self._detached:
+                self._detached.discard(id(ydl))
+            else:
+                for key, value in saved.items():
+                    if value is None:
+                        ydl.params.pop(key, None)
+                    else:
+                        ydl.params[key] = value
+                ydl.format_selector = saved_selector
+                self._idle.put(ydl)
+
+    def detach(self, ydl):
+        """Take a borrowed instance out of the pool for good
+
+        For callers that keep using the instance after the request, such as
+        lazily extracted playlists. The params it was acquired with are kept,
+        and the pool creates a replacement when it is needed
+        """
+        with self._lock:
+            self._detached.add(id(ydl))
+            self._created -= 1
+
+    def close_detached(self, ydl):
+        """Close an instance taken out of the pool with detach() once it is no longer used"""
+        with self._lock:
+            self._detached.discard(id(ydl))
+        if ydl is self._owner:
+            # Its network resources are the ones shared by the pool; they are released by close()
+            return
+        # Keep the shared request director open for the other instances
+        ydl.__dict__.pop('_request_director', None)
+        ydl.close()
+
+    def extract(self, url, **overrides):
+        """Extract the info dict of a URL without downloading it
+
+        Raises yt_dlp.utils.DownloadError if the extraction fails
+        """
+        with self.acquire(**overrides) as ydl:
+            info = ydl.extract_info(url, download=False)
+            return ydl.sanitize_info(info)
+
+    def estimate_sizes(self, info, format_specs):
+        """Run each format spec against the formats of an extracted info dict
+
+        Returns a dict mapping every spec to (size, exact); see estimate_format_size
+        """
+        formats = info.get('formats') or [info]
+        sizes = {}
+        with self.acquire() as ydl:
+            for spec in format_specs:
+                try:
+                    selected = ydl._select_formats(formats, ydl.build_format_selector(spec))
+                except Exception as e:
+                    print(f"Invalid format selector {spec!r}: {e}")
+                    selected = []
+                sizes[spec] = estimate_format_size(selected[0], info.get('duration')) if selected else (0, False)
+        return sizes
+
+    def close(self):
+        """Release the shared network resources"""
+        self._closed = True
+        if self._owner is not None:
+            self._owner.close()
+
+
+extraction_service = ExtractionService()
+atexit.register(extraction_service.close)
@@ -0,0 +1,70 @@
+"""
+YouTube Downloader Pro - Storage history writer
+Funnels all writes to the storage history database through one batching thread
+"""
+
+import queue
+import sqlite3
+import threading
+
+
+class HistoryWriter:
+    """Single writer thread for a SQLite database
+
+    Statements are queued by any thread and committed in batches of up to
+    `batch_size`, waiting at most `batch_delay` seconds for a batch to fill, so
+    that a burst of finished downloads costs one transaction instead of one each
+    """
+
+    def __init__(self, path, batch_size=100, batch_delay=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='history-writer')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def execute(self, sql, params=()):
+        """Queue a statement to be written"""
+        self._start()
+        self._queue.put((sql, params))
+
+    def flush(self):
+        """Wait until every queued statement has been committed"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.batch_delay))
+            except queue.Empty:
+                pass
+
+            try:
+                with conn:
+                    for sql, params in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error:
+                # Do not lose the whole batch because of a single bad statement
+                for sql, params in batch:
+                    try:
+                        with conn:
+                            conn.execute(sql, params)
+                    except sqlite3.Error as e:
+                        print(f"Error writing storage history: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
@@ -0,0 +1,121 @@
+"""
+YouTube Downloader Pro - Persistent job store
+Records UI download jobs in a WAL-mode SQLite database so that they survive restarts
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+ACTIVE_STATES = ('queued', 'starting', 'downloading')
+
+
+class JobStore:
+    """Crash-safe record of download jobs
+
+    Every job keeps the request it was created from, so that interrupted jobs
+    can be queued again on startup. yt-dlp then continues the `.part` file or
+    the fragment download recorded here instead of starting from byte zero.
+    Progress is written at most every `progress_interval` seconds per job
+    """
+
+    def __init__(self, path, progress_interval=2.0):
+        self.path = path
+        self.progress_interval = progress_interval
+        self._local = threading.local()
+        self._last_progress = {}
+        self._progress_lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS download_jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                request TEXT NOT NULL,
+                state TEXT NOT NULL,
+                part_file TEXT,
+                fragment_index INTEGER,
+                downloaded_bytes INTEGER,
+                error TEXT,
+                attempts INTEGER DEFAULT 0,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_download_jobs_state ON download_jobs (state)')
+        conn.commit()
+
+    @staticmethod
+    def new_id():
+        """Generate a download ID that is unique across requests and restarts"""
+        return uuid.uuid4().hex
+
+    def create(self, job_id, kind, request_data):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO download_jobs (id, kind, request, state, attempts, created, updated)
+                VALUES (?, ?, ?, 'queued', 0, ?, ?)
+            ''', (job_id, kind, json.dumps(request_data), now, now))
+
+    def set_state(self, job_id, state, error=None):
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE download_jobs SET state = ?, error = ?, updated = ?,
+                    attempts = attempts + (CASE WHEN ? = 'starting' THEN 1 ELSE 0 END)
+                WHERE id = ?
+            ''', (state, error, time.time(), state, job_id))
+        if state not in ACTIVE_STATES:
+            with self._progress_lock:
+                self._last_progress.pop(job_id, None)
+
+    def update_progress(self, job_id, part_file=None, fragment_index=None, downloaded_bytes=None):
+        """Record where a running job has got to; throttled per job
+
+        Jobs that are no longer active (e.g. cancelled while yt-dlp was still
+        reporting progress) are left as they are
+        """
+        now = time.time()
+        with self._progress_lock:
+            if now - self._last_progress.get(job_id, 0) < self.progress_interval:
+                return
+            self._last_progress[job_id] = now
+        with self._connect() as conn:
+            updated = conn.execute(f'''
+                UPDATE download_jobs SET state = 'downloading', updated = ?,
+                    part_file = COALESCE(?, part_file),
+                    fragment_index = COALESCE(?, fragment_index),
+                    downloaded_bytes = COALESCE(?, downloaded_bytes)
+                WHERE id = ? AND state IN ({", ".join("?" * len(ACTIVE_STATES))})
+            ''', (now, part_file, fragment_index, downloaded_bytes, job_id, *ACTIVE_STATES)).rowcount
+        if not updated:
+            with self._progress_lock:
+                self._last_progress.pop(job_id, None)
+
+    def _to_dict(self, row):
+        return {**dict(row), 'request': json.loads(row['request'])}
+
+    def get(self, job_id):
+        row = self._connect().execute('SELECT * FROM download_jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def interrupted(self):
+        """Jobs that were queued or running when the server stopped, oldest first"""
+        rows = self._connect().execute(
+            f'SELECT * FROM download_jobs WHERE state IN ({", ".join("?" * len(ACTIVE_STATES))}) ORDER BY created',
+            ACTIVE_STATES).fetchall()
+        return [self._to_dict(row) for row in rows]
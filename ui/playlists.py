@@ -0,0 +1,185 @@
+"""
+YouTube Downloader Pro - Paged playlist analysis
+Lists playlist entries page by page as the site returns them, instead of
+waiting for the whole flat playlist to be extracted
+"""
+
+import itertools
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yt_dlp.utils import LazyList, PagedList
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Extractors may hand off to another URL (e.g. a channel to its videos tab)
+MAX_REDIRECTS = 5
+
+
+class InvalidCursorError(Exception):
+    """Raised for cursors that are malformed or whose session has expired"""
+
+
+def entry_summary(entry):
+    """The JSON safe fields of a flat playlist entry that the UI shows"""
+    thumbnail = entry.get('thumbnail')
+    if not thumbnail and entry.get('thumbnails'):
+        thumbnail = entry['thumbnails'][-1].get('url')
+    return {
+        'id': entry.get('id'),
+        'title': entry.get('title') or entry.get('id') or 'Unknown Title',
+        'url': entry.get('url') or entry.get('webpage_url'),
+        'duration': entry.get('duration'),
+        'uploader': entry.get('uploader') or entry.get('channel'),
+        'view_count': entry.get('view_count'),
+        'thumbnail': thumbnail or '',
+    }
+
+
+def resolve_playlist(ydl, url):
+    """Extract a URL without processing it, so that playlist entries stay lazy
+
+    Redirects to other URLs are followed. For playlists, `entries` is the
+    generator or PagedList of the extractor, which only requests the next
+    continuation page when more entries are consumed
+    """
+    result = ydl.extract_info(url, download=False, process=False)
+    for _ in range(MAX_REDIRECTS):
+        if result.get('_type') not in ('url', 'url_transparent'):
+            break
+        result = ydl.extract_info(result['url'], download=False, process=False, ie_key=result.get('ie_key'))
+    return result
+
+
+class PlaylistSession:
+    """Lazily consumed entries of one extracted playlist
+
+    The session owns its YoutubeDL instance, since the entries generator keeps
+    using the extractor that created it, and `close` is called with it once the
+    session is dropped. After a page has been served, the next one is fetched
+    in the background while the client renders the first
+    """
+
+    def __init__(self, ydl, result, close=None):
+        entries = result.get('entries') or []
+        self.ydl = ydl
+        self._close = close
+        self.info = {key: value for key, value in result.items() if key != 'entries'}
+        self._entries = entries if isinstance(entries, PagedList) else LazyList(entries)
+        self._lock = threading.Lock()
+        self.last_used = time.time()
+
+    @property
+    def count(self):
+        """The number of entries if the site reported it"""
+        return self.info.get('playlist_count')
+
+    def _slice(self, start, end):
+        with self._lock:
+            if isinstance(self._entries, PagedList):
+                return self._entries.getslice(start, end)
+            # Slicing a LazyList reads one entry ahead, which can cost an extra continuation
+            return list(itertools.islice(self._entries, start, end))
+
+    def page(self, offset, size):
+        """Return the entries in [offset, offset + size)"""
+        self.last_used = time.time()
+        entries = self._slice(offset, offset + size)
+        if len(entries) == size:
+            prefetch = threading.Thread(
+                target=self._prefetch_page, args=(offset + size, size), name='playlist-prefetch')
+            prefetch.daemon = True
+            prefetch.start()
+        return entries
+
+    def _prefetch_page(self, offset, size):
+        try:
+            self._slice(offset, offset + size)
+        except Exception as e:
+            # The error is raised again when the page is actually requested
+            print(f"Error prefetching playlist entries: {e}")
+
+    def close(self):
+        if self._close:
+            try:
+                self._close(self.ydl)
+            except Exception as e:
+                print(f"Error closing playlist session: {e}")
+
+
+class PlaylistSessions:
+    """Cursors for paging through playlists that are still being extracted
+
+    A cursor is `<session token>:<offset>`. At most `max_sessions` playlists are
+    kept, dropping the least recently used one, and idle sessions expire after `ttl`.
+    Dropped sessions are closed
+    """
+
+    def __init__(self, ttl=900, max_sessions=32):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, ydl, result, close=None):
+        """Start a session; `close` is called with `ydl` when the session is dropped"""
+        token = secrets.token_urlsafe(12)
+        session = PlaylistSession(ydl, result, close)
+        now = time.time()
+        with self._lock:
+            dropped = [self._sessions.pop(key) for key, value in list(self._sessions.items())
+                       if now - value.last_used > self.ttl]
+            self._sessions[token] = session
+            while len(self._sessions) > self.max_sessions:
+                dropped.append(self._sessions.popitem(last=False)[1])
+        for expired in dropped:
+            expired.close()
+        return token, session
+
+    def resolve_cursor(self, cursor):
+        """Return (token, session, offset) for a cursor"""
+        token, _, offset = (cursor or '').partition(':')
+        if not offset.isdigit():
+            raise InvalidCursorError(f'Invalid cursor: {cursor!r}')
+        with self._lock:
+            session = self._sessions.get(token)
+            expired = session is not None and time.time() - session.last_used > self.ttl
+            if expired:
+                del self._sessions[token]
+            elif session is not None:
+                self._sessions.move_to_end(token)
+        if expired:
+            session.close()
+        if session is None or expired:
+            raise InvalidCursorError('Playlist listing has expired; analyze the URL again')
+        return token, session, int(offset)
+
+    def page(self, token, session, offset, size):
+        """Serve a page of entries as a JSON safe dict"""
+        entries = session.page(offset, size)
+        has_more = len(entries) == size
+        return {
+            'entries': [entry_summary(entry) for entry in entries],
+            'offset': offset,
+            'has_more': has_more,
+            'next_cursor': f'{token}:{offset + len(entries)}' if has_more else None,
+            'total': session.count if session.count is not None else (None if has_more else offset + len(entries)),
+        }
+
+
+def page_size_param(value):
+    try:
+        size = int(value or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+playlist_sessions = PlaylistSessions()
@@ -0,0 +1,169 @@
+"""
+YouTube Downloader Pro - Download scheduler
+Runs downloads on a bounded worker pool with priority lanes and per-host limits
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlparse
+
+# Priority lanes; lower values are scheduled first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+LANE_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_BULK: 'bulk',
+}
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its maximum depth"""
+
+
+def host_key(url):
+    """Group URLs by host so that e.g. youtube.com and youtu.be share one limit"""
+    host = (urlparse(url).hostname or '').lower()
+    if host.startswith('www.') or host.startswith('m.'):
+        host = host.split('.', 1)[1]
+    return {'youtu.be': 'youtube.com', 'music.youtube.com': 'youtube.com'}.get(host, host)
+
+
+class _Job:
+    def __init__(self, job_id, func, host, priority, seq):
+        self.job_id = job_id
+        self.func = func
+        self.host = host
+        self.priority = priority
+        self.seq = seq
+        self.submitted = time.time()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class DownloadScheduler:
+    """Bounded pool of download workers
+
+    Jobs wait in a priority queue (interactive single videos ahead of bulk
+    playlists, FIFO within a lane). A job only starts when fewer than
+    `per_host_limit` jobs of the same host are running and at least
+    `per_host_interval` seconds passed since the last job of that host started.
+    Submitting more than `max_queued` waiting jobs raises QueueFullError
+    """
+
+    def __init__(self, workers=4, per_host_limit=2, per_host_interval=1.0, max_queued=500):
+        self.workers = workers
+        self.per_host_limit = per_host_limit
+        self.per_host_interval = per_host_interval
+        self.max_queued = max_queued
+        self._queue = []
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._running = {}
+        self._host_running = {}
+        self._host_last_start = {}
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'cancelled': 0}
+        self._wait_times = []
+        self._threads = []
+
+    def start(self):
+        with self._cond:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f'download-worker-{len(self._threads)}')
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, job_id, func, url='', priority=PRIORITY_INTERACTIVE):
+        """Queue func() to be run on a worker; returns the queue position"""
+        self.start()
+        with self._cond:
+            if len(self._queue) >= self.max_queued:
+                self._stats['rejected'] += 1
+                raise QueueFullError(f'Download queue is full ({self.max_queued} jobs waiting)')
+            heapq.heappush(self._queue, _Job(job_id, func, host_key(url), priority, next(self._seq)))
+            self._stats['submitted'] += 1
+            self._cond.notify()
+            return sum(1 for job in self._queue if job.priority <= priority)
+
+    def cancel(self, job_id):
+        """Remove a job that has not started yet. Returns False if it is not queued"""
+        with self._cond:
+            for job in self._queue:
+                if job.job_id == job_id:
+                    self._queue.remove(job)
+                    heapq.heapify(self._queue)
+                    self._stats['cancelled'] += 1
+                    return True
+        return False
+
+    def _next_job(self):
+        """Pop the first job that may start now, or return the seconds to wait"""
+        now = time.time()
+        wait = None
+        for job in sorted(self._queue):
+            if self._host_running.get(job.host, 0) >= self.per_host_limit:
+                continue
+            ready_at = self._host_last_start.get(job.host, 0) + self.per_host_interval
+            if ready_at > now:
+                wait = min(wait or float('inf'), ready_at - now)
+                continue
+            self._queue.remove(job)
+            heapq.heapify(self._queue)
+            return job, None
+        return None, wait
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    job, wait = self._next_job()
+                    if job:
+                        break
+                    self._cond.wait(wait)
+                self._running[job.job_id] = job
+                self._host_running[job.host] = self._host_running.get(job.host, 0) + 1
+                self._host_last_start[job.host] = time.time()
+                self._wait_times = [*self._wait_times[-99:], time.time() - job.submitted]
+
+            failed = False
+            try:
+                job.func()
+            except Exception as e:
+                failed = True
+                print(f"Download job {job.job_id} failed: {e}")
+            finally:
+                with self._cond:
+                    del self._running[job.job_id]
+                    self._host_running[job.host] -= 1
+                    if not self._host_running[job.host]:
+                        del self._host_running[job.host]
+                    self._stats['failed' if failed else 'completed'] += 1
+                    self._cond.notify_all()
+
+    def is_queued(self, job_id):
+        with self._cond:
+            return any(job.job_id == job_id for job in self._queue)
+
+    def stats(self):
+        """Queue depth and throughput metrics"""
+        with self._cond:
+            queued = {name: 0 for name in LANE_NAMES.values()}
+            for job in self._queue:
+                queued[LANE_NAMES.get(job.priority, str(job.priority))] += 1
+            return {
+                'workers': self.workers,
+                'running': len(self._running),
+                'queued': queued,
+                'queue_depth': len(self._queue),
+                'max_queued': self.max_queued,
+                'running_per_host': dict(self._host_running),
+                'avg_wait_seconds': sum(self._wait_times) / len(self._wait_times) if self._wait_times else 0,
+                **self._stats,
+            }
+
+
+download_scheduler = DownloadScheduler()
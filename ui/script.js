@@ -16,6 +16,12 @@ class YouTubeDownloader {
         this.currentVideoInfo = null;
         this.formatSizes = {};
         this.currentStorageInfo = null;
+        this.playlistEntries = [];
+
+        // Progress push channel (one event stream carries all downloads of this page)
+        this.clientId = window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+        this.progressStream = null;
+        this.progressHandlers = new Map();
 
         this.initializeElements();
         this.bindEvents();
@@ -263,7 +269,11 @@ class YouTubeDownloader {
             if (data.success) {
                 if (data.is_playlist) {
                     this.currentPlaylistInfo = data.playlist_info;
+                    this.playlistEntries = data.entries || [];
                     this.showPlaylistInfo(data.playlist_info);
+                    if (data.has_more) {
+                        this.loadPlaylistEntries(data.next_cursor, url);
+                    }
                 } else {
                     this.currentVideoInfo = data.info;
                     this.showVideoInfo(data.info);
@@ -285,6 +295,35 @@ class YouTubeDownloader {
         }
     }
 
+    async loadPlaylistEntries(cursor, url) {
+        // Page through the rest of the playlist while the first page is already shown
+        while (cursor && this.currentUrl === url) {
+            try {
+                const response = await fetch('/api/playlist-entries', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ cursor })
+                });
+                const data = await response.json();
+                if (!data.success || this.currentUrl !== url) {
+                    return;
+                }
+
+                this.playlistEntries.push(...data.entries);
+                const info = this.currentPlaylistInfo;
+                info.video_count_exact = data.total !== null;
+                info.video_count = data.total !== null ? data.total : this.playlistEntries.length;
+                this.elements.videoCount.textContent = `${info.video_count}${info.video_count_exact ? '' : '+'} videos`;
+                cursor = data.next_cursor;
+            } catch (error) {
+                console.error('Playlist listing error:', error);
+                return;
+            }
+        }
+    }
+
     async analyzeFormatsAndStorage() {
         try {
             // Get current download path
@@ -459,7 +498,7 @@ class YouTubeDownloader {
         this.elements.playlistTitle.textContent = info.title || 'Unknown Playlist';
         this.elements.playlistUploader.textContent = info.uploader || 'Unknown';
         this.elements.playlistSize.innerHTML = `<i class="fas fa-hdd"></i> ${info.estimated_total_size_formatted || 'Calculating size...'}`;
-        this.elements.videoCount.textContent = `${info.video_count || 0} videos`;
+        this.elements.videoCount.textContent = `${info.video_count || 0}${info.video_count_exact === false ? '+' : ''} videos`;
 
         // Hide video info and show playlist info
         this.elements.videoInfo.style.display = 'none';
@@ -1101,7 +1140,78 @@ class YouTubeDownloader {
         }
     }
 
-    async monitorDownload(downloadId) {
+    openProgressStream() {
+        if (this.progressStream) return this.progressStream;
+
+        this.progressStream = new EventSource(`/api/events/${this.clientId}`);
+
+        // Subscriptions are lost when the stream reconnects, so register them again
+        this.progressStream.onopen = () => {
+            const downloadIds = [...this.progressHandlers.keys()];
+            if (downloadIds.length) {
+                this.subscribeProgress(downloadIds);
+            }
+        };
+
+        // Every message maps download ids to the fields that changed since the last one
+        this.progressStream.onmessage = (event) => {
+            const updates = JSON.parse(event.data);
+            for (const [downloadId, delta] of Object.entries(updates)) {
+                const handler = this.progressHandlers.get(downloadId);
+                if (handler) {
+                    handler(delta);
+                }
+            }
+        };
+
+        return this.progressStream;
+    }
+
+    async subscribeProgress(downloadIds) {
+        await fetch(`/api/events/${this.clientId}/subscribe`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ download_ids: downloadIds })
+        });
+    }
+
+    monitorDownload(downloadId) {
+        if (!window.EventSource) {
+            return this.pollDownload(downloadId);
+        }
+
+        return new Promise(resolve => {
+            let progress = {};
+
+            this.progressHandlers.set(downloadId, (delta) => {
+                progress = { ...progress, ...delta };
+                this.updateProgressDisplay(progress);
+
+                // Check if download is complete
+                const finished = progress.status === 'completed' || progress.status === 'error' || progress.status === 'cancelled';
+                if (progress.status === 'completed') {
+                    this.showSuccess();
+                } else if (progress.status === 'error') {
+                    this.showError(progress.message || 'Download failed');
+                }
+                if (finished || !this.isDownloading) {
+                    this.progressHandlers.delete(downloadId);
+                    resolve(progress);
+                }
+            });
+
+            const stream = this.openProgressStream();
+            if (stream.readyState === EventSource.OPEN) {
+                this.subscribeProgress([downloadId]).catch(error => {
+                    console.error('Progress subscription error:', error);
+                });
+            }
+        });
+    }
+
+    async pollDownload(downloadId) {
         // Progressive polling: faster updates during active downloading
         let pollInterval = 250; // Start with 250ms for responsive updates
         let consecutiveNoProgress = 0;
@@ -1167,6 +1277,7 @@ class YouTubeDownloader {
         // Update text elements with better fallbacks
         const statusMessage = progress.message ||
                             (progress.status === 'downloading' ? 'Downloading...' :
+                             progress.status === 'queued' ? 'Waiting in download queue...' :
                              progress.status === 'starting' ? 'Preparing download...' :
                              progress.status === 'completed' ? 'Download completed!' :
                              progress.status === 'error' ? 'Download failed' :
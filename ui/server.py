@@ -6,11 +6,8 @@
 
 import os
 import sys
-import json
 import subprocess
-import threading
 import time
-import zipfile
 import tempfile
 import shutil
 import sqlite3
@@ -26,6 +23,15 @@
 # Add parent directory to path to import yt_dlp
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from archive import StreamingZipArchive
+from events import TERMINAL_STATUSES, progress_broker
+from extraction import USER_AGENT, estimate_format_size, extraction_service, info_cache
+from history import HistoryWriter
+from jobstore import JobStore
+from playlists import InvalidCursorError, page_size_param, playlist_sessions, resolve_playlist
+from scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, QueueFullError, download_scheduler
+from streaming import is_direct_http, pipe_download, proxy_http, stream_ext, stream_filename, stream_registry
+
 app = Flask(__name__, static_folder='.', template_folder='.')
 CORS(app)
 
@@ -34,6 +40,11 @@
 active_downloads = {}
 download_processes = {}  # Store subprocess objects for pause/stop functionality
 
+# Persistent record of download jobs, used to resume them after a restart
+JOB_DB_PATH = 'download_jobs.db'
+MAX_RESUME_ATTEMPTS = 3
+job_store = JobStore(JOB_DB_PATH)
+
 # Storage management configuration
 STORAGE_DB_PATH = 'storage_history.db'
 DEFAULT_STORAGE_PATHS = {
@@ -47,6 +58,9 @@ def init_storage_db():
     conn = sqlite3.connect(STORAGE_DB_PATH)
     cursor = conn.cursor()
 
+    # WAL lets the analytics views read while the history writer commits
+    cursor.execute('PRAGMA journal_mode=WAL')
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS download_history (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -71,6 +85,10 @@ def init_storage_db():
         )
     ''')
 
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_download_history_video_url ON download_history (video_url)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_download_history_download_date ON download_history (download_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_download_history_storage_location ON download_history (storage_location, file_size)')
+
     conn.commit()
     conn.close()
 
@@ -101,43 +119,27 @@ def format_file_size(size_bytes):
 
 def add_to_download_history(video_url, video_title, file_path, file_size, storage_location, format_info=''):
     """Add a completed download to the history database"""
-    try:
-        conn = sqlite3.connect(STORAGE_DB_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO download_history
-            (video_url, video_title, file_path, file_size, storage_location, format_info)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (video_url, video_title, file_path, file_size, storage_location, format_info))
-
-        conn.commit()
-        conn.close()
-
-    except Exception as e:
-        print(f"Error adding to download history: {e}")
+    history_writer.execute('''
+        INSERT INTO download_history
+        (video_url, video_title, file_path, file_size, storage_location, format_info)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (video_url, video_title, file_path, file_size, storage_location, format_info))
 
 def update_storage_location_usage(path):
     """Update the last used timestamp for a storage location"""
-    try:
-        conn = sqlite3.connect(STORAGE_DB_PATH)
-        cursor = conn.cursor()
-
-        # Insert or update storage location
-        cursor.execute('''
-            INSERT OR REPLACE INTO storage_locations (path, last_used)
-            VALUES (?, CURRENT_TIMESTAMP)
-        ''', (path,))
-
-        conn.commit()
-        conn.close()
-
-    except Exception as e:
-        print(f"Error updating storage location usage: {e}")
+    # Insert or update storage location, keeping its alias and default flag
+    history_writer.execute('''
+        INSERT INTO storage_locations (path, last_used)
+        VALUES (?, CURRENT_TIMESTAMP)
+        ON CONFLICT(path) DO UPDATE SET last_used = CURRENT_TIMESTAMP
+    ''', (path,))
 
 # Initialize storage database on startup
 init_storage_db()
 
+# All history writes go through one thread and are committed in batches
+history_writer = HistoryWriter(STORAGE_DB_PATH)
+
 class DownloadProgress:
     def __init__(self):
         self.progress = 0
@@ -155,7 +157,13 @@ def __init__(self):
 def progress_hook_wrapper(d, download_id, expected_size, storage_info):
     """Wrapper for progress hook to include storage tracking"""
     # Call the original progress hook
-    progress_hook(d)
+    progress_hook(d, download_id)
+
+    # Remember the partial file and fragment so an interrupted job can be resumed
+    if d['status'] == 'downloading':
+        job_store.update_progress(
+            download_id, part_file=d.get('tmpfilename'), fragment_index=d.get('fragment_index'),
+            downloaded_bytes=d.get('downloaded_bytes'))
 
     # Add storage information to the progress data
     if download_id in download_progress:
@@ -172,9 +180,11 @@ def progress_hook_wrapper(d, download_id, expected_size, storage_info):
             progress_obj.expected_size = expected_size
             progress_obj.storage_info = storage_info
 
-def progress_hook(d):
+        publish_progress(download_id)
+
+def progress_hook(d, download_id=None):
     """Enhanced progress hook for yt-dlp with more frequent updates"""
-    download_id = d.get('info_dict', {}).get('id', 'unknown')
+    download_id = download_id or d.get('info_dict', {}).get('id', 'unknown')
     current_time = time.time()
 
     if download_id not in download_progress:
@@ -259,55 +269,18 @@ def progress_hook(d):
         progress.speed = "0 MB/s"
         progress.eta = "00:00"
 
-def get_enhanced_video_size(url, format_selector='best[height<=720]'):
-    """Enhanced video size detection using multiple methods"""
+def get_enhanced_video_size(url, format_selector='best[height<=720]', video_info=None):
+    """Get the expected download size of a format selector, reusing video_info when given"""
     print(f"Getting enhanced size for URL: {url} with format: {format_selector}")
 
-    # Method 1: Try to get size from format listing with specific format
     try:
-        print("Method 1: Trying format-specific size detection...")
-        cmd = [
-            sys.executable, '-m', 'yt_dlp',
-            '--no-check-certificate',
-            '--dump-json',
-            '--no-download',
-            '--format', format_selector,
-            '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            '--extractor-retries', '3',
-            url
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd='..')
-
-        if result.returncode == 0:
-            try:
-                video_info = json.loads(result.stdout)
-                # Check for direct file size
-                size = video_info.get('filesize') or video_info.get('filesize_approx')
-                if size and size > 0:
-                    print(f"Method 1 success: Found size {size} bytes")
-                    return size
-
-                # Check for format-specific sizes
-                if 'requested_formats' in video_info:
-                    total_size = 0
-                    for fmt in video_info['requested_formats']:
-                        fmt_size = fmt.get('filesize') or fmt.get('filesize_approx', 0)
-                        total_size += fmt_size
-                    if total_size > 0:
-                        print(f"Method 1 success: Combined format size {total_size} bytes")
-                        return total_size
-
-            except json.JSONDecodeError:
-                print("Method 1 failed: JSON decode error")
-                pass
-        else:
-            print(f"Method 1 failed: Command returned {result.returncode}")
+        if video_info is None:
+            video_info = extraction_service.extract(url)
+        size, _ = extraction_service.estimate_sizes(video_info, [format_selector])[format_selector]
+        return size
     except Exception as e:
-        print(f"Method 1 failed: {e}")
-
-    print("All methods failed, returning 0")
-    return 0
+        print(f"Size detection failed: {e}")
+        return 0
 
 @app.route('/')
 def index():
@@ -329,87 +302,56 @@ def analyze_video():
         if not url:
             return jsonify({'error': 'URL is required'}), 400
 
-        # First check if it's a playlist
-        playlist_cmd = [
-            sys.executable, '-m', 'yt_dlp',
-            '--no-check-certificate',
-            '--dump-json',
-            '--no-download',
-            '--flat-playlist',
-            '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            '--extractor-retries', '3',
-            url
-        ]
-
-        playlist_result = subprocess.run(playlist_cmd, capture_output=True, text=True, cwd='..')
+        page_size = page_size_param(data.get('page_size'))
 
-        # Check if it's a playlist by counting entries
-        is_playlist = False
-        playlist_info = None
-        video_count = 0
+        # Only the first page of a playlist is listed here; the rest is paged
+        # through /api/playlist-entries while the site is still being queried
+        try:
+            with extraction_service.acquire(extract_flat='in_playlist') as ydl:
+                result = resolve_playlist(ydl, url)
+                if result.get('_type') == 'playlist':
+                    # The entries are extracted by this instance as they are paged through
+                    extraction_service.detach(ydl)
+        except Exception:
+            return jsonify({'error': 'Failed to analyze video. Please check the URL and try again.'}), 400
 
-        if playlist_result.returncode == 0:
+        if result.get('_type') == 'playlist':
+            token, session = playlist_sessions.open(ydl, result, close=extraction_service.close_detached)
             try:
-                lines = [line.strip() for line in playlist_result.stdout.strip().split('\n') if line.strip()]
-                video_count = len(lines)
-                
-                if video_count > 1:
-                    is_playlist = True
-                    
-                    # Get playlist metadata
-                    try:
-                        first_entry = json.loads(lines[0]) if lines else {}
-                        playlist_title = first_entry.get('playlist_title', 'Unknown Playlist')
-                        playlist_uploader = first_entry.get('playlist_uploader', 'Unknown')
-                        
-                        # Try to get a thumbnail from the first video
-                        playlist_thumbnail = first_entry.get('thumbnail', '')
-                        
-                        playlist_info = {
-                            'title': playlist_title,
-                            'uploader': playlist_uploader,
-                            'thumbnail': playlist_thumbnail,
-                            'video_count': video_count,
-                            'description': f'Playlist with {video_count} videos'
-                        }
-                    except (json.JSONDecodeError, IndexError):
-                        playlist_info = {
-                            'title': 'Unknown Playlist',
-                            'uploader': 'Unknown',
-                            'thumbnail': '',
-                            'video_count': video_count,
-                            'description': f'Playlist with {video_count} videos'
-                        }
-            except Exception as e:
-                print(f"Error parsing playlist info: {e}")
-
-        if is_playlist:
-            return jsonify({
-                'success': True, 
-                'is_playlist': True, 
-                'playlist_info': playlist_info
-            })
-
-        # Single video analysis
-        cmd = [
-            sys.executable, '-m', 'yt_dlp',
-            '--no-check-certificate',
-            '--dump-json',
-            '--no-download',
-            '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            '--extractor-retries', '3',
-            url
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd='..')
-
-        if result.returncode != 0:
-            return jsonify({'error': 'Failed to analyze video. Please check the URL and try again.'}), 400
+                page = playlist_sessions.page(token, session, 0, page_size)
+            except Exception:
+                return jsonify({'error': 'Failed to analyze video. Please check the URL and try again.'}), 400
+            entries = page['entries']
+
+            if len(entries) > 1:
+                video_count = page['total'] if page['total'] is not None else len(entries)
+                playlist_info = {
+                    'title': result.get('title') or 'Unknown Playlist',
+                    'uploader': result.get('uploader') or result.get('channel') or 'Unknown',
+                    # Try to get a thumbnail from the first video
+                    'thumbnail': entries[0]['thumbnail'],
+                    'video_count': video_count,
+                    'video_count_exact': page['total'] is not None,
+                    'description': f'Playlist with {video_count}{"" if page["total"] is not None else "+"} videos'
+                }
+                return jsonify({
+                    'success': True,
+                    'is_playlist': True,
+                    'playlist_info': playlist_info,
+                    'entries': entries,
+                    'has_more': page['has_more'],
+                    'next_cursor': page['next_cursor'],
+                })
+
+            # Single entry playlists only contain a flat reference to the video
+            if not entries:
+                return jsonify({'error': 'Failed to analyze video. Please check the URL and try again.'}), 400
+            url = entries[0]['url'] or url
 
         try:
-            video_info = json.loads(result.stdout)
-        except json.JSONDecodeError:
-            return jsonify({'error': 'Failed to parse video information'}), 400
+            video_info = extraction_service.extract(url)
+        except Exception:
+            return jsonify({'error': 'Failed to analyze video. Please check the URL and try again.'}), 400
 
         # Extract video information
         info = {
@@ -428,6 +370,26 @@ def analyze_video():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/playlist-entries', methods=['POST'])
+def playlist_entries():
+    """Return the next page of a playlist listed by /api/analyze"""
+    try:
+        data = request.get_json()
+        try:
+            token, session, offset = playlist_sessions.resolve_cursor(data.get('cursor'))
+        except InvalidCursorError as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            page = playlist_sessions.page(token, session, offset, page_size_param(data.get('page_size')))
+        except Exception:
+            return jsonify({'error': 'Failed to list playlist entries'}), 400
+
+        return jsonify({'success': True, **page})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/analyze-formats', methods=['POST'])
 def analyze_formats():
     """Analyze video formats and provide size estimates with storage information"""
@@ -440,25 +402,10 @@ def analyze_formats():
             return jsonify({'error': 'URL is required'}), 400
 
         # Get video info with all formats
-        cmd = [
-            sys.executable, '-m', 'yt_dlp',
-            '--no-check-certificate',
-            '--dump-json',
-            '--no-download',
-            '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            '--extractor-retries', '3',
-            url
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd='..')
-
-        if result.returncode != 0:
-            return jsonify({'error': 'Failed to analyze video formats'}), 400
-
         try:
-            video_info = json.loads(result.stdout)
-        except json.JSONDecodeError:
-            return jsonify({'error': 'Failed to parse video information'}), 400
+            video_info = extraction_service.extract(url)
+        except Exception:
+            return jsonify({'error': 'Failed to analyze video formats'}), 400
 
         # Define format selectors we want to analyze
         format_selectors = [
@@ -472,12 +419,14 @@ def analyze_formats():
 
         format_analysis = []
 
+        # All selectors are evaluated against the formats of the single extraction above
+        sizes = extraction_service.estimate_sizes(video_info, [selector for selector, _ in format_selectors])
+
         for selector, display_name in format_selectors:
-            # Get size for this specific format
-            size_bytes = get_enhanced_video_size(url, selector)
+            size_bytes, exact = sizes[selector]
 
             # Determine confidence level
-            confidence = 'high' if size_bytes > 0 else 'low'
+            confidence = 'low' if size_bytes <= 0 else 'high' if exact else 'medium'
 
             # Format size display
             if size_bytes > 0:
@@ -571,8 +520,11 @@ def analyze_formats():
 @app.route('/api/download', methods=['POST'])
 def start_download():
     """Start video download with real-time progress tracking"""
+    return queue_video_download(request.get_json())
+
+def queue_video_download(data, download_id=None):
+    """Queue a video download; a download_id is given when resuming an interrupted job"""
     try:
-        data = request.get_json()
         url = data.get('url', '').strip()
         format_selector = data.get('format', 'best[height<=720]')
         options = data.get('options', {})
@@ -582,7 +534,8 @@ def start_download():
             return jsonify({'error': 'URL is required'}), 400
 
         # Generate download ID
-        download_id = str(int(time.time()))
+        resuming = download_id is not None
+        download_id = download_id or job_store.new_id()
 
         # Determine download directory
         if folder:
@@ -633,16 +586,25 @@ def start_download():
         # Start download in background thread
         def run_download():
             try:
+                download_progress[download_id].status = 'starting'
+                publish_progress(download_id)
+                job_store.set_state(download_id, 'starting')
+
                 import yt_dlp
 
                 # Set up yt-dlp options with progress hook
                 ydl_opts = {
                     'format': format_selector,
                     'outtmpl': output_template,
-                    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                    # The same headers as the extraction pool, so that the result extracted
+                    # when the video was analyzed is reused from the info dict cache
+                    'http_headers': {'User-Agent': USER_AGENT},
                     'extractor_retries': 3,
                     'no_check_certificate': True,
-                    'progress_hooks': [lambda d: progress_hook_wrapper(d, download_id, expected_size, storage_info)]
+                    # Continue .part files and fragment downloads left by an interrupted run
+                    'continuedl': True,
+                    'progress_hooks': [lambda d: progress_hook_wrapper(d, download_id, expected_size, storage_info)],
+                    'info_dict_cache': info_cache
                 }
 
                 # Add optional flags
@@ -675,15 +637,17 @@ def run_download():
                     del download_processes[download_id]
 
                 # Check if download was cancelled
-                if download_progress.get(download_id, {}).get('status') == 'cancelled':
+                if getattr(download_progress.get(download_id), 'status', None) == 'cancelled':
                     return
 
                 # Download completed successfully
+                job_store.set_state(download_id, 'completed')
                 download_progress[download_id] = DownloadProgress()
                 download_progress[download_id].status = 'completed'
                 download_progress[download_id].progress = 100
                 download_progress[download_id].speed = '0 MB/s'
                 download_progress[download_id].eta = '00:00'
+                publish_progress(download_id)
 
                 # Add to storage history
                 try:
@@ -732,14 +696,17 @@ def run_download():
                     del download_processes[download_id]
 
                 # Check if it was cancelled
-                if download_progress.get(download_id, {}).get('status') == 'cancelled':
+                if getattr(download_progress.get(download_id), 'status', None) == 'cancelled':
                     return
 
+                job_store.set_state(download_id, 'error', error=str(e))
+
                 download_progress[download_id] = DownloadProgress()
                 download_progress[download_id].status = 'error'
                 download_progress[download_id].progress = 0
                 download_progress[download_id].speed = '0 MB/s'
                 download_progress[download_id].eta = '00:00'
+                publish_progress(download_id)
 
                 # Better error messages
                 error_msg = str(e)
@@ -750,17 +717,26 @@ def run_download():
 
         # Initialize progress
         download_progress[download_id] = DownloadProgress()
-        download_progress[download_id].status = 'starting'
+        download_progress[download_id].status = 'queued'
         download_progress[download_id].progress = 0
+        publish_progress(download_id)
+        if resuming:
+            job_store.set_state(download_id, 'queued')
+        else:
+            job_store.create(download_id, 'video', data)
 
-        # Start download thread
-        thread = threading.Thread(target=run_download)
-        thread.daemon = True
-        thread.start()
+        # Queue the download; interactive single videos go ahead of playlists
+        try:
+            queue_position = download_scheduler.submit(download_id, run_download, url=url, priority=PRIORITY_INTERACTIVE)
+        except QueueFullError as e:
+            del download_progress[download_id]
+            job_store.set_state(download_id, 'error', error=str(e))
+            return jsonify({'error': str(e)}), 503
 
         return jsonify({
             'success': True,
             'download_id': download_id,
+            'queue_position': queue_position,
             'expected_size': expected_size,
             'expected_size_formatted': format_file_size(expected_size) if expected_size > 0 else 'Unknown',
             'storage_info': storage_info
@@ -772,8 +748,11 @@ def run_download():
 @app.route('/api/download-playlist', methods=['POST'])
 def start_playlist_download():
     """Start playlist download"""
+    return queue_playlist_download(request.get_json())
+
+def queue_playlist_download(data, download_id=None):
+    """Queue a playlist download; a download_id is given when resuming an interrupted job"""
     try:
-        data = request.get_json()
         url = data.get('url', '').strip()
         format_selector = data.get('format', 'best[height<=720]')
         options = data.get('options', {})
@@ -784,7 +763,8 @@ def start_playlist_download():
             return jsonify({'error': 'URL is required'}), 400
 
         # Generate download ID
-        download_id = str(int(time.time()))
+        resuming = download_id is not None
+        download_id = download_id or job_store.new_id()
 
         # Determine download directory
         if folder:
@@ -803,91 +783,91 @@ def start_playlist_download():
             return jsonify({'error': f'Cannot create directory: {str(e)}'}), 400
 
         def run_playlist_download():
+            partial_zip_path = None
             try:
+                set_progress(download_id, {
+                    'status': 'starting',
+                    'progress': 0,
+                    'message': 'Preparing playlist download...'
+                })
+                job_store.set_state(download_id, 'starting')
+
                 if download_type == 'zip':
-                    # Download to temporary directory first, then zip
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        temp_output = os.path.join(temp_dir, '%(playlist)s', '%(playlist_index)s - %(title)s.%(ext)s')
-                        
-                        # Build yt-dlp command for temporary download
-                        cmd = [
-                            sys.executable, '-m', 'yt_dlp',
-                            '--no-check-certificate',
-                            '-f', format_selector,
-                            '--output', temp_output,
-                            '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                            '--extractor-retries', '3'
-                        ]
-                        
+                    # Each video is moved into the archive as soon as it is finished,
+                    # so only one downloaded file is on disk besides the archive
+                    import yt_dlp
+
+                    partial_zip_path = os.path.join(download_dir, f'.{download_id}.zip.part')
+                    with tempfile.TemporaryDirectory(dir=download_dir) as temp_dir:
+                        archive = StreamingZipArchive(partial_zip_path)
+
+                        def add_to_archive(filename):
+                            archive.add_finished_files(temp_dir)
+                            set_progress(download_id, {
+                                'status': 'downloading',
+                                'progress': 0,
+                                'message': f'Added {archive.count} files to the ZIP archive...'
+                            })
+
+                        ydl_opts = {
+                            'format': format_selector,
+                            'outtmpl': os.path.join(temp_dir, '%(playlist)s', '%(playlist_index)s - %(title)s.%(ext)s'),
+                            'http_headers': {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'},
+                            'extractor_retries': 3,
+                            'nocheckcertificate': True,
+                            'quiet': True,
+                            'noprogress': True,
+                            # Same as the command line: skip entries that fail to download
+                            'ignoreerrors': 'only_download',
+                            'post_hooks': [add_to_archive]
+                        }
+
                         # Add optional flags
                         if options.get('subtitles'):
-                            cmd.extend(['--write-subs', '--sub-langs', 'en'])
+                            ydl_opts['writesubtitles'] = True
+                            ydl_opts['subtitleslangs'] = ['en']
                         if options.get('thumbnail'):
-                            cmd.append('--write-thumbnail')
+                            ydl_opts['writethumbnail'] = True
                         if options.get('extract_audio'):
-                            cmd.extend(['-x', '--audio-format', 'mp3'])
-                        
-                        cmd.append(url)
-                        
+                            ydl_opts['postprocessors'] = [{
+                                'key': 'FFmpegExtractAudio',
+                                'preferredcodec': 'mp3',
+                            }]
+
                         # Update progress
-                        download_progress[download_id] = {
+                        set_progress(download_id, {
                             'status': 'downloading',
                             'progress': 0,
                             'message': 'Downloading playlist videos...'
-                        }
-                        
-                        # Run download
-                        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd='..')
-                        download_processes[download_id] = process
-                        
-                        stdout, stderr = process.communicate()
-                        
-                        if process.returncode == 0:
-                            # Create ZIP file
-                            download_progress[download_id] = {
-                                'status': 'downloading',
-                                'progress': 50,
-                                'message': 'Creating ZIP archive...'
-                            }
-                            
-                            # Get playlist name for ZIP file
-                            playlist_name = "playlist"
-                            try:
-                                playlist_cmd = [sys.executable, '-m', 'yt_dlp', '--dump-json', '--flat-playlist', url]
-                                playlist_result = subprocess.run(playlist_cmd, capture_output=True, text=True, cwd='..')
-                                if playlist_result.returncode == 0:
-                                    lines = playlist_result.stdout.strip().split('\n')
-                                    if lines:
-                                        first_entry = json.loads(lines[0])
-                                        playlist_name = first_entry.get('playlist_title', 'playlist')
-                            except:
-                                pass
-                            
-                            # Clean playlist name for filename
-                            safe_name = re.sub(r'[<>:"/\\|?*]', '_', playlist_name)
-                            zip_filename = f"{safe_name}.zip"
-                            zip_path = os.path.join(download_dir, zip_filename)
-                            
-                            # Create ZIP
-                            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                                for root, dirs, files in os.walk(temp_dir):
-                                    for file in files:
-                                        file_path = os.path.join(root, file)
-                                        arcname = os.path.relpath(file_path, temp_dir)
-                                        zipf.write(file_path, arcname)
-                            
-
-                            download_progress[download_id] = {
-                                'status': 'completed',
-                                'progress': 100,
-                                'message': f'Playlist downloaded and zipped as {zip_filename}'
-                            }
-                        else:
-                            download_progress[download_id] = {
-                                'status': 'error',
-                                'progress': 0,
-                                'message': 'Failed to download playlist'
-                            }
+                        })
+
+                        try:
+                            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                                download_processes[download_id] = {'ydl': ydl, 'cancelled': False}
+                                playlist_info = ydl.extract_info(url)
+                            archive.add_finished_files(temp_dir)
+                        finally:
+                            archive.close()
+
+                    if not archive.count:
+                        os.remove(partial_zip_path)
+                        set_progress(download_id, {
+                            'status': 'error',
+                            'progress': 0,
+                            'message': 'Failed to download playlist'
+                        })
+                    else:
+                        # Clean playlist name for filename
+                        playlist_name = (playlist_info or {}).get('title') or 'playlist'
+                        safe_name = re.sub(r'[<>:"/\\|?*]', '_', playlist_name)
+                        zip_filename = f"{safe_name}.zip"
+                        os.replace(partial_zip_path, os.path.join(download_dir, zip_filename))
+
+                        set_progress(download_id, {
+                            'status': 'completed',
+                            'progress': 100,
+                            'message': f'Playlist downloaded and zipped as {zip_filename}'
+                        })
                 else:
                     # Individual files download
                     output_template = os.path.join(download_dir, '%(playlist)s', '%(playlist_index)s - %(title)s.%(ext)s')
@@ -912,11 +892,11 @@ def run_playlist_download():
                     cmd.append(url)
                     
                     # Update progress
-                    download_progress[download_id] = {
+                    set_progress(download_id, {
                         'status': 'downloading',
                         'progress': 0,
                         'message': 'Downloading playlist...'
-                    }
+                    })
                     
                     # Run download
                     process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd='..')
@@ -925,64 +905,72 @@ def run_playlist_download():
                     stdout, stderr = process.communicate()
                     
                     if process.returncode == 0:
-                        download_progress[download_id] = {
+                        set_progress(download_id, {
                             'status': 'completed',
                             'progress': 100,
                             'message': 'Playlist download completed!'
-                        }
+                        })
                     else:
-                        download_progress[download_id] = {
+                        set_progress(download_id, {
                             'status': 'error',
                             'progress': 0,
                             'message': f'Playlist download failed: {stderr}'
-                        }
+                        })
+
+                # Record the outcome in the job store, unless the download was cancelled meanwhile
+                outcome = progress_to_dict(download_progress[download_id])
+                if outcome['status'] != 'cancelled':
+                    job_store.set_state(
+                        download_id, outcome['status'], error=outcome['message'] if outcome['status'] == 'error' else None)
 
                 # Clean up process reference
                 if download_id in download_processes:
                     del download_processes[download_id]
 
             except Exception as e:
-                download_progress[download_id] = {
-                    'status': 'error',
-                    'progress': 0,
-                    'message': f'Playlist download failed: {str(e)}'
-                }
+                # Don't leave a partial ZIP behind in the download directory
+                if partial_zip_path and os.path.exists(partial_zip_path):
+                    try:
+                        os.remove(partial_zip_path)
+                    except OSError:
+                        pass
+                if get_progress_status(download_id) != 'cancelled':
+                    set_progress(download_id, {
+                        'status': 'error',
+                        'progress': 0,
+                        'message': f'Playlist download failed: {str(e)}'
+                    })
+                    job_store.set_state(download_id, 'error', error=str(e))
                 
                 if download_id in download_processes:
                     del download_processes[download_id]
 
         # Initialize progress
-        download_progress[download_id] = {
-            'status': 'starting',
+        set_progress(download_id, {
+            'status': 'queued',
             'progress': 0,
-            'message': 'Preparing playlist download...'
-        }
+            'message': 'Waiting in download queue...'
+        })
+        if resuming:
+            job_store.set_state(download_id, 'queued')
+        else:
+            job_store.create(download_id, 'playlist', data)
 
-        # Start download thread
-        thread = threading.Thread(target=run_playlist_download)
-        thread.daemon = True
-        thread.start()
+        # Playlists run in the bulk lane behind interactive downloads
+        try:
+            queue_position = download_scheduler.submit(download_id, run_playlist_download, url=url, priority=PRIORITY_BULK)
+        except QueueFullError as e:
+            del download_progress[download_id]
+            job_store.set_state(download_id, 'error', error=str(e))
+            return jsonify({'error': str(e)}), 503
 
-        return jsonify({'success': True, 'download_id': download_id})
+        return jsonify({'success': True, 'download_id': download_id, 'queue_position': queue_position})
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/progress/<download_id>')
-def get_progress(download_id):
-    """Get download progress"""
-    progress_obj = download_progress.get(download_id)
-
-    if progress_obj is None:
-        return jsonify({
-            'status': 'not_found',
-            'progress': 0,
-            'message': 'Download not found',
-            'speed': '0 MB/s',
-            'size': '0 MB',
-            'eta': '--:--'
-        })
-
+def progress_to_dict(progress_obj):
+    """Convert the stored progress of a download to its API representation"""
     # Handle DownloadProgress objects
     if isinstance(progress_obj, DownloadProgress):
         # Convert DownloadProgress object to dictionary
@@ -1018,12 +1006,82 @@ def get_progress(download_id):
         if 'eta' not in progress_data:
             progress_data['eta'] = '--:--'
 
-    return jsonify(progress_data)
+    return progress_data
+
+def publish_progress(download_id):
+    """Push the current progress of a download to the subscribed event streams"""
+    progress_obj = download_progress.get(download_id)
+    if progress_obj is not None:
+        progress_broker.publish(download_id, progress_to_dict(progress_obj))
+
+def get_progress_status(download_id):
+    """Status of a download, whether its progress is a DownloadProgress or a dict"""
+    progress_obj = download_progress.get(download_id)
+    if isinstance(progress_obj, DownloadProgress):
+        return progress_obj.status
+    return (progress_obj or {}).get('status')
+
+def set_progress(download_id, progress_obj):
+    """Replace the progress of a download and push it to the event streams"""
+    download_progress[download_id] = progress_obj
+    publish_progress(download_id)
+
+@app.route('/api/progress/<download_id>')
+def get_progress(download_id):
+    """Get download progress"""
+    progress_obj = download_progress.get(download_id)
+
+    if progress_obj is None:
+        return jsonify({
+            'status': 'not_found',
+            'progress': 0,
+            'message': 'Download not found',
+            'speed': '0 MB/s',
+            'size': '0 MB',
+            'eta': '--:--'
+        })
+
+    return jsonify(progress_to_dict(progress_obj))
+
+@app.route('/api/events/<client_id>')
+def progress_events(client_id):
+    """Server-Sent Events stream carrying the progress of all downloads of a client"""
+    return Response(progress_broker.stream(client_id), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/events/<client_id>/subscribe', methods=['POST'])
+def subscribe_progress_events(client_id):
+    """Add downloads to the event stream of a client"""
+    try:
+        data = request.get_json()
+        download_ids = data.get('download_ids') or [data.get('download_id')]
+
+        for download_id in filter(None, download_ids):
+            progress_broker.subscribe(client_id, download_id)
+            if get_progress_status(download_id) in TERMINAL_STATUSES:
+                publish_progress(download_id)
+
+        return jsonify({'success': True})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/stop/<download_id>', methods=['POST'])
 def stop_download(download_id):
     """Stop/cancel download"""
     try:
+        # Downloads that are still waiting in the queue are simply dropped
+        if download_scheduler.cancel(download_id):
+            download_progress[download_id] = DownloadProgress()
+            download_progress[download_id].status = 'cancelled'
+            download_progress[download_id].eta = '00:00'
+            publish_progress(download_id)
+            job_store.set_state(download_id, 'cancelled')
+
+            return jsonify({'success': True, 'message': 'Download cancelled'})
+
         if download_id in download_processes:
             process_info = download_processes[download_id]
 
@@ -1033,6 +1091,9 @@ def stop_download(download_id):
             download_progress[download_id].progress = 0
             download_progress[download_id].speed = '0 MB/s'
             download_progress[download_id].eta = '00:00'
+            publish_progress(download_id)
+
+            job_store.set_state(download_id, 'cancelled')
 
             # Set cancellation flag
             process_info['cancelled'] = True
@@ -1054,6 +1115,79 @@ def stop_download(download_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/scheduler-stats')
+def get_scheduler_stats():
+    """Get download queue depth and worker usage"""
+    return jsonify({'success': True, **download_scheduler.stats()})
+
+@app.route('/api/storage-analytics')
+def get_storage_analytics():
+    """Get download history statistics and drive usage"""
+    try:
+        limit = request.args.get('limit', 10, type=int)
+
+        # Make sure downloads that just finished are included
+        history_writer.flush()
+
+        conn = sqlite3.connect(STORAGE_DB_PATH)
+        conn.row_factory = sqlite3.Row
+        try:
+            totals = conn.execute('SELECT COUNT(*) AS count, COALESCE(SUM(file_size), 0) AS size FROM download_history').fetchone()
+
+            # Served by the download_date index instead of sorting the whole table
+            recent = conn.execute('''
+                SELECT video_title, video_url, file_path, file_size, download_date, storage_location
+                FROM download_history ORDER BY download_date DESC LIMIT ?
+            ''', (limit,)).fetchall()
+
+            # Served by the (storage_location, file_size) covering index
+            by_location = conn.execute('''
+                SELECT storage_location, COUNT(*) AS count, COALESCE(SUM(file_size), 0) AS size
+                FROM download_history GROUP BY storage_location ORDER BY size DESC
+            ''').fetchall()
+        finally:
+            conn.close()
+
+        drives = []
+        for partition in psutil.disk_partitions(all=False):
+            usage = get_disk_usage(partition.mountpoint)
+            if usage:
+                drives.append({
+                    'path': partition.mountpoint,
+                    'fstype': partition.fstype,
+                    'total_formatted': format_file_size(usage['total']),
+                    'free_formatted': format_file_size(usage['free']),
+                    'usage_percent': usage['percent']
+                })
+
+        return jsonify({
+            'success': True,
+            'analytics': {
+                'total_downloads': totals['count'],
+                'total_size': totals['size'],
+                'total_size_formatted': format_file_size(totals['size']),
+                'recent_downloads': [{
+                    'title': row['video_title'],
+                    'url': row['video_url'],
+                    'path': row['file_path'],
+                    'size': row['file_size'],
+                    'size_formatted': format_file_size(row['file_size'] or 0),
+                    'date': row['download_date'],
+                    'location': row['storage_location']
+                } for row in recent],
+                'by_location': [{
+                    'location': row['storage_location'],
+                    'count': row['count'],
+                    'size': row['size'],
+                    'size_formatted': format_file_size(row['size'])
+                } for row in by_location]
+            },
+            'drives': drives
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/storage-info')
 def get_storage_info():
     """Get storage information for download location"""
@@ -1338,50 +1472,61 @@ def stream_download():
             return jsonify({'error': 'URL is required'}), 400
 
         # Get video info first
-        cmd = [
-            sys.executable, '-m', 'yt_dlp',
-            '--no-check-certificate',
-            '--dump-json',
-            '--no-download',
-            '--format', format_selector,
-            '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            '--extractor-retries', '3',
-            url
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd='..')
-
-        if result.returncode != 0:
-            return jsonify({'error': 'Failed to get video information'}), 400
-
         try:
-            video_info = json.loads(result.stdout)
-        except json.JSONDecodeError:
-            return jsonify({'error': 'Failed to parse video information'}), 400
+            video_info = extraction_service.extract(url, format=format_selector)
+        except Exception:
+            return jsonify({'error': 'Failed to get video information'}), 400
 
-        # Get the direct video URL
-        video_url = video_info.get('url')
         title = video_info.get('title', 'video')
-        ext = video_info.get('ext', 'mp4')
-
-        if not video_url:
-            return jsonify({'error': 'Could not get direct video URL'}), 400
+        piped = not is_direct_http(video_info)
+        size, _ = estimate_format_size(video_info, video_info.get('duration'))
 
-        # Clean title for filename
-        safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
-        filename = f"{safe_title}.{ext}"
+        # The browser downloads through the server, which also handles formats
+        # that have no single direct URL (HLS/DASH, separate video and audio)
+        token = stream_registry.register(url, format_selector)
 
         return jsonify({
             'success': True,
-            'download_url': video_url,
-            'filename': filename,
+            'download_url': f'/api/stream/{token}',
+            'filename': stream_filename(title, stream_ext(video_info, piped)),
             'title': title,
-            'size': video_info.get('filesize') or video_info.get('filesize_approx', 0)
+            'size': size,
+            'supports_range': not piped
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/stream/<token>')
+def stream_media(token):
+    """Stream a registered download to the browser, with Range support for progressive formats"""
+    try:
+        stream = stream_registry.get(token)
+        if not stream:
+            return jsonify({'error': 'Download link expired'}), 404
+
+        try:
+            video_info = extraction_service.extract(stream['url'], format=stream['format'])
+        except Exception:
+            return jsonify({'error': 'Failed to get video information'}), 400
+
+        piped = not is_direct_http(video_info)
+        filename = stream_filename(video_info.get('title', 'video'), stream_ext(video_info, piped))
+        headers = {'Content-Disposition': f"attachment; filename*=UTF-8''{quote(filename)}"}
+
+        if piped:
+            status, body = 200, pipe_download(video_info, stream['format'])
+            headers.update({'Content-Type': 'application/octet-stream', 'Accept-Ranges': 'none'})
+        else:
+            with extraction_service.acquire() as ydl:
+                status, proxy_headers, body = proxy_http(ydl, video_info, request.headers.get('Range'))
+            headers.update(proxy_headers)
+
+        return Response(body, status=status, headers=headers, direct_passthrough=True)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/stream-playlist-download', methods=['POST'])
 def stream_playlist_download():
     """Stream playlist download for browser download"""
@@ -1395,36 +1540,20 @@ def stream_playlist_download():
             return jsonify({'error': 'URL is required'}), 400
 
         # Get playlist info first
-        playlist_cmd = [
-            sys.executable, '-m', 'yt_dlp',
-            '--no-check-certificate',
-            '--dump-json',
-            '--no-download',
-            '--flat-playlist',
-            '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            '--extractor-retries', '3',
-            url
-        ]
-
-        playlist_result = subprocess.run(playlist_cmd, capture_output=True, text=True, cwd='..')
-
-        if playlist_result.returncode != 0:
+        try:
+            playlist_result = extraction_service.extract(url, extract_flat='in_playlist')
+        except Exception:
             return jsonify({'error': 'Failed to get playlist information'}), 400
 
         try:
-            lines = [line.strip() for line in playlist_result.stdout.strip().split('\n') if line.strip()]
-            video_count = len(lines)
-            
+            entries = (playlist_result.get('entries') or []) if playlist_result.get('_type') == 'playlist' else [playlist_result]
+            video_count = len(entries)
+
             if video_count == 0:
                 return jsonify({'error': 'No videos found in playlist'}), 400
 
             # Get playlist title
-            playlist_title = "playlist"
-            try:
-                first_entry = json.loads(lines[0]) if lines else {}
-                playlist_title = first_entry.get('playlist_title', 'playlist')
-            except:
-                pass
+            playlist_title = playlist_result.get('title') or 'playlist'
 
             # Clean playlist name for filename
             safe_title = re.sub(r'[<>:"/\\|?*]', '_', playlist_title)
@@ -1443,7 +1572,22 @@ def stream_playlist_download():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def resume_interrupted_jobs():
+    """Queue the downloads that were interrupted by the last shutdown again"""
+    with app.app_context():
+        for job in job_store.interrupted():
+            if job['attempts'] >= MAX_RESUME_ATTEMPTS:
+                job_store.set_state(job['id'], 'error', error='Gave up resuming after repeated interruptions')
+                continue
+            resume_point = f" from fragment {job['fragment_index']}" if job['fragment_index'] else ''
+            print(f"Resuming interrupted download {job['id']}{resume_point}")
+            queue_download = queue_playlist_download if job['kind'] == 'playlist' else queue_video_download
+            queue_download(job['request'], download_id=job['id'])
+
 if __name__ == '__main__':
     print("Starting YouTube Downloader Pro Server...")
     print("Access the interface at: http://localhost:5000")
+    # With the debug reloader, only the serving child process resumes jobs
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        resume_interrupted_jobs()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,152 @@
+"""
+YouTube Downloader Pro - Proxied browser downloads
+Streams media through the server instead of handing raw media URLs to the browser
+"""
+
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yt_dlp.downloader import FFmpegFD, get_suitable_downloader
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import HTTPError
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper bound of what is held in memory per stream; the client pulling the
+# response is what drives reading from upstream, so a slow client slows the source
+CHUNK_SIZE = 256 * 1024
+
+FORWARDED_HEADERS = ('Content-Length', 'Content-Range', 'Content-Type', 'Last-Modified', 'ETag')
+
+
+def is_direct_http(fmt):
+    """Whether a selected format is a single progressive file that can be proxied as-is"""
+    return (not fmt.get('requested_formats') and bool(fmt.get('url'))
+            and fmt.get('protocol', 'https') in ('http', 'https'))
+
+
+def stream_ext(fmt, piped):
+    """Extension of what is streamed for a selected format
+
+    Piped output is what yt-dlp writes to stdout: ffmpeg writes mp4 output as MPEG-TS,
+    and HLS is always streamed as MPEG-TS. The native downloaders of other protocols
+    (e.g. DASH, which produces fragmented MP4) write the format as it is
+    """
+    ext = fmt.get('ext', 'mp4')
+    if not piped:
+        return ext
+    protocols = (fmt.get('protocol') or '').split('+')
+    if all(protocol.startswith('m3u8') for protocol in protocols):
+        return 'ts'
+    if ext == 'mp4' and get_suitable_downloader(dict(fmt), to_stdout=True) is FFmpegFD:
+        return 'ts'
+    return ext
+
+
+def stream_filename(title, ext):
+    """Filename for the browser"""
+    safe_title = ''.join('_' if char in '<>:"/\\|?*' else char for char in title)
+    return f'{safe_title}.{ext}'
+
+
+class StreamRegistry:
+    """Short-lived tokens mapping proxied download URLs to what they should stream"""
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def register(self, url, format_selector):
+        token = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._lock:
+            self._streams = {key: value for key, value in self._streams.items() if value['expires'] > now}
+            self._streams[token] = {'url': url, 'format': format_selector, 'expires': now + self.ttl}
+        return token
+
+    def get(self, token):
+        with self._lock:
+            stream = self._streams.get(token)
+        if stream and stream['expires'] > time.time():
+            return stream
+        return None
+
+
+def _iter_response(response):
+    try:
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        response.close()
+
+
+def proxy_http(ydl, fmt, range_header=None):
+    """Proxy a progressive format, passing the client's Range header upstream
+
+    Returns (status, headers, body iterator)
+    """
+    headers = dict(fmt.get('http_headers') or {})
+    if range_header:
+        headers['Range'] = range_header
+    try:
+        response = ydl.urlopen(Request(fmt['url'], headers=headers))
+    except HTTPError as e:
+        e.response.close()
+        return e.status, {'Accept-Ranges': 'bytes'}, iter(())
+
+    response_headers = {'Accept-Ranges': 'bytes'}
+    for name in FORWARDED_HEADERS:
+        if response.headers.get(name):
+            response_headers[name] = response.headers[name]
+    return response.status, response_headers, _iter_response(response)
+
+
+def pipe_download(info, format_selector):
+    """Download with yt-dlp to stdout and stream its output
+
+    Covers fragmented (HLS/DASH) formats and live remuxing of separate video and
+    audio streams. The already extracted info is passed to yt-dlp, so the site
+    is not extracted again. Returns the body iterator
+    """
+    def generate():
+        # Nothing is started before the response is read, since a generator that
+        # is closed before its first step does not run its cleanup
+        with tempfile.NamedTemporaryFile('w', suffix='.info.json', delete=False, encoding='utf-8') as info_file:
+            json.dump(info, info_file)
+        process = None
+        try:
+            process = subprocess.Popen([
+                sys.executable, '-m', 'yt_dlp',
+                '--load-info-json', info_file.name,
+                '--format', format_selector,
+                '--output', '-',
+                '--quiet', '--no-progress',
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=ROOT_DIR)
+            while True:
+                chunk = process.stdout.read1(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            if process is not None:
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+            os.remove(info_file.name)
+
+    return generate()
+
+
+stream_registry = StreamRegistry()
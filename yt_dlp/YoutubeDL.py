@@ -1,4 +1,5 @@
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime as dt
@@ -10,7 +11,6 @@
 import itertools
 import json
 import locale
-import operator
 import os
 import random
 import re
@@ -19,11 +19,12 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tokenize
 import traceback
-import unicodedata
 
+from .archive import open_download_archive
 from .cache import Cache
 from .compat import urllib  # isort: split
 from .compat import urllib_req_to_req
@@ -31,6 +32,7 @@
 from .downloader import FFmpegFD, get_suitable_downloader, shorten_protocol_name
 from .downloader.rtmp import rtmpdump_version
 from .extractor import gen_extractor_classes, get_info_extractor, import_extractors
+from .extractor._dispatch import ExtractorDispatcher
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
 from .globals import (
@@ -62,6 +64,7 @@
     FFmpegFixupM4aPP,
     FFmpegFixupStretchedPP,
     FFmpegFixupTimestampPP,
+    FFmpegFusedPP,
     FFmpegMergerPP,
     FFmpegPostProcessor,
     FFmpegVideoConvertorPP,
@@ -82,11 +85,9 @@
     LINK_TEMPLATES,
     MEDIA_EXTENSIONS,
     NO_DEFAULT,
-    NUMBER_RE,
     OUTTMPL_TYPES,
     POSTPROCESS_WHEN,
     STR_FORMAT_RE_TMPL,
-    STR_FORMAT_TYPES,
     ContentTooShortError,
     DateRange,
     DownloadCancelled,
@@ -117,11 +118,9 @@
     determine_ext,
     determine_protocol,
     encode_compat_str,
-    escapeHTML,
     expand_path,
     extract_basic_auth,
     filter_dict,
-    float_or_none,
     format_bytes,
     format_decimal_suffix,
     format_field,
@@ -132,13 +131,11 @@
     iri_to_uri,
     is_path_like,
     join_nonempty,
-    locked_file,
     make_archive_id,
     make_dir,
     number_of_digits,
     orderedSet,
     orderedSet_from_options,
-    parse_filesize,
     preferredencoding,
     prepend_extension,
     remove_terminal_sequences,
@@ -149,7 +146,6 @@
     sanitize_url,
     shell_quote,
     str_or_none,
-    strftime_or_none,
     subtitles_filename,
     supports_terminal_sequences,
     system_identifier,
@@ -165,13 +161,14 @@
     write_json_file,
     write_string,
 )
-from .utils._utils import _UnsafeExtensionError, _YDLLogger, _ProgressState
+from .utils._utils import _UnsafeExtensionError, _YDLLogger, _ProgressState, _compile_format_filter
 from .utils.networking import (
     HTTPHeaderDict,
     clean_headers,
     clean_proxies,
     std_headers,
 )
+from .utils.outtmpl import OutputTemplate
 from .version import CHANNEL, ORIGIN, RELEASE_GIT_HEAD, VARIANT, __version__
 
 if os.name == 'nt':
@@ -289,6 +286,9 @@ class YoutubeDL:
     playlist_items:    Specific indices of playlist to download.
     playlistrandom:    Download playlist items in random order.
     lazy_playlist:     Process playlist entries as they are received.
+    concurrent_playlist_entries: Number of upcoming playlist entries to extract
+                       in the background while the current one is processed.
+                       Entries are still processed one at a time, in order
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            A class having a `debug`, `warning` and `error` function where
@@ -325,6 +325,9 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    info_dict_cache:   A yt_dlp.cache.InfoDictCache instance used to reuse the
+                       results of previous extractions of the same URL.
+                       Only share it between instances with the same options
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -337,7 +340,10 @@ class YoutubeDL:
                        downloaded.
                        Videos without view count information are always
                        downloaded. None for no limit.
-    download_archive:  A set, or the name of a file where all downloads are recorded.
+    download_archive:  A set, a yt_dlp.archive.DownloadArchive, or the name of a file
+                       where all downloads are recorded. SQLite databases, and new
+                       files ending in .sqlite, .sqlite3 or .db, are indexed SQLite
+                       archives; others are text files with one ID per line.
                        Videos already present in the file are not downloaded again.
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
@@ -508,7 +514,8 @@ class YoutubeDL:
     nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
     continuedl, xattr_set_filesize, hls_use_mpegts, http_chunk_size,
-    external_downloader_args, concurrent_fragment_downloads, progress_delta.
+    external_downloader_args, concurrent_fragment_downloads, fragment_buffer_size,
+    progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg/avconv binary; either the path
@@ -636,6 +643,8 @@ def __init__(self, params=None, auto_init=True):
         self.params = params
         self._ies = {}
         self._ies_instances = {}
+        self._ie_dispatcher = None
+        self._prefetched_entries = {}
         self._pps = {k: [] for k in POSTPROCESS_WHEN}
         self._printed_messages = set()
         self._first_webpage_request = True
@@ -826,25 +835,18 @@ def check_deprecated(param, option, suggestion):
                 get_postprocessor(pp_def.pop('key'))(self, **pp_def),
                 when=when)
 
-        def preload_download_archive(fn):
-            """Preload the archive, if any is specified"""
-            archive = set()
-            if fn is None:
-                return archive
-            elif not is_path_like(fn):
-                return fn
-
-            self.write_debug(f'Loading archive file {fn!r}')
-            try:
-                with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                    for line in archive_file:
-                        archive.add(line.strip())
-            except OSError as ioe:
-                if ioe.errno != errno.ENOENT:
-                    raise
-            return archive
-
-        self.archive = preload_download_archive(self.params.get('download_archive'))
+        download_archive = self.params.get('download_archive')
+        if is_path_like(download_archive):
+            self.write_debug(f'Using archive file {download_archive!r}')
+        try:
+            self.archive = open_download_archive(download_archive)
+        except ImportError as e:
+            msg = f'Unable to open download archive {download_archive!r}: {e}'
+            self.report_error(msg)
+            raise DownloadError(msg) from e
+        # Archives that were passed in are left open for the caller
+        if self.archive is not None and self.archive is not download_archive:
+            self.add_close_hook(self.archive.close)
 
     def warn_if_short_id(self, argv):
         # short YouTube ID starting with dash?
@@ -864,6 +866,8 @@ def warn_if_short_id(self, argv):
     def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         ie_key = ie.ie_key()
+        if self._ie_dispatcher and not self._ie_dispatcher.indexes(ie_key, ie):
+            self._ie_dispatcher = None
         self._ies[ie_key] = ie
         if not isinstance(ie, type):
             self._ies_instances[ie_key] = ie
@@ -881,6 +885,15 @@ def get_info_extractor(self, ie_key):
             self.add_info_extractor(ie)
         return ie
 
+    def _suitable_ies(self, url):
+        """Yield (ie_key, ie) for the extractors suitable for the URL, in order"""
+        if self._ie_dispatcher is None:
+            self._ie_dispatcher = ExtractorDispatcher(self._ies)
+        for ie_key in self._ie_dispatcher.candidates(url):
+            ie = self._ies[ie_key]
+            if ie.suitable(url):
+                yield ie_key, ie
+
     def add_default_info_extractors(self):
         """
         Add the InfoExtractors returned by gen_extractors to the end of the list
@@ -1195,10 +1208,7 @@ def _outtmpl_expandpath(outtmpl):
     @staticmethod
     def escape_outtmpl(outtmpl):
         """ Escape any remaining strings like %s, %abc% etc. """
-        return re.sub(
-            STR_FORMAT_RE_TMPL.format('', '(?![%(\0])'),
-            lambda mobj: ('' if mobj.group('has_key') else '%') + mobj.group(0),
-            outtmpl)
+        return OutputTemplate.escape(outtmpl)
 
     @classmethod
     def validate_outtmpl(cls, outtmpl):
@@ -1245,97 +1255,6 @@ def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
             'autonumber': self.params.get('autonumber_size') or 5,
         }
 
-        TMPL_DICT = {}
-        EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
-        MATH_FUNCTIONS = {
-            '+': float.__add__,
-            '-': float.__sub__,
-            '*': float.__mul__,
-        }
-        # Field is of the form key1.key2...
-        # where keys (except first) can be string, int, slice or "{field, ...}"
-        FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
-        FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
-            'inner': FIELD_INNER_RE,
-            'field': rf'\w*(?:\.{FIELD_INNER_RE})*',
-        }
-        MATH_FIELD_RE = rf'(?:{FIELD_RE}|-?{NUMBER_RE})'
-        MATH_OPERATORS_RE = r'(?:{})'.format('|'.join(map(re.escape, MATH_FUNCTIONS.keys())))
-        INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
-            (?P<negate>-)?
-            (?P<fields>{FIELD_RE})
-            (?P<maths>(?:{MATH_OPERATORS_RE}{MATH_FIELD_RE})*)
-            (?:>(?P<strf_format>.+?))?
-            (?P<remaining>
-                (?P<alternate>(?<!\\),[^|&)]+)?
-                (?:&(?P<replacement>.*?))?
-                (?:\|(?P<default>.*?))?
-            )$''')
-
-        def _from_user_input(field):
-            if field == ':':
-                return ...
-            elif ':' in field:
-                return slice(*map(int_or_none, field.split(':')))
-            elif int_or_none(field) is not None:
-                return int(field)
-            return field
-
-        def _traverse_infodict(fields):
-            fields = [f for x in re.split(r'\.({.+?})\.?', fields)
-                      for f in ([x] if x.startswith('{') else x.split('.'))]
-            for i in (0, -1):
-                if fields and not fields[i]:
-                    fields.pop(i)
-
-            for i, f in enumerate(fields):
-                if not f.startswith('{'):
-                    fields[i] = _from_user_input(f)
-                    continue
-                assert f.endswith('}'), f'No closing brace for {f} in {fields}'
-                fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
-
-            return traverse_obj(info_dict, fields, traverse_string=True)
-
-        def get_value(mdict):
-            # Object traversal
-            value = _traverse_infodict(mdict['fields'])
-            # Negative
-            if mdict['negate']:
-                value = float_or_none(value)
-                if value is not None:
-                    value *= -1
-            # Do maths
-            offset_key = mdict['maths']
-            if offset_key:
-                value = float_or_none(value)
-                operator = None
-                while offset_key:
-                    item = re.match(
-                        MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
-                        offset_key).group(0)
-                    offset_key = offset_key[len(item):]
-                    if operator is None:
-                        operator = MATH_FUNCTIONS[item]
-                        continue
-                    item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
-                    offset = float_or_none(item)
-                    if offset is None:
-                        offset = float_or_none(_traverse_infodict(item))
-                    try:
-                        value = operator(value, multiplier * offset)
-                    except (TypeError, ZeroDivisionError):
-                        return None
-                    operator = None
-            # Datetime formatting
-            if mdict['strf_format']:
-                value = strftime_or_none(value, mdict['strf_format'].replace('\\,', ','))
-
-            # XXX: Workaround for https://github.com/yt-dlp/yt-dlp/issues/4485
-            if sanitize and value == '':
-                value = None
-            return value
-
         na = self.params.get('outtmpl_na_placeholder', 'NA')
 
         def filename_sanitizer(key, value, restricted):
@@ -1356,100 +1275,8 @@ def sanitize(key, value):
             def sanitize(key, value):
                 return filename_sanitizer(key, value, restricted=self.params.get('restrictfilenames'))
 
-        def _dumpjson_default(obj):
-            if isinstance(obj, (set, LazyList)):
-                return list(obj)
-            return repr(obj)
-
-        class _ReplacementFormatter(string.Formatter):
-            def get_field(self, field_name, args, kwargs):
-                if field_name.isdigit():
-                    return args[0], -1
-                raise ValueError('Unsupported field')
-
-        replacement_formatter = _ReplacementFormatter()
-
-        def create_key(outer_mobj):
-            if not outer_mobj.group('has_key'):
-                return outer_mobj.group(0)
-            key = outer_mobj.group('key')
-            mobj = re.match(INTERNAL_FORMAT_RE, key)
-            value, replacement, default, last_field = None, None, na, ''
-            while mobj:
-                mobj = mobj.groupdict()
-                default = mobj['default'] if mobj['default'] is not None else default
-                value = get_value(mobj)
-                last_field, replacement = mobj['fields'], mobj['replacement']
-                if value is None and mobj['alternate']:
-                    mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
-                else:
-                    break
-
-            if None not in (value, replacement):
-                try:
-                    value = replacement_formatter.format(replacement, value)
-                except ValueError:
-                    value, default = None, na
-
-            fmt = outer_mobj.group('format')
-            if fmt == 's' and last_field in field_size_compat_map and isinstance(value, int):
-                fmt = f'0{field_size_compat_map[last_field]:d}d'
-
-            flags = outer_mobj.group('conversion') or ''
-            str_fmt = f'{fmt[:-1]}s'
-            if value is None:
-                value, fmt = default, 's'
-            elif fmt[-1] == 'l':  # list
-                delim = '\n' if '#' in flags else ', '
-                value, fmt = delim.join(map(str, variadic(value, allowed_types=(str, bytes)))), str_fmt
-            elif fmt[-1] == 'j':  # json
-                value, fmt = json.dumps(
-                    value, default=_dumpjson_default,
-                    indent=4 if '#' in flags else None, ensure_ascii='+' not in flags), str_fmt
-            elif fmt[-1] == 'h':  # html
-                value, fmt = escapeHTML(str(value)), str_fmt
-            elif fmt[-1] == 'q':  # quoted
-                value = map(str, variadic(value) if '#' in flags else [value])
-                value, fmt = shell_quote(value, shell=True), str_fmt
-            elif fmt[-1] == 'B':  # bytes
-                value = f'%{str_fmt}'.encode() % str(value).encode()
-                value, fmt = value.decode('utf-8', 'ignore'), 's'
-            elif fmt[-1] == 'U':  # unicode normalized
-                value, fmt = unicodedata.normalize(
-                    # "+" = compatibility equivalence, "#" = NFD
-                    'NF{}{}'.format('K' if '+' in flags else '', 'D' if '#' in flags else 'C'),
-                    value), str_fmt
-            elif fmt[-1] == 'D':  # decimal suffix
-                num_fmt, fmt = fmt[:-1].replace('#', ''), 's'
-                value = format_decimal_suffix(value, f'%{num_fmt}f%s' if num_fmt else '%d%s',
-                                              factor=1024 if '#' in flags else 1000)
-            elif fmt[-1] == 'S':  # filename sanitization
-                value, fmt = filename_sanitizer(last_field, value, restricted='#' in flags), str_fmt
-            elif fmt[-1] == 'c':
-                if value:
-                    value = str(value)[0]
-                else:
-                    fmt = str_fmt
-            elif fmt[-1] not in 'rsa':  # numeric
-                value = float_or_none(value)
-                if value is None:
-                    value, fmt = default, 's'
-
-            if sanitize:
-                # If value is an object, sanitize might convert it to a string
-                # So we manually convert it before sanitizing
-                if fmt[-1] == 'r':
-                    value, fmt = repr(value), str_fmt
-                elif fmt[-1] == 'a':
-                    value, fmt = ascii(value), str_fmt
-                if fmt[-1] in 'csra':
-                    value = sanitize(last_field, value)
-
-            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format'))
-            TMPL_DICT[key] = value
-            return '{prefix}%({key}){fmt}'.format(key=key, fmt=fmt, prefix=outer_mobj.group('prefix'))
-
-        return EXTERNAL_FORMAT_RE.sub(create_key, outtmpl), TMPL_DICT
+        return OutputTemplate.compile(outtmpl).substitute(
+            info_dict, na=na, sanitize=sanitize, filename_sanitizer=filename_sanitizer, field_sizes=field_size_compat_map.get)
 
     def evaluate_outtmpl(self, outtmpl, info_dict, *args, **kwargs):
         outtmpl, info_dict = self.prepare_outtmpl(outtmpl, info_dict, *args, **kwargs)
@@ -1629,14 +1456,11 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
             ie_key = 'Generic'
 
         if ie_key:
-            ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
+            ies = [(ie_key, self._ies[ie_key])] if ie_key in self._ies and self._ies[ie_key].suitable(url) else []
         else:
-            ies = self._ies
-
-        for key, ie in ies.items():
-            if not ie.suitable(url):
-                continue
+            ies = self._suitable_ies(url)
 
+        for key, ie in ies:
             if not ie.working():
                 self.report_warning('The program functionality for this site has been marked as broken, '
                                     'and will probably not work.')
@@ -1789,18 +1613,51 @@ def _apply_header_cookies(self, url, cookies=None):
             cookie.domain = f'.{parsed.hostname}'
             self.cookiejar.set_cookie(cookie)
 
+    # Params that can change the result of an extraction
+    _EXTRACTION_PARAMS = (
+        'noplaylist', 'extractor_args', 'http_headers', 'cookiefile', 'cookiesfrombrowser',
+        'username', 'password', 'twofactor', 'videopassword', 'usenetrc', 'netrc_location', 'netrc_cmd',
+        'ap_mso', 'ap_username', 'ap_password', 'client_certificate', 'client_certificate_key',
+        'proxy', 'geo_verification_proxy', 'source_address', 'impersonate',
+        'geo_bypass', 'geo_bypass_country', 'geo_bypass_ip_block', 'age_limit',
+        'getcomments', 'writesubtitles', 'writeautomaticsub', 'allsubtitles', 'listsubtitles',
+        'allow_unplayable_formats', 'ignore_no_formats_error', 'dynamic_mpd', 'hls_split_discontinuity',
+        'youtube_include_dash_manifest', 'youtube_include_hls_manifest', 'mark_watched',
+    )
+
+    def _info_dict_cache_key(self, url):
+        """The key of the extraction of `url` in the info_dict_cache
+
+        URLs with the same video id can still give different results (e.g. a
+        start time or a playlist), and so can the options, so both are part of it
+        """
+        url = sanitize_url(url, scheme='http' if self.params.get('prefer_insecure') else 'https')
+        header_cookies = sorted((cookie.name, cookie.value) for cookie in self.__header_cookies)
+        return url, repr((*(self.params.get(param) for param in self._EXTRACTION_PARAMS), header_cookies))
+
     @_handle_extraction_exceptions
     def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
-        try:
-            ie_result = ie.extract(url)
-        except UserNotLive as e:
-            if process:
-                if self.params.get('wait_for_video'):
-                    self.report_warning(e)
-                self._wait_for_video()
-            raise
+        info_cache = self.params.get('info_dict_cache')
+        cache_key = self._info_dict_cache_key(url) if info_cache is not None else None
+        ie_result = info_cache.get(ie.ie_key(), cache_key) if cache_key is not None else None
+        if ie_result is not None:
+            self.write_debug(f'Loaded {ie.ie_key()} result for {url} from info dict cache')
+        else:
+            prefetched = self._prefetched_entries.pop((ie.ie_key(), url), None)
+            try:
+                ie_result = prefetched.result() if prefetched else ie.extract(url)
+            except UserNotLive as e:
+                if process:
+                    if self.params.get('wait_for_video'):
+                        self.report_warning(e)
+                    self._wait_for_video()
+                raise
+            if (cache_key is not None and isinstance(ie_result, dict)
+                    and ie_result.get('_type', 'video') == 'video'
+                    and ie_result.get('live_status') != 'is_upcoming'):
+                info_cache.store(ie.ie_key(), cache_key, ie_result)
         if ie_result is None:  # Finished already (backwards compatibility; listformats and friends should be moved here)
             self.report_warning(f'Extractor {ie.IE_NAME} returned nothing{bug_reports_message()}')
             return
@@ -2064,6 +1921,20 @@ def __process_playlist(self, ie_result, download):
         if keep_resolved_entries:
             self.write_debug('The information of all playlist entries will be held in memory')
 
+        def entry_info(i, playlist_index, entry):
+            if not lazy and 'playlist-index' in self.params['compat_opts']:
+                playlist_index = ie_result['requested_entries'][i]
+            return playlist_index, collections.ChainMap(entry, {
+                **common_info,
+                'n_entries': int_or_none(n_entries),
+                'playlist_index': playlist_index,
+                'playlist_autonumber': i + 1,
+            })
+
+        workers = self.params.get('concurrent_playlist_entries') or 1
+        if workers > 1 and self.params.get('extract_flat') not in (True, 'in_playlist'):
+            entries = self.__prefetch_playlist_entries(entries, workers, entry_info)
+
         failures = 0
         max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
         for i, (playlist_index, entry) in enumerate(entries):
@@ -2073,15 +1944,7 @@ def __process_playlist(self, ie_result, download):
                 continue
 
             entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
-            if not lazy and 'playlist-index' in self.params['compat_opts']:
-                playlist_index = ie_result['requested_entries'][i]
-
-            entry_copy = collections.ChainMap(entry, {
-                **common_info,
-                'n_entries': int_or_none(n_entries),
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            })
+            playlist_index, entry_copy = entry_info(i, playlist_index, entry)
 
             if self._match_entry(entry_copy, incomplete=True) is not None:
                 # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
@@ -2122,6 +1985,80 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Finished downloading playlist: {title}')
         return ie_result
 
+    def __prefetch_playlist_entries(self, entries, workers, entry_info):
+        """Yield the playlist entries, extracting the next `workers` of them in the background
+
+        Only the extraction is done ahead of time; the results are picked up by
+        __extract_info when the entry is processed, so that entries are still
+        processed and downloaded one at a time and in order. Entries that the
+        playlist loop would skip with the incomplete match filter are not prefetched.
+
+        The extractors run on the worker threads against this (shared) YoutubeDL instance.
+        This relies on the parts of it that extractors use being safe to call concurrently:
+        the request director and cookiejar (which has its own lock), the cache (one file per key),
+        and the output/only_once helpers (a whole line per write; set additions are atomic).
+        Anything that is not, like applying the header cookies of the URL, is done on the calling thread.
+        """
+        local = threading.local()
+        window, submitted = collections.deque(), set()
+        executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='playlist-entry')
+        try:
+            for i, item in enumerate(entries):
+                key = self.__submit_prefetch(executor, *item, local, lambda: entry_info(i, *item)[1])
+                if key:
+                    submitted.add(key)
+                window.append(item)
+                if len(window) > workers:
+                    yield window.popleft()
+            while window:
+                yield window.popleft()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            for key in submitted:
+                self._prefetched_entries.pop(key, None)
+
+    def __submit_prefetch(self, executor, playlist_index, entry, local, get_entry_info):
+        """Start extracting an unresolved playlist entry the way process_ie_result would"""
+        if not entry or entry.get('_type') not in ('url', 'url_transparent'):
+            return None
+        url = sanitize_url(entry['url'], scheme='http' if self.params.get('prefer_insecure') else 'https')
+        ie_key = entry.get('ie_key')
+        if ie_key:
+            ie = self._ies.get(ie_key)
+            if not ie or not ie.suitable(url):
+                return None
+        else:
+            ie_key, ie = next(self._suitable_ies(url), (None, None))
+            if not ie:
+                return None
+        temp_id = ie.get_temp_id(url)
+        if temp_id is not None and self.in_download_archive({'id': temp_id, 'ie_key': ie_key}):
+            return None
+        try:
+            if self._match_entry(get_entry_info(), incomplete=True, silent=True) is not None:
+                return None
+        except DownloadCancelled:
+            # The playlist loop raises it again when it reaches the entry
+            return None
+        key = (ie_key, url)
+        if key not in self._prefetched_entries:
+            self._apply_header_cookies(url)
+            self._prefetched_entries[key] = executor.submit(
+                self.__prefetch_extract, ie if isinstance(ie, type) else type(ie), url, local)
+        return key
+
+    def __prefetch_extract(self, ie_class, url, local):
+        # Every worker thread uses its own extractor instances, and keeps them warm across entries
+        ies = local.__dict__.setdefault('ies', {})
+        ie = ies.get(ie_class) or ie_class(self)
+        ies[ie_class] = ie
+        ie_result = ie.extract(url)
+        if isinstance(ie_result, dict) and not isinstance(ie_result.get('entries'), (list, type(None))):
+            # Lazy entries stay bound to this instance and are evaluated later on the main thread,
+            # so give it up instead of using it for the next extraction on this worker
+            del ies[ie_class]
+        return ie_result
+
     @_handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
@@ -2129,70 +2066,7 @@ def __process_iterable_entry(self, entry, download, extra_info):
 
     def _build_format_filter(self, filter_spec):
         " Returns a function to filter the formats according to the filter_spec "
-
-        OPERATORS = {
-            '<': operator.lt,
-            '<=': operator.le,
-            '>': operator.gt,
-            '>=': operator.ge,
-            '=': operator.eq,
-            '!=': operator.ne,
-        }
-        operator_rex = re.compile(r'''(?x)\s*
-            (?P<key>[\w.-]+)\s*
-            (?P<op>{})(?P<none_inclusive>\s*\?)?\s*
-            (?P<value>[0-9.]+(?:[kKmMgGtTpPeEzZyY]i?[Bb]?)?)\s*
-            '''.format('|'.join(map(re.escape, OPERATORS.keys()))))
-        m = operator_rex.fullmatch(filter_spec)
-        if m:
-            try:
-                comparison_value = float(m.group('value'))
-            except ValueError:
-                comparison_value = parse_filesize(m.group('value'))
-                if comparison_value is None:
-                    comparison_value = parse_filesize(m.group('value') + 'B')
-                if comparison_value is None:
-                    raise ValueError(
-                        'Invalid value {!r} in format specification {!r}'.format(
-                            m.group('value'), filter_spec))
-            op = OPERATORS[m.group('op')]
-
-        if not m:
-            STR_OPERATORS = {
-                '=': operator.eq,
-                '^=': lambda attr, value: attr.startswith(value),
-                '$=': lambda attr, value: attr.endswith(value),
-                '*=': lambda attr, value: value in attr,
-                '~=': lambda attr, value: value.search(attr) is not None,
-            }
-            str_operator_rex = re.compile(r'''(?x)\s*
-                (?P<key>[a-zA-Z0-9._-]+)\s*
-                (?P<negation>!\s*)?(?P<op>{})\s*(?P<none_inclusive>\?\s*)?
-                (?P<quote>["'])?
-                (?P<value>(?(quote)(?:(?!(?P=quote))[^\\]|\\.)+|[\w.-]+))
-                (?(quote)(?P=quote))\s*
-                '''.format('|'.join(map(re.escape, STR_OPERATORS.keys()))))
-            m = str_operator_rex.fullmatch(filter_spec)
-            if m:
-                if m.group('op') == '~=':
-                    comparison_value = re.compile(m.group('value'))
-                else:
-                    comparison_value = re.sub(r'''\\([\\"'])''', r'\1', m.group('value'))
-                str_op = STR_OPERATORS[m.group('op')]
-                if m.group('negation'):
-                    op = lambda attr, value: not str_op(attr, value)
-                else:
-                    op = str_op
-
-        if not m:
-            raise SyntaxError(f'Invalid filter specification {filter_spec!r}')
-
-        def _filter(f):
-            actual_value = f.get(m.group('key'))
-            if actual_value is None:
-                return m.group('none_inclusive')
-            return op(actual_value, comparison_value)
-        return _filter
+        return _compile_format_filter(filter_spec)
 
     def _check_formats(self, formats):
         for f in formats:
@@ -3732,12 +3606,22 @@ def actual_post_extract(info_dict):
 
         actual_post_extract(info_dict or {})
 
-    def run_pp(self, pp, infodict):
+    def run_pp(self, pp, infodict, *, fused_pp=None):
+        """Run pp, or add its changes to the pending pass of fused_pp
+
+        With fused_pp, None is returned if pp has to be run by itself
+        """
         files_to_delete = []
         if '__files_to_move' not in infodict:
             infodict['__files_to_move'] = {}
         try:
-            files_to_delete, infodict = pp.run(infodict)
+            if fused_pp is None:
+                files_to_delete, infodict = pp.run(infodict)
+            else:
+                ret = fused_pp.add(pp, infodict)
+                if ret is NotImplemented:
+                    return None
+                files_to_delete, infodict = ret
         except PostProcessingError as e:
             # Must be True and not 'only_download'
             if self.params.get('ignoreerrors') is True:
@@ -3758,8 +3642,22 @@ def run_pp(self, pp, infodict):
     def run_all_pps(self, key, info, *, additional_pps=None):
         if key != 'video':
             self._forceprint(key, info)
+        fused_pp = None
+        if key == 'post_process' and 'no-fused-postprocessors' not in self.params['compat_opts']:
+            # Stream copies of consecutive PPs are written out in a single ffmpeg pass
+            fused_pp = FFmpegFusedPP(self)
         for pp in (additional_pps or []) + self._pps[key]:
+            if fused_pp is not None:
+                fused_info = self.run_pp(pp, info, fused_pp=fused_pp)
+                if fused_info is None and fused_pp.pending and pp._USES_MEDIA_FILE:
+                    info = self.run_pp(fused_pp, info)
+                    fused_info = self.run_pp(pp, info, fused_pp=fused_pp)
+                if fused_info is not None:
+                    info = fused_info
+                    continue
             info = self.run_pp(pp, info)
+        if fused_pp is not None and fused_pp.pending:
+            info = self.run_pp(fused_pp, info)
         return info
 
     def pre_process(self, ie_info, key='pre_process', files_to_move=None):
@@ -3794,16 +3692,13 @@ def _make_archive_id(self, info_dict):
             if not url:
                 return
             # Try to find matching extractor for the URL and take its ie_key
-            for ie_key, ie in self._ies.items():
-                if ie.suitable(url):
-                    extractor = ie_key
-                    break
-            else:
+            extractor = next((ie_key for ie_key, _ in self._suitable_ies(url)), None)
+            if extractor is None:
                 return
         return make_archive_id(extractor, video_id)
 
     def in_download_archive(self, info_dict):
-        if not self.archive:
+        if self.archive is None:
             return False
 
         vid_ids = [self._make_archive_id(info_dict)]
@@ -3811,16 +3706,12 @@ def in_download_archive(self, info_dict):
         return any(id_ in self.archive for id_ in vid_ids)
 
     def record_download_archive(self, info_dict):
-        fn = self.params.get('download_archive')
-        if fn is None:
+        if self.archive is None:
             return
         vid_id = self._make_archive_id(info_dict)
         assert vid_id
 
         self.write_debug(f'Adding to archive: {vid_id}')
-        if is_path_like(fn):
-            with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-                archive_file.write(vid_id + '\n')
         self.archive.add(vid_id)
 
     @staticmethod
@@ -1,4 +1,6 @@
 import base64
+import functools
+import struct
 from math import ceil
 
 from .compat import compat_ord
@@ -16,15 +18,19 @@ def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
 else:
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using native implementation since pycryptodome is unavailable """
-        return bytes(aes_cbc_decrypt(*map(list, (data, key, iv))))
+        return _cbc_decrypt_bytes(bytes(data), bytes(key), bytes(iv))
 
     def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using native implementation since pycryptodome is unavailable """
         return bytes(aes_gcm_decrypt_and_verify(*map(list, (data, key, tag, nonce))))
 
 
-def aes_cbc_encrypt_bytes(data, key, iv, **kwargs):
-    return bytes(aes_cbc_encrypt(*map(list, (data, key, iv)), **kwargs))
+def aes_cbc_encrypt_bytes(data, key, iv, *, padding_mode='pkcs7'):
+    data = bytes(data)
+    if data:
+        last_block_start = (len(data) - 1) // BLOCK_SIZE_BYTES * BLOCK_SIZE_BYTES
+        data = data[:last_block_start] + bytes(pad_block(list(data[last_block_start:]), padding_mode))
+    return _cbc_encrypt_bytes(data, bytes(key), bytes(iv))
 
 
 BLOCK_SIZE_BYTES = 16
@@ -133,19 +139,7 @@ def aes_ctr_encrypt(data, key, iv):
     @param {int[]} iv          16-Byte initialization vector
     @returns {int[]}           encrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = ceil(len(data) / BLOCK_SIZE_BYTES)
-    counter = iter_vector(iv)
-
-    encrypted_data = []
-    for i in range(block_count):
-        counter_block = next(counter)
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block += [0] * (BLOCK_SIZE_BYTES - len(block))
-
-        cipher_counter_block = aes_encrypt(counter_block, expanded_key)
-        encrypted_data += xor(block, cipher_counter_block)
-    return encrypted_data[:len(data)]
+    return list(_ctr_bytes(bytes(data), bytes(key), bytes(iv)))
 
 
 def aes_cbc_decrypt(data, key, iv):
@@ -157,19 +151,7 @@ def aes_cbc_decrypt(data, key, iv):
     @param {int[]} iv          16-Byte IV
     @returns {int[]}           decrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = ceil(len(data) / BLOCK_SIZE_BYTES)
-
-    decrypted_data = []
-    previous_cipher_block = iv
-    for i in range(block_count):
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block += [0] * (BLOCK_SIZE_BYTES - len(block))
-
-        decrypted_block = aes_decrypt(block, expanded_key)
-        decrypted_data += xor(decrypted_block, previous_cipher_block)
-        previous_cipher_block = block
-    return decrypted_data[:len(data)]
+    return list(_cbc_decrypt_bytes(bytes(data), bytes(key), bytes(iv)))
 
 
 def aes_cbc_encrypt(data, key, iv, *, padding_mode='pkcs7'):
@@ -182,23 +164,7 @@ def aes_cbc_encrypt(data, key, iv, *, padding_mode='pkcs7'):
     @param padding_mode        Padding mode to use
     @returns {int[]}           encrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = ceil(len(data) / BLOCK_SIZE_BYTES)
-
-    encrypted_data = []
-    previous_cipher_block = iv
-    for i in range(block_count):
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block = pad_block(block, padding_mode)
-
-        mixed_block = xor(block, previous_cipher_block)
-
-        encrypted_block = aes_encrypt(mixed_block, expanded_key)
-        encrypted_data += encrypted_block
-
-        previous_cipher_block = encrypted_block
-
-    return encrypted_data
+    return list(aes_cbc_encrypt_bytes(data, key, iv, padding_mode=padding_mode))
 
 
 def aes_gcm_decrypt_and_verify(data, key, tag, nonce):
@@ -531,6 +497,129 @@ def ghash(subkey, data):
     return last_y
 
 
+# The bulk modes below use the T-table formulation of AES: SubBytes, ShiftRows and
+# MixColumns of a round are combined into four lookups in 256 entry tables of
+# 32-bit words per column, and the state is kept as four big endian words
+
+def _gf_mul(a, b):
+    return 0 if a == 0 or b == 0 else RIJNDAEL_EXP_TABLE[(RIJNDAEL_LOG_TABLE[a] + RIJNDAEL_LOG_TABLE[b]) % 0xFF]
+
+
+def _rotated_tables(table):
+    return tuple(tuple(((x >> shift) | (x << (32 - shift))) & 0xFFFFFFFF for x in table) for shift in (0, 8, 16, 24))
+
+
+@functools.cache
+def _t_tables():
+    """Round tables for encryption and decryption, and the S-boxes shifted into each byte of a word"""
+    te = _rotated_tables([
+        _gf_mul(s, 2) << 24 | s << 16 | s << 8 | _gf_mul(s, 3) for s in SBOX])
+    td = _rotated_tables([
+        _gf_mul(s, 14) << 24 | _gf_mul(s, 9) << 16 | _gf_mul(s, 13) << 8 | _gf_mul(s, 11) for s in SBOX_INV])
+    sbox = tuple(tuple(s << shift for s in SBOX) for shift in (24, 16, 8, 0))
+    sbox_inv = tuple(tuple(s << shift for s in SBOX_INV) for shift in (24, 16, 8, 0))
+    return te, td, sbox, sbox_inv
+
+
+def _to_words(data):
+    return struct.unpack(f'>{len(data) // 4}I', data)
+
+
+def _from_words(words):
+    return struct.pack(f'>{len(words)}I', *words)
+
+
+@functools.lru_cache(maxsize=16)
+def _round_keys(key):
+    """Round keys for encryption and for the equivalent inverse cipher, as tuples of four words"""
+    _, td, _, _ = _t_tables()
+    words = _to_words(bytes(key_expansion(list(key))))
+    enc_keys = tuple(words[i: i + 4] for i in range(0, len(words), 4))
+    dec_keys = (
+        enc_keys[-1],
+        *(tuple(
+            td[0][SBOX[w >> 24]] ^ td[1][SBOX[(w >> 16) & 0xFF]] ^ td[2][SBOX[(w >> 8) & 0xFF]] ^ td[3][SBOX[w & 0xFF]]
+            for w in round_key) for round_key in reversed(enc_keys[1:-1])),
+        enc_keys[0])
+    return enc_keys, dec_keys
+
+
+def _encrypt_block_words(s0, s1, s2, s3, keys, tables):
+    (te0, te1, te2, te3), _, (sb0, sb1, sb2, sb3), _ = tables
+    k0, k1, k2, k3 = keys[0]
+    s0, s1, s2, s3 = s0 ^ k0, s1 ^ k1, s2 ^ k2, s3 ^ k3
+    for k0, k1, k2, k3 in keys[1:-1]:
+        s0, s1, s2, s3 = (
+            te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xFF] ^ te2[(s2 >> 8) & 0xFF] ^ te3[s3 & 0xFF] ^ k0,
+            te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xFF] ^ te2[(s3 >> 8) & 0xFF] ^ te3[s0 & 0xFF] ^ k1,
+            te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xFF] ^ te2[(s0 >> 8) & 0xFF] ^ te3[s1 & 0xFF] ^ k2,
+            te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xFF] ^ te2[(s1 >> 8) & 0xFF] ^ te3[s2 & 0xFF] ^ k3)
+    k0, k1, k2, k3 = keys[-1]
+    return (
+        (sb0[s0 >> 24] | sb1[(s1 >> 16) & 0xFF] | sb2[(s2 >> 8) & 0xFF] | sb3[s3 & 0xFF]) ^ k0,
+        (sb0[s1 >> 24] | sb1[(s2 >> 16) & 0xFF] | sb2[(s3 >> 8) & 0xFF] | sb3[s0 & 0xFF]) ^ k1,
+        (sb0[s2 >> 24] | sb1[(s3 >> 16) & 0xFF] | sb2[(s0 >> 8) & 0xFF] | sb3[s1 & 0xFF]) ^ k2,
+        (sb0[s3 >> 24] | sb1[(s0 >> 16) & 0xFF] | sb2[(s1 >> 8) & 0xFF] | sb3[s2 & 0xFF]) ^ k3)
+
+
+def _cbc_decrypt_bytes(data, key, iv):
+    """AES-CBC decryption of bytes without padding removal; a partial last block is zero padded"""
+    _, (td0, td1, td2, td3), _, (si0, si1, si2, si3) = _t_tables()
+    keys = _round_keys(key)[1]
+    middle_keys = keys[1:-1]
+    f0, f1, f2, f3 = keys[0]
+    l0, l1, l2, l3 = keys[-1]
+
+    data_len = len(data)
+    words = _to_words(data + bytes(-data_len % BLOCK_SIZE_BYTES))
+    p0, p1, p2, p3 = _to_words(iv)
+    out = [0] * len(words)
+    # Blocks are decrypted independently and only the final xor uses the previous block,
+    # so all of the round state stays in local variables
+    for i in range(0, len(words), 4):
+        c0, c1, c2, c3 = words[i: i + 4]
+        s0, s1, s2, s3 = c0 ^ f0, c1 ^ f1, c2 ^ f2, c3 ^ f3
+        for k0, k1, k2, k3 in middle_keys:
+            s0, s1, s2, s3 = (
+                td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^ td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ k0,
+                td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^ td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ k1,
+                td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^ td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ k2,
+                td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^ td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ k3)
+        out[i] = (si0[s0 >> 24] | si1[(s3 >> 16) & 0xFF] | si2[(s2 >> 8) & 0xFF] | si3[s1 & 0xFF]) ^ l0 ^ p0
+        out[i + 1] = (si0[s1 >> 24] | si1[(s0 >> 16) & 0xFF] | si2[(s3 >> 8) & 0xFF] | si3[s2 & 0xFF]) ^ l1 ^ p1
+        out[i + 2] = (si0[s2 >> 24] | si1[(s1 >> 16) & 0xFF] | si2[(s0 >> 8) & 0xFF] | si3[s3 & 0xFF]) ^ l2 ^ p2
+        out[i + 3] = (si0[s3 >> 24] | si1[(s2 >> 16) & 0xFF] | si2[(s1 >> 8) & 0xFF] | si3[s0 & 0xFF]) ^ l3 ^ p3
+        p0, p1, p2, p3 = c0, c1, c2, c3
+    return _from_words(out)[:data_len]
+
+
+def _cbc_encrypt_bytes(data, key, iv):
+    """AES-CBC encryption of bytes that are already padded to the block size"""
+    keys, tables = _round_keys(key)[0], _t_tables()
+    words = _to_words(data)
+    p0, p1, p2, p3 = _to_words(iv)
+    out = []
+    for i in range(0, len(words), 4):
+        p0, p1, p2, p3 = _encrypt_block_words(
+            words[i] ^ p0, words[i + 1] ^ p1, words[i + 2] ^ p2, words[i + 3] ^ p3, keys, tables)
+        out.extend((p0, p1, p2, p3))
+    return _from_words(out)
+
+
+def _ctr_bytes(data, key, iv):
+    """AES-CTR encryption or decryption of bytes, with the whole IV as a 128-bit big endian counter"""
+    keys, tables = _round_keys(key)[0], _t_tables()
+    counter = int.from_bytes(iv, 'big')
+    stream = []
+    for _ in range(ceil(len(data) / BLOCK_SIZE_BYTES)):
+        stream.extend(_encrypt_block_words(
+            counter >> 96, (counter >> 64) & 0xFFFFFFFF, (counter >> 32) & 0xFFFFFFFF, counter & 0xFFFFFFFF,
+            keys, tables))
+        counter = (counter + 1) & ((1 << 128) - 1)
+    key_stream = int.from_bytes(_from_words(stream)[:len(data)], 'big')
+    return (int.from_bytes(data, 'big') ^ key_stream).to_bytes(len(data), 'big')
+
+
 __all__ = [
     'aes_cbc_decrypt',
     'aes_cbc_decrypt_bytes',
@@ -0,0 +1,173 @@
+import errno
+import os
+import threading
+
+from .dependencies import sqlite3
+from .utils import is_path_like, locked_file
+
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+SQLITE_HEADER = b'SQLite format 3\0'
+
+
+class DownloadArchive:
+    """Record of the IDs of finished downloads"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def __contains__(self, archive_id):
+        with self._lock:
+            return self._contains(archive_id)
+
+    def add(self, archive_id):
+        with self._lock:
+            self._write((archive_id,))
+
+    def close(self):
+        pass
+
+    def export_text(self, filename):
+        """Write all IDs to a file in the legacy one ID per line format"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            for archive_id in self:
+                f.write(f'{archive_id}\n')
+
+    def import_text(self, filename):
+        """Add all IDs from a file in the legacy one ID per line format"""
+        with open(filename, encoding='utf-8') as f:
+            ids = filter(None, map(str.strip, f))
+            with self._lock:
+                self._write(ids)
+
+    def _contains(self, archive_id):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def _write(self, archive_ids):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def __iter__(self):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+
+class SetArchive(DownloadArchive):
+    """Archive kept only in memory, in the given set"""
+
+    def __init__(self, archive=None):
+        super().__init__()
+        self._archive = set() if archive is None else archive
+
+    def _contains(self, archive_id):
+        return archive_id in self._archive
+
+    def _write(self, archive_ids):
+        self._archive.update(archive_ids)
+
+    def __iter__(self):
+        return iter(self._archive)
+
+
+class TextArchive(DownloadArchive):
+    """The legacy archive format: a text file with one ID per line
+
+    The whole file is read into memory on the first lookup
+    """
+
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+        self._archive = None
+
+    def _load(self):
+        if self._archive is None:
+            self._archive = set()
+            try:
+                with locked_file(self.filename, 'r', encoding='utf-8') as archive_file:
+                    for line in archive_file:
+                        self._archive.add(line.strip())
+            except OSError as ioe:
+                if ioe.errno != errno.ENOENT:
+                    raise
+        return self._archive
+
+    def _contains(self, archive_id):
+        return archive_id in self._load()
+
+    def _write(self, archive_ids):
+        archive_ids = list(archive_ids)
+        with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+            archive_file.write(''.join(f'{archive_id}\n' for archive_id in archive_ids))
+        if self._archive is not None:
+            self._archive.update(archive_ids)
+
+    def __iter__(self):
+        return iter(self._load())
+
+
+class SQLiteArchive(DownloadArchive):
+    """Archive in an indexed SQLite database
+
+    Lookups are answered from the index without loading the archive, so they
+    stay cheap for archives with millions of entries and always include what
+    other processes recorded. The database is opened in WAL mode, so that
+    several processes can read and append to it at the same time. Each ID is
+    committed as soon as it is added
+    """
+
+    def __init__(self, filename, timeout=30):
+        if not sqlite3:
+            raise ImportError('sqlite3 is not available; use a text file as download archive instead')
+        super().__init__()
+        self.filename = filename
+        self._conn = sqlite3.connect(filename, timeout=timeout, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def _contains(self, archive_id):
+        return self._conn.execute('SELECT 1 FROM archive WHERE id = ?', (archive_id,)).fetchone() is not None
+
+    def _write(self, archive_ids):
+        with self._conn:
+            self._conn.executemany('INSERT OR IGNORE INTO archive (id) VALUES (?)', ((i,) for i in archive_ids))
+
+    def __iter__(self):
+        for archive_id, in self._conn.execute('SELECT id FROM archive ORDER BY id'):
+            yield archive_id
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def is_sqlite_archive(filename):
+    """Whether the archive file is an SQLite database
+
+    Existing files are told apart by their header, so that a text archive is never
+    opened as a database. New files are created as SQLite databases if their name
+    ends in one of SQLITE_EXTENSIONS
+    """
+    try:
+        with open(filename, 'rb') as f:
+            header = f.read(len(SQLITE_HEADER))
+    except FileNotFoundError:
+        header = b''
+    if header:
+        return header == SQLITE_HEADER
+    return os.fspath(filename).lower().endswith(SQLITE_EXTENSIONS)
+
+
+def open_download_archive(archive):
+    """Create the archive backend for the download_archive param
+
+    Accepts an existing DownloadArchive, a set, or a file name. SQLite
+    databases (see is_sqlite_archive) are opened as SQLiteArchive, other
+    files are text archives
+    """
+    if archive is None or isinstance(archive, DownloadArchive):
+        return archive
+    if not is_path_like(archive):
+        return SetArchive(archive)
+    if is_sqlite_archive(archive):
+        return SQLiteArchive(archive)
+    return TextArchive(archive)
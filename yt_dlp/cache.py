@@ -1,18 +1,23 @@
+import collections
 import contextlib
 import json
 import os
+import pickle
 import re
 import shutil
+import threading
+import time
 import traceback
 import urllib.parse
 
-from .utils import expand_path, traverse_obj, version_tuple, write_json_file
+from .utils import expand_path, locked_file, traverse_obj, version_tuple, write_json_file
 from .version import __version__
 
 
 class Cache:
     def __init__(self, ydl):
         self._ydl = ydl
+        self._result_caches = {}
 
     def _get_root_dir(self):
         res = self._ydl.params.get('cachedir')
@@ -74,6 +79,12 @@ def load(self, section, key, dtype='json', default=None, *, min_ver=None):
 
         return default
 
+    def results(self, section, *, min_ver=None):
+        """The ResultCache of a section, shared by all users of this cache"""
+        if section not in self._result_caches:
+            self._result_caches.setdefault(section, ResultCache(self, section, min_ver=min_ver))
+        return self._result_caches[section]
+
     def remove(self):
         if not self.enabled:
             self._ydl.to_screen('Cache is disabled (Did you combine --no-cache-dir and --rm-cache-dir?)')
@@ -89,3 +100,220 @@ def remove(self):
             self._ydl.to_screen('.', skip_eol=True)
             shutil.rmtree(cachedir)
         self._ydl.to_screen('.')
+
+
+class ResultCache:
+    """
+    Persistent cache of the results of a function of strings, with an LRU in front
+
+    Results are grouped by a key, e.g. the player that a challenge belongs to,
+    and each key has a file in the `section` of the Cache, to which entries are
+    appended as lines of JSON. The file is shared by all processes using the
+    same cache dir; entries appended by other processes are read when a lookup
+    misses. A file larger than `max_bytes` is compacted to its newest half,
+    and at most `max_files` of the most recently written files are kept.
+    Every entry records the version that wrote it, and entries older than
+    `min_ver` are ignored
+    """
+
+    def __init__(self, cache, section, max_entries=4096, max_bytes=256 * 1024, max_files=16, *, min_ver=None):
+        self._cache = cache
+        self.section = section
+        self.min_ver = min_ver
+        self.max_entries, self.max_bytes, self.max_files = max_entries, max_bytes, max_files
+        self._entries = collections.OrderedDict()
+        # The (inode, size) of the part of each file that has been read
+        self._read_until = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, key, value, result):
+        self._entries[(key, value)] = result
+        self._entries.move_to_end((key, value))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read(self, key, fn):
+        try:
+            stat = os.stat(fn)
+        except OSError:
+            return
+        inode, offset = self._read_until.get(key, (None, 0))
+        if inode != stat.st_ino or stat.st_size < offset:
+            # The file was compacted or replaced since it was last read
+            offset = 0
+        if stat.st_size == offset:
+            return
+        with self._locked(fn), open(fn, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # Ignore an incomplete last line
+        data = data[:data.rfind(b'\n') + 1]
+        for line in data.splitlines():
+            with contextlib.suppress(ValueError, TypeError):
+                value, result, version = json.loads(line)
+                if not self.min_ver or version_tuple(version) >= version_tuple(self.min_ver):
+                    self._remember(key, value, result)
+        self._read_until[key] = (stat.st_ino, offset + len(data))
+
+    def get(self, key, value):
+        """Return the cached result of `value` for `key`, or None"""
+        with self._lock:
+            result = self._entries.get((key, value))
+            if result is None and self._cache.enabled:
+                try:
+                    self._read(key, self._cache._get_cache_fn(self.section, key, 'jsonl'))
+                except OSError as e:
+                    self._cache._ydl.write_debug(f'Reading {self.section}.{key} from cache failed: {e}')
+                result = self._entries.get((key, value))
+            if result is not None:
+                self._entries.move_to_end((key, value))
+            return result
+
+    def store(self, key, value, result):
+        with self._lock:
+            self._remember(key, value, result)
+            if not self._cache.enabled:
+                return
+            fn = self._cache._get_cache_fn(self.section, key, 'jsonl')
+            try:
+                os.makedirs(os.path.dirname(fn), exist_ok=True)
+                line = f'{json.dumps([value, result, __version__])}\n'.encode()
+                with self._locked(fn):
+                    with open(fn, 'ab') as f:
+                        f.write(line)
+                        size = f.tell()
+                    # The file must be closed to be replaced on Windows
+                    if size > self.max_bytes:
+                        self._compact(fn)
+                if size == len(line):
+                    with contextlib.suppress(OSError):
+                        self._evict_files(fn)
+            except OSError:
+                tb = traceback.format_exc()
+                self._cache._ydl.report_warning(f'Writing cache to {fn!r} failed: {tb}')
+
+    @staticmethod
+    def _locked(fn):
+        """Lock the entries file through a separate file, so that it can be replaced while locked"""
+        return locked_file(f'{fn}.lock', 'ab')
+
+    def _compact(self, fn):
+        """Replace the file with its newest entries. Must be called with the file locked"""
+        with open(fn, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        kept, size = [], 0
+        for line in reversed(lines):
+            size += len(line)
+            if size > self.max_bytes // 2:
+                break
+            kept.append(line)
+        tmp_fn = f'{fn}.part'
+        with open(tmp_fn, 'wb') as f:
+            f.writelines(reversed(kept))
+        os.replace(tmp_fn, fn)
+
+    def _evict_files(self, fn):
+        directory = os.path.dirname(fn)
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.jsonl')]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda f: os.stat(f).st_mtime, reverse=True)
+        for old_fn in files[self.max_files:]:
+            for path in (old_fn, f'{old_fn}.lock'):
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+
+
+class InfoDictCache:
+    """
+    In-memory TTL + LRU cache of extractor results, keyed by extractor key and
+    a key of the extraction (see YoutubeDL._info_dict_cache_key)
+
+    Entries are stored pickled, so every hit returns an independent copy and
+    the size of the cache can be bounded in bytes. An entry expires after `ttl`
+    seconds, or earlier if any of its media URLs carries a signed expiry
+    (e.g. the `expire` parameter of googlevideo URLs).
+
+    The cached results depend on the extraction options. YoutubeDL makes the
+    ones that it knows of part of the key, but an instance should still
+    only be shared between YoutubeDL instances that are set up the same way
+    """
+
+    _EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d+)')
+
+    def __init__(self, ttl=300, max_entries=64, max_bytes=64 * 1024 * 1024, expiry_margin=60):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.expiry_margin = expiry_margin
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _url_expiry(cls, info_dict):
+        expiry = None
+        for fmt in [info_dict, *(info_dict.get('formats') or [])]:
+            for key in ('url', 'manifest_url', 'fragment_base_url'):
+                mobj = cls._EXPIRE_RE.search(fmt.get(key) or '')
+                if mobj:
+                    expiry = min(expiry or float('inf'), int(mobj.group(1)))
+        return expiry
+
+    def _evict(self, key):
+        _, data = self._entries.pop(key)
+        self._size -= len(data)
+
+    def get(self, ie_key, cache_key):
+        """Return a copy of the cached result, or None"""
+        key = (ie_key, cache_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._evict(key)
+                return None
+            self._entries.move_to_end(key)
+            data = entry[1]
+        return pickle.loads(data)
+
+    def store(self, ie_key, cache_key, info_dict):
+        """Cache an extractor result. Results that can not be pickled are ignored"""
+        if cache_key is None:
+            return
+        try:
+            data = pickle.dumps(info_dict, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if len(data) > self.max_bytes:
+            return
+
+        expires = time.time() + self.ttl
+        url_expiry = self._url_expiry(info_dict)
+        if url_expiry is not None:
+            expires = min(expires, url_expiry - self.expiry_margin)
+        if expires <= time.time():
+            return
+
+        key = (ie_key, cache_key)
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (expires, data)
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def remove(self, ie_key, cache_key):
+        with self._lock:
+            if (ie_key, cache_key) in self._entries:
+                self._evict((ie_key, cache_key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -80,6 +80,8 @@ class FileDownloader:
     """
 
     _TEST_FILE_SIZE = 10241
+    # Minimum time between progress lines (seconds), unless progress_delta is given
+    _PROGRESS_INTERVAL = 0.1
     params = None
 
     def __init__(self, ydl, params):
@@ -89,9 +91,9 @@ def __init__(self, ydl, params):
         self.params = params
         self._prepare_multiline_status()
         self.add_progress_hook(self.report_progress)
-        if self.params.get('progress_delta'):
-            self._progress_delta_lock = threading.Lock()
-            self._progress_delta_time = time.monotonic()
+        self._progress_lock = threading.RLock()
+        self._progress_pending = {}
+        self._progress_ticker = None
 
     def _set_ydl(self, ydl):
         self.ydl = ydl
@@ -304,6 +306,9 @@ def _prepare_multiline_status(self, lines=1):
         self._multiline._HAVE_FULLCAP = self.ydl._allow_colors.out
 
     def _finish_multiline_status(self):
+        with self._progress_lock:
+            self._render_pending_progress()
+            self._stop_progress_ticker()
         self._multiline.end()
 
     ProgressStyles = Namespace(
@@ -323,10 +328,7 @@ def _report_progress_status(self, s, default_template):
                 continue
             s[name] = self._format_progress(s[name], style)
         s['_default_template'] = default_template % s
-
-        progress_dict = s.copy()
-        progress_dict.pop('info_dict')
-        progress_dict = {'info': s['info_dict'], 'progress': progress_dict}
+        progress_dict = {'info': s.pop('info_dict', None), 'progress': s}
 
         progress_template = self.params.get('progress_template', {})
         self._multiline.print_at_line(self.ydl.evaluate_outtmpl(
@@ -341,6 +343,53 @@ def _format_progress(self, *args, **kwargs):
             self._multiline.stream, self._multiline.allow_colors, *args, **kwargs)
 
     def report_progress(self, s):
+        """Queue the status for the progress line
+
+        Updates are rendered by a ticker thread at most once every progress_delta
+        (or _PROGRESS_INTERVAL) seconds, and only the latest status of each line is
+        rendered. The ticker runs until the download is finished. The status is
+        copied, so that the dict passed to the other progress hooks is never modified
+        """
+        if s['status'] == 'finished':
+            with self._progress_lock:
+                self._progress_pending.pop(s.get('progress_idx') or 0, None)
+                self._render_progress(dict(s))
+            return
+        elif s['status'] != 'downloading':
+            return
+        elif self.params.get('noprogress') and not self.ydl.params.get('consoletitle'):
+            return
+
+        with self._progress_lock:
+            self._progress_pending[s.get('progress_idx') or 0] = dict(s)
+            if not self._progress_ticker:
+                self._progress_ticker = threading.Event()
+                threading.Thread(
+                    target=self._progress_ticker_func, args=(self._progress_ticker,),
+                    name='progress-ticker', daemon=True).start()
+
+    def _progress_ticker_func(self, stopped):
+        interval = self.params.get('progress_delta') or self._PROGRESS_INTERVAL
+        while not stopped.wait(interval):
+            with self._progress_lock:
+                if stopped.is_set():
+                    return
+                self._render_pending_progress()
+
+    def _stop_progress_ticker(self, discard=False):
+        with self._progress_lock:
+            if discard:
+                self._progress_pending.clear()
+            if self._progress_ticker:
+                self._progress_ticker.set()
+                self._progress_ticker = None
+
+    def _render_pending_progress(self):
+        pending, self._progress_pending = self._progress_pending, {}
+        for s in pending.values():
+            self._render_progress(s)
+
+    def _render_progress(self, s):
         def with_fields(*tups, default=''):
             for *fields, tmpl in tups:
                 if all(s.get(f) is not None for f in fields):
@@ -367,16 +416,8 @@ def with_fields(*tups, default=''):
                 with_fields(('elapsed', 'in %(_elapsed_str)s')),
                 with_fields(('speed', 'at %(_speed_str)s')),
                 delim=' '))
-
-        if s['status'] != 'downloading':
             return
 
-        if update_delta := self.params.get('progress_delta'):
-            with self._progress_delta_lock:
-                if time.monotonic() < self._progress_delta_time:
-                    return
-                self._progress_delta_time += update_delta
-
         progress = try_call(
             lambda: 100 * s['downloaded_bytes'] / s['total_bytes'],
             lambda: 100 * s['downloaded_bytes'] / s['total_bytes_estimate'],
@@ -465,7 +506,12 @@ def download(self, filename, info_dict, subtitle=False):
             self.to_screen(f'[download] Sleeping {sleep_interval:.2f} seconds ...')
             time.sleep(sleep_interval)
 
-        ret = self.real_download(filename, info_dict)
+        try:
+            ret = self.real_download(filename, info_dict)
+        except BaseException:
+            # A queued status is out of date once the download has failed
+            self._stop_progress_ticker(discard=True)
+            raise
         self._finish_multiline_status()
         return ret, True
 
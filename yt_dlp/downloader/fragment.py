@@ -1,9 +1,13 @@
+import collections
 import concurrent.futures
 import contextlib
+import io
+import itertools
 import json
 import math
 import os
 import struct
+import threading
 import time
 
 from .common import FileDownloader
@@ -11,17 +15,108 @@
 from ..aes import aes_cbc_decrypt_bytes, unpad_pkcs7
 from ..networking import Request
 from ..networking.exceptions import HTTPError, IncompleteRead
-from ..utils import DownloadError, RetryManager, traverse_obj
+from ..utils import DownloadError, RetryManager, timeconvert, traverse_obj
 from ..utils.networking import HTTPHeaderDict
 from ..utils.progress import ProgressCalculator
 
 
+class FragmentBuffer:
+    """Stands in for the file object of a fragment that is downloaded to memory
+
+    Once the content grows beyond `max_size` bytes, it is moved to `filename`
+    and the rest is written there, as if the fragment had been a file all along.
+    Opening an existing file in append mode resumes it on disk
+    """
+
+    def __init__(self, filename, open_mode, max_size, opener):
+        self.filename = filename
+        self.max_size = max_size
+        self._opener = opener
+        self._buffer = io.BytesIO()
+        self._stream = None
+        if 'a' in open_mode and os.path.isfile(filename):
+            self._spill(open_mode)
+
+    @property
+    def spilled(self):
+        return self._stream is not None
+
+    def _spill(self, open_mode='wb'):
+        self._stream, self.filename = self._opener(self.filename, open_mode)
+        self._stream.write(self._buffer.getbuffer())
+        self._buffer = None
+
+    def write(self, data):
+        if self._stream is None and self._buffer.tell() + len(data) > self.max_size:
+            self._spill()
+        return (self._stream or self._buffer).write(data)
+
+    def getvalue(self):
+        assert not self.spilled, 'Content of spilled fragments has to be read from their file'
+        return self._buffer.getvalue()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+
+
 class HttpQuietDownloader(HttpFD):
+    """Downloads fragments; to memory if `buffer_size` is set"""
+
+    def __init__(self, ydl, params, buffer_size=0):
+        super().__init__(ydl, params)
+        self.buffer_size = buffer_size
+        self._buffers = {}
+        self._buffers_lock = threading.Lock()
+
     def to_screen(self, *args, **kargs):
         pass
 
     to_console_title = to_screen
 
+    def sanitize_open(self, filename, open_mode):
+        if not self.buffer_size:
+            return super().sanitize_open(filename, open_mode)
+        buffer = FragmentBuffer(filename, open_mode, self.buffer_size, super().sanitize_open)
+        with self._buffers_lock:
+            self._buffers[filename] = buffer
+        return buffer, filename
+
+    def try_rename(self, old_filename, new_filename):
+        with self._buffers_lock:
+            buffer = self._buffers.pop(old_filename, None)
+            if buffer is not None:
+                self._buffers[new_filename] = buffer
+        if buffer is None or buffer.spilled:
+            super().try_rename(buffer.filename if buffer else old_filename, new_filename)
+        if buffer is not None:
+            buffer.filename = new_filename
+
+    def try_utime(self, filename, last_modified_hdr):
+        buffer = self._buffers.get(filename)
+        if buffer is None or buffer.spilled:
+            return super().try_utime(filename, last_modified_hdr)
+        # There is no file yet, but the time is still reported for the fragment
+        return timeconvert(last_modified_hdr) or None
+
+    def real_download(self, filename, info_dict):
+        success = False
+        try:
+            success = super().real_download(filename, info_dict)
+            return success
+        finally:
+            if not success:
+                self.pop_buffer(filename)
+                self.pop_buffer(self.temp_name(filename))
+
+    def pop_buffer(self, filename):
+        """Remove the buffer of a fragment; returns its content if it is in memory"""
+        with self._buffers_lock:
+            buffer = self._buffers.pop(filename, None)
+        if buffer is None or buffer.spilled:
+            return None
+        return buffer.getvalue()
+
 
 class FragmentFD(FileDownloader):
     """
@@ -35,6 +130,9 @@ class FragmentFD(FileDownloader):
                         Skip unavailable fragments (DASH and hlsnative only)
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
+    fragment_buffer_size:  Size in bytes up to which fragments are downloaded to
+                        memory instead of a file. 0 to always use files.
+                        Default is 10MiB; not used with keep_fragments
     concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
     _no_ytdl_file:      Don't use .ytdl file
 
@@ -59,6 +157,14 @@ class FragmentFD(FileDownloader):
     This feature is experimental and file format may change in future.
     """
 
+    _DEFAULT_FRAGMENT_BUFFER_SIZE = 10 * 1024 * 1024
+
+    # With concurrent fragment downloads, fragments that take this many times as
+    # long as recent ones (and at least _STRAGGLER_MIN_TIME seconds) are
+    # downloaded a second time by an idle worker, and the first copy to finish is used
+    _STRAGGLER_FACTOR = 3
+    _STRAGGLER_MIN_TIME = 5
+
     def report_retry_fragment(self, err, frag_index, count, retries):
         self.deprecation_warning('yt_dlp.downloader.FragmentFD.report_retry_fragment is deprecated. '
                                  'Use yt_dlp.downloader.FileDownloader.report_retry instead')
@@ -110,11 +216,15 @@ def _write_ytdl_file(self, ctx):
 
     def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
         fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
+        if ctx.get('fragment_attempt'):
+            fragment_filename += '.%d' % ctx['fragment_attempt']
         fragment_info_dict = {
             'url': frag_url,
             'http_headers': headers or info_dict.get('http_headers'),
             'request_data': request_data,
             'ctx_id': ctx.get('ctx_id'),
+            'fragment_index': ctx['fragment_index'],
+            'fragment_attempt': ctx.get('fragment_attempt'),
         }
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
@@ -132,6 +242,9 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
     def _read_fragment(self, ctx):
         if not ctx.get('fragment_filename_sanitized'):
             return None
+        frag_content = ctx['dl'].pop_buffer(ctx['fragment_filename_sanitized'])
+        if frag_content is not None:
+            return frag_content
         try:
             down, frag_sanitized = self.sanitize_open(ctx['fragment_filename_sanitized'], 'rb')
         except FileNotFoundError:
@@ -164,6 +277,12 @@ def _prepare_frag_download(self, ctx):
             total_frags_str = 'unknown (live)'
         self.to_screen(f'[{self.FD_NAME}] Total fragments: {total_frags_str}')
         self.report_destination(ctx['filename'])
+        buffer_size = self.params.get('fragment_buffer_size')
+        if buffer_size is None:
+            buffer_size = self._DEFAULT_FRAGMENT_BUFFER_SIZE
+        if self.params.get('keep_fragments') or self.params.get('xattr_set_filesize'):
+            # Both need the fragments to be files
+            buffer_size = 0
         dl = HttpQuietDownloader(self.ydl, {
             **self.params,
             'noprogress': True,
@@ -171,7 +290,7 @@ def _prepare_frag_download(self, ctx):
             'sleep_interval': 0,
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
-        })
+        }, buffer_size=buffer_size)
         tmpfilename = self.temp_name(ctx['filename'])
         open_mode = 'wb'
 
@@ -238,6 +357,8 @@ def _start_frag_download(self, ctx, info_dict):
 
         ctx['started'] = time.time()
         progress = ProgressCalculator(resume_len)
+        # Fragments whose download has been accounted for
+        finished_fragments = set()
 
         def frag_progress_hook(s):
             if s['status'] not in ('downloading', 'finished'):
@@ -254,7 +375,13 @@ def frag_progress_hook(s):
 
             state['elapsed'] = progress.elapsed
             frag_total_bytes = s.get('total_bytes') or 0
-            s['fragment_info_dict'] = s.pop('info_dict', {})
+            frag_info = s['fragment_info_dict'] = s.pop('info_dict', {})
+            if ctx.get('frag_download_finished') or frag_info.get('fragment_index') in finished_fragments:
+                # The losing copy of a re-issued fragment, which may outlive the download
+                return
+            if frag_info.get('fragment_attempt') and s['status'] != 'finished':
+                # Progress is accounted for by the first download of the fragment
+                return
 
             # XXX: Fragment resume is not accounted for here
             if not ctx['live']:
@@ -268,6 +395,7 @@ def frag_progress_hook(s):
                 progress.update(s.get('downloaded_bytes'))
 
             if s['status'] == 'finished':
+                finished_fragments.add(frag_info.get('fragment_index'))
                 state['fragment_index'] += 1
                 ctx['fragment_index'] = state['fragment_index']
                 progress.thread_reset()
@@ -283,6 +411,7 @@ def frag_progress_hook(s):
         return ctx['started']
 
     def _finish_frag_download(self, ctx, info_dict):
+        ctx['frag_download_finished'] = True
         ctx['dest_stream'].close()
         if self.__do_ytdl_file(ctx):
             self.try_remove(self.ytdl_filename(ctx['filename']))
@@ -485,26 +614,79 @@ def append_fragment(frag_content, frag_index, ctx):
         max_workers = math.ceil(
             self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
         if max_workers > 1:
-            def _download_fragment(fragment):
+            durations = collections.deque(maxlen=max_workers * 4)
+            start_times = {}
+
+            def _download_fragment(fragment, attempt=0):
                 ctx_copy = ctx.copy()
+                ctx_copy['fragment_attempt'] = attempt
+                start = time.monotonic()
+                start_times.setdefault(fragment['frag_index'], start)
                 download_fragment(fragment, ctx_copy)
-                return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
+                durations.append(time.monotonic() - start)
+                return ctx_copy.get('fragment_filename_sanitized')
 
-            with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
-                try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
-                        ctx.update({
-                            'fragment_filename_sanitized': frag_filename,
-                            'fragment_index': frag_index,
-                        })
-                        if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
-                            return False
-                except KeyboardInterrupt:
-                    self._finish_multiline_status()
-                    self.report_error(
-                        'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
-                    pool.shutdown(wait=False)
-                    raise
+            def discard_fragment(future):
+                if not future.cancelled() and not future.exception() and future.result():
+                    ctx['dl'].pop_buffer(future.result())
+                    self.try_remove(future.result())
+
+            def is_straggler(frag_index, attempts):
+                started = start_times.get(frag_index)
+                if started is None or not durations or len(attempts) > 1 or self.params.get('keep_fragments'):
+                    return False
+                typical = sorted(durations)[len(durations) // 2]
+                return time.monotonic() - started > max(typical * self._STRAGGLER_FACTOR, self._STRAGGLER_MIN_TIME)
+
+            pool = tpe or concurrent.futures.ThreadPoolExecutor(max_workers)
+            # Fragments are downloaded up to a window ahead of the one that is appended next.
+            # Completed fragments wait there, in memory or in their files, until it is their turn
+            window = collections.deque()
+            fragments = iter(fragments)
+            finished = False
+            try:
+                while True:
+                    for fragment in itertools.islice(fragments, max_workers * 2 - len(window)):
+                        window.append((fragment, [pool.submit(_download_fragment, fragment)]))
+                    if not window:
+                        break
+                    fragment, attempts = window.popleft()
+                    frag_index = fragment['frag_index']
+                    frag_filename = None
+                    while attempts and not frag_filename:
+                        done, _ = concurrent.futures.wait(
+                            attempts, timeout=1, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            attempts.remove(future)
+                            frag_filename = future.result()
+                            if frag_filename:
+                                break
+                        busy = sum(not future.done() for _, futures in window for future in futures)
+                        if not done and busy + len(attempts) < max_workers and is_straggler(frag_index, attempts):
+                            attempts.append(pool.submit(_download_fragment, fragment, 1))
+                    for future in attempts:
+                        future.add_done_callback(discard_fragment)
+                    start_times.pop(frag_index, None)
+
+                    ctx.update({
+                        'fragment_filename_sanitized': frag_filename,
+                        'fragment_index': frag_index,
+                    })
+                    if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
+                        return False
+                finished = True
+            except KeyboardInterrupt:
+                self._finish_multiline_status()
+                self.report_error(
+                    'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
+                pool.shutdown(wait=False)
+                raise
+            finally:
+                if tpe is None:
+                    # Once every fragment is appended, only the slower copies of re-issued fragments
+                    # can still be running, and they are not waited for. On errors, the running
+                    # downloads are waited for, so that nothing writes to the fragment files afterwards
+                    pool.shutdown(wait=not finished, cancel_futures=True)
         else:
             for fragment in fragments:
                 if not interrupt_trigger[0]:
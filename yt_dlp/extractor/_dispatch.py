@@ -0,0 +1,324 @@
+"""Host based dispatch of URLs to the extractors that may be suitable for them
+
+Every `_VALID_URL` is analysed for host labels (the dot separated parts of the
+domain) that any matching URL must contain, e.g. `youtube` for
+`https?://(?:www\\.)?youtube\\.com/...`. URLs are then only checked against the
+extractors indexed under one of their own host labels, plus the extractors whose
+patterns could not be analysed. The analysis is conservative: an extractor is
+only left out for a URL if its `_VALID_URL` cannot match that URL.
+"""
+
+import functools
+import re
+
+from ..utils import variadic
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Upper bound of alternatives followed per pattern before giving up
+_MAX_STATES = 1024
+
+_URL_HOST_RE = re.compile(r'[^/]*//([^/]*)')
+_LABEL_SEP_RE = re.compile(r'[.:?#]')
+_HOST_TERMINATORS = frozenset('/:?#')
+
+# Labels shared by too many sites to narrow anything down
+_GENERIC_LABELS = frozenset(('www', 'm', 'com', 'net', 'org', 'co'))
+
+
+class _Unanalysable(Exception):
+    pass
+
+
+def url_host_labels(url):
+    """The keys of a URL in the form that the index uses"""
+    scheme, sep, _ = url.partition(':')
+    keys = [f'{scheme.lower()}:'] if sep else []
+    mobj = _URL_HOST_RE.match(url)
+    if mobj:
+        keys.extend(_LABEL_SEP_RE.split(mobj.group(1).lower()))
+    return keys
+
+
+class _CharSet:
+    """Which of the characters that matter to the analysis a pattern element may consume"""
+
+    def __init__(self, slash=True, dot=True):
+        self.slash, self.dot = slash, dot
+
+    @classmethod
+    def of(cls, items):
+        slash = dot = False
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                slash, dot = slash or av == ord('/'), dot or av == ord('.')
+            elif op is sre_parse.NOT_LITERAL:
+                slash, dot = slash or av != ord('/'), dot or av != ord('.')
+            elif op is sre_parse.IN:
+                if av and av[0][0] is sre_parse.NEGATE:
+                    excluded = {c for o, c in av[1:] if o is sre_parse.LITERAL}
+                    slash, dot = slash or ord('/') not in excluded, dot or ord('.') not in excluded
+                    continue
+                for o, c in av:
+                    if o is sre_parse.LITERAL:
+                        slash, dot = slash or c == ord('/'), dot or c == ord('.')
+                    elif o is sre_parse.RANGE:
+                        slash = slash or c[0] <= ord('/') <= c[1]
+                        dot = dot or c[0] <= ord('.') <= c[1]
+                    elif o is sre_parse.CATEGORY:
+                        # \W, \S, \D etc. include both, \w, \s and \d neither
+                        negated = c in (sre_parse.CATEGORY_NOT_WORD, sre_parse.CATEGORY_NOT_SPACE,
+                                        sre_parse.CATEGORY_NOT_DIGIT, sre_parse.CATEGORY_NOT_LINEBREAK)
+                        slash, dot = slash or negated, dot or negated
+                    else:
+                        return cls()
+            elif op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                continue
+            elif op is sre_parse.SUBPATTERN:
+                inner = cls.of(av[-1])
+                slash, dot = slash or inner.slash, dot or inner.dot
+            elif op is sre_parse.BRANCH:
+                for branch in av[1]:
+                    inner = cls.of(branch)
+                    slash, dot = slash or inner.slash, dot or inner.dot
+            elif op in _REPEATS:
+                inner = cls.of(av[2])
+                slash, dot = slash or inner.slash, dot or inner.dot
+            else:
+                # ANY and everything that is not understood
+                return cls()
+        return cls(slash, dot)
+
+
+_REPEATS = tuple(filter(None, (
+    sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None))))
+
+
+class _State:
+    """One way of matching the pattern so far
+
+    Before the `//` of the URL, the literal text from the start of the URL is
+    kept in `scheme` (None once a non-literal was consumed) and `prefix` is set
+    to it when a `:` follows, e.g. for `ytsearch:` style pseudo URLs. In the
+    host, `labels` are the labels known to be complete and `label` is the
+    current one, or None if it does not start at a label boundary. `failed`
+    states could not be followed to the host
+    """
+    __slots__ = ('scheme', 'prefix', 'slash', 'in_host', 'labels', 'label', 'done', 'failed')
+
+    def __init__(self, scheme='', prefix=None, slash=False, in_host=False,
+                 labels=(), label=None, done=False, failed=False):
+        self.scheme, self.prefix, self.slash, self.in_host = scheme, prefix, slash, in_host
+        self.labels, self.label, self.done, self.failed = labels, label, done, failed
+
+    def _copy(self, **kwargs):
+        return _State(**{key: kwargs.get(key, getattr(self, key)) for key in self.__slots__})
+
+    def _finish(self, terminated):
+        labels = self.labels
+        if terminated and self.label:
+            labels = (*labels, self.label)
+        return self._copy(labels=labels, label=None, done=True)
+
+    def _fail(self):
+        return self._copy(done=True, failed=True)
+
+    def literal(self, text):
+        """Consume a run of literal characters"""
+        if self.done:
+            return self
+        scheme, prefix, slash, in_host = self.scheme, self.prefix, self.slash, self.in_host
+        labels, label = self.labels, self.label
+        for char in text.lower():
+            if not in_host:
+                if char == '/':
+                    if slash:
+                        in_host, label = True, ''
+                    slash, scheme = True, None
+                elif slash:
+                    # Not a URL with a host
+                    return self._fail()
+                elif scheme is not None and prefix is None:
+                    if char == ':':
+                        prefix = scheme
+                    else:
+                        scheme += char
+            elif char in _HOST_TERMINATORS:
+                return _State(scheme, prefix, slash, in_host, (*labels, label) if label else labels, None, True)
+            elif char == '.':
+                labels, label = (*labels, label) if label else labels, ''
+            elif label is not None:
+                label += char
+        return _State(scheme, prefix, slash, in_host, labels, label)
+
+    def wildcard(self, charset):
+        if self.done:
+            return self
+        if not self.in_host:
+            if charset.slash or self.slash:
+                # The "//" can not be located
+                return self._fail()
+            return self._copy(scheme=None)
+        if charset.slash:
+            # The host may end anywhere in here
+            return self._finish(terminated=False)
+        return self._copy(label=None)
+
+    def index_key(self):
+        """The most selective key that every URL matched this way has, or None"""
+        if self.in_host and not self.failed:
+            state = self if self.done else self._finish(terminated=False)
+            labels = [label for label in state.labels if label not in _GENERIC_LABELS] or state.labels
+            if labels:
+                return max(labels, key=len)
+        return f'{self.prefix}:' if self.prefix else None
+
+    def key(self):
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+
+def _dedupe(states):
+    unique = {state.key(): state for state in states}
+    if len(unique) > _MAX_STATES:
+        raise _Unanalysable('Too many alternatives')
+    return list(unique.values())
+
+
+def _literal_char(op, av):
+    if op is sre_parse.LITERAL:
+        return chr(av)
+    if op is sre_parse.IN and len(av) == 1 and av[0][0] is sre_parse.LITERAL:
+        return chr(av[0][1])
+    return None
+
+
+def _walk(items, states):
+    text = ''
+    for op, av in [*items, (None, None)]:
+        char = _literal_char(op, av)
+        if char is not None:
+            text += char
+            continue
+        if text:
+            states = [state.literal(text) for state in states]
+            text = ''
+        if op is None or all(state.done for state in states):
+            break
+        if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            # Zero width; assertions can only reject more URLs
+            continue
+        elif op is sre_parse.SUBPATTERN:
+            states = _walk(av[-1], states)
+        elif op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+            states = _walk(av, states)
+        elif op is sre_parse.BRANCH:
+            states = _dedupe([new for branch in av[1] for new in _walk(branch, states)])
+        elif op in _REPEATS:
+            low, high, item = av
+            if high <= 2:
+                alternatives, repeated = [], states
+                for count in range(high + 1):
+                    if count >= low:
+                        alternatives.extend(repeated)
+                    if count < high:
+                        repeated = _walk(item, repeated)
+                states = _dedupe(alternatives)
+            else:
+                charset = _CharSet.of(item)
+                states = _dedupe([state.wildcard(charset) for state in states])
+        elif op in (sre_parse.NOT_LITERAL, sre_parse.IN, sre_parse.ANY):
+            charset = _CharSet.of([(op, av)])
+            states = _dedupe([state.wildcard(charset) for state in states])
+        else:
+            # Back references, conditionals, ...
+            raise _Unanalysable(f'Unsupported regex construct {op}')
+    return states
+
+
+def pattern_host_labels(pattern):
+    """Index keys of which every URL matched by the pattern has at least one
+
+    Keys are host labels, or `<scheme>:` for URLs without a host. Returns None
+    if no such set can be determined
+    """
+    try:
+        states = _walk(sre_parse.parse(pattern), [_State()])
+    except (_Unanalysable, re.error, RecursionError, TypeError):
+        return None
+    keys = {state.index_key() for state in states}
+    return None if None in keys else keys
+
+
+@functools.cache
+def extractor_host_labels(ie):
+    """Host labels used to index an extractor class, or None to always try it
+
+    An empty tuple means that the extractor never matches a URL
+    """
+    from .common import InfoExtractor
+
+    if ie._VALID_URL is False:
+        return ()
+    if ie.suitable.__func__ is not InfoExtractor.suitable.__func__:
+        # Overridden matching can not be analysed
+        return None
+    labels = set()
+    for pattern in variadic(ie._VALID_URL):
+        pattern_labels = pattern_host_labels(pattern)
+        if pattern_labels is None:
+            return None
+        labels.update(pattern_labels)
+    return tuple(sorted(labels))
+
+
+def _lazy_host_labels(ie):
+    """Host labels precomputed by devscripts/make_lazy_extractors.py, or False"""
+    try:
+        from .lazy_extractors import _CLASS_LOOKUP, _DISPATCH_HOSTS
+    except ImportError:
+        return False
+    lazy_ie = _CLASS_LOOKUP.get(ie.__name__)
+    if lazy_ie is None or (lazy_ie is not ie and lazy_ie.__dict__.get('_real_class') is not ie):
+        return False
+    return _DISPATCH_HOSTS.get(ie.__name__, False)
+
+
+def _extractor_class(ie):
+    return ie if isinstance(ie, type) else type(ie)
+
+
+class ExtractorDispatcher:
+    """Finds the extractors that may be suitable for a URL, in the order they were given"""
+
+    def __init__(self, ies):
+        self._keys = list(ies)
+        self._classes = {}
+        self._always = []
+        self._index = {}
+        for position, (ie_key, ie) in enumerate(ies.items()):
+            ie_class = self._classes[ie_key] = _extractor_class(ie)
+            labels = _lazy_host_labels(ie_class)
+            if labels is False:
+                labels = extractor_host_labels(ie_class)
+            if labels is None:
+                self._always.append(position)
+            for label in labels or ():
+                self._index.setdefault(label, []).append(position)
+
+    def indexes(self, ie_key, ie):
+        """Whether the index is still valid with ie registered as ie_key"""
+        indexed = self._classes.get(ie_key)
+        ie_class = _extractor_class(ie)
+        # Instances of lazy extractors are instances of the real class
+        return indexed is not None and (indexed is ie_class or indexed.__dict__.get('_real_class') is ie_class)
+
+    def candidates(self, url):
+        """Yield the keys of the extractors that might match the URL"""
+        positions = set(self._always)
+        for label in url_host_labels(url):
+            positions.update(self._index.get(label, ()))
+        for position in sorted(positions):
+            yield self._keys[position]
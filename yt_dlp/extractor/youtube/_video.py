@@ -1,6 +1,7 @@
 import base64
 import binascii
 import collections
+import concurrent.futures
 import datetime as dt
 import functools
 import itertools
@@ -2144,7 +2145,8 @@ def _parse_sig_js(self, jscode, player_url):
             jscode, 'Initial JS player signature function name', group='sig')
 
         varname, global_list = self._interpret_player_js_global_var(jscode, player_url)
-        jsi = JSInterpreter(jscode)
+        # Share the parsed code between the signature functions of a player
+        jsi = self._cached(JSInterpreter, 'jsi', player_url)(jscode)
         initial_function = jsi.extract_function(funcname, filter_dict({varname: global_list}))
         return lambda s: initial_function([s])
 
@@ -2196,6 +2198,14 @@ def _decrypt_nsig(self, s, video_id, player_url):
             raise ExtractorError('Cannot decrypt nsig without player_url')
         player_url = urljoin('https://www.youtube.com', player_url)
 
+        # Results are shared with other processes through the cache dir
+        nsig_results = self.cache.results('youtube-nsig-results', min_ver='2025.03.31')
+        player_key = self._player_js_cache_key(player_url)
+        ret = nsig_results.get(player_key, s)
+        if ret is not None:
+            self.write_debug(f'Loaded nsig {s} => {ret} from cache')
+            return ret
+
         try:
             jsi, player_id, func_code = self._extract_n_function_code(video_id, player_url)
         except ExtractorError as e:
@@ -2224,6 +2234,7 @@ def _decrypt_nsig(self, s, video_id, player_url):
         self.write_debug(f'Decrypted nsig {s} => {ret}')
         # Only cache nsig func JS code to disk if successful, and only once
         self._store_player_data_to_cache('nsig', player_url, func_code)
+        nsig_results.store(player_key, s, ret)
         return ret
 
     def _extract_n_function_name(self, jscode, player_url=None):
@@ -3098,7 +3109,6 @@ def _extract_player_responses(self, clients, video_id, webpage, master_ytcfg, sm
                 self._YT_INITIAL_PLAYER_RESPONSE_RE, webpage, 'initial player response', video_id, fatal=False)
 
         prs = []
-        deprioritized_prs = []
 
         if initial_pr and not self._invalid_player_response(initial_pr, video_id):
             # Android player_response does not have microFormats which are needed for
@@ -3108,146 +3118,174 @@ def _extract_player_responses(self, clients, video_id, webpage, master_ytcfg, sm
             prs.append({**initial_pr, 'streamingData': None})
 
         all_clients = set(clients)
-        clients = clients[::-1]
+        # Clients are requested in rounds, all the player requests of a round at once.
+        # A fallback client added by append_client is sorted right after the client that
+        # needed it (the latest first), so the responses are in the order they would have
+        # been in if the clients had been requested one after another
+        pending_clients = [((idx,), client) for idx, client in enumerate(clients)]
 
-        def append_client(*client_names):
+        def append_client(key, *client_names):
             """ Append the first client name that exists but not already used """
             for client_name in client_names:
                 actual_client = _split_innertube_client(client_name)[0]
                 if actual_client in INNERTUBE_CLIENTS:
                     if actual_client not in all_clients:
-                        clients.append(client_name)
+                        pending_clients.append(((*key, -len(pending_clients)), client_name))
                         all_clients.add(actual_client)
                         return
 
         tried_iframe_fallback = False
         player_url = visitor_data = data_sync_id = None
         skipped_clients = {}
-        while clients:
-            deprioritize_pr = False
-            client, base_client, variant = _split_innertube_client(clients.pop())
-            player_ytcfg = master_ytcfg if client == 'web' else {}
-            if 'configs' not in self._configuration_arg('player_skip') and client != 'web':
-                player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
-
-            player_url = player_url or self._extract_player_url(master_ytcfg, player_ytcfg, webpage=webpage)
-            require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
-            if 'js' in self._configuration_arg('player_skip'):
-                require_js_player = False
-                player_url = None
-
-            if not player_url and not tried_iframe_fallback and require_js_player:
-                player_url = self._download_player_url(video_id)
-                tried_iframe_fallback = True
-
-            pr = initial_pr if client == 'web' else None
-
-            visitor_data = visitor_data or self._extract_visitor_data(master_ytcfg, initial_pr, player_ytcfg)
-            data_sync_id = data_sync_id or self._extract_data_sync_id(master_ytcfg, initial_pr, player_ytcfg)
-
-            fetch_po_token_args = {
-                'client': client,
-                'visitor_data': visitor_data,
-                'video_id': video_id,
-                'data_sync_id': data_sync_id if self.is_authenticated else None,
-                'player_url': player_url if require_js_player else None,
-                'webpage': webpage,
-                'session_index': self._extract_session_index(master_ytcfg, player_ytcfg),
-                'ytcfg': player_ytcfg or self._get_default_ytcfg(client),
-            }
-
-            # Don't need a player PO token for WEB if using player response from webpage
-            player_po_token = None if pr else self.fetch_po_token(
-                context=_PoTokenContext.PLAYER, **fetch_po_token_args)
-
-            gvs_po_token = self.fetch_po_token(
-                context=_PoTokenContext.GVS, **fetch_po_token_args)
-
-            fetch_subs_po_token_func = functools.partial(
-                self.fetch_po_token,
-                context=_PoTokenContext.SUBS,
-                **fetch_po_token_args,
-            )
-
-            required_pot_contexts = self._get_default_ytcfg(client)['PO_TOKEN_REQUIRED_CONTEXTS']
+        ordered_prs, ordered_deprioritized_prs = [], []
+        while pending_clients:
+            round_clients, pending_clients = pending_clients, []
+            jobs, requests = [], []
+            for key, client_name in round_clients:
+                deprioritize_pr = False
+                client, base_client, variant = _split_innertube_client(client_name)
+                player_ytcfg = master_ytcfg if client == 'web' else {}
+                if 'configs' not in self._configuration_arg('player_skip') and client != 'web':
+                    player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
+
+                player_url = player_url or self._extract_player_url(master_ytcfg, player_ytcfg, webpage=webpage)
+                require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
+                if 'js' in self._configuration_arg('player_skip'):
+                    require_js_player = False
+                    player_url = None
+
+                if not player_url and not tried_iframe_fallback and require_js_player:
+                    player_url = self._download_player_url(video_id)
+                    tried_iframe_fallback = True
+
+                pr = initial_pr if client == 'web' else None
+
+                visitor_data = visitor_data or self._extract_visitor_data(master_ytcfg, initial_pr, player_ytcfg)
+                data_sync_id = data_sync_id or self._extract_data_sync_id(master_ytcfg, initial_pr, player_ytcfg)
+
+                fetch_po_token_args = {
+                    'client': client,
+                    'visitor_data': visitor_data,
+                    'video_id': video_id,
+                    'data_sync_id': data_sync_id if self.is_authenticated else None,
+                    'player_url': player_url if require_js_player else None,
+                    'webpage': webpage,
+                    'session_index': self._extract_session_index(master_ytcfg, player_ytcfg),
+                    'ytcfg': player_ytcfg or self._get_default_ytcfg(client),
+                }
 
-            if (
-                not player_po_token
-                and _PoTokenContext.PLAYER in required_pot_contexts
-            ):
-                # TODO: may need to skip player response request. Unsure yet..
-                self.report_warning(
-                    f'No Player PO Token provided for {client} client, '
-                    f'which may be required for working {client} formats. This client will be deprioritized'
-                    f'You can manually pass a Player PO Token for this client with --extractor-args "youtube:po_token={client}.player+XXX". '
-                    f'For more information, refer to {PO_TOKEN_GUIDE_URL} .', only_once=True)
-                deprioritize_pr = True
+                # Don't need a player PO token for WEB if using player response from webpage
+                player_po_token = None if pr else self.fetch_po_token(
+                    context=_PoTokenContext.PLAYER, **fetch_po_token_args)
 
-            if (
-                not gvs_po_token
-                and _PoTokenContext.GVS in required_pot_contexts
-                and 'missing_pot' in self._configuration_arg('formats')
-            ):
-                # note: warning with help message is provided later during format processing
-                self.report_warning(
-                    f'No GVS PO Token provided for {client} client, '
-                    f'which may be required for working {client} formats. This client will be deprioritized',
-                    only_once=True)
-                deprioritize_pr = True
+                gvs_po_token = self.fetch_po_token(
+                    context=_PoTokenContext.GVS, **fetch_po_token_args)
 
-            try:
-                pr = pr or self._extract_player_response(
-                    client, video_id,
-                    master_ytcfg=player_ytcfg or master_ytcfg,
-                    player_ytcfg=player_ytcfg,
-                    player_url=player_url,
-                    initial_pr=initial_pr,
-                    visitor_data=visitor_data,
-                    data_sync_id=data_sync_id,
-                    po_token=player_po_token)
-            except ExtractorError as e:
-                self.report_warning(e)
-                continue
+                fetch_subs_po_token_func = functools.partial(
+                    self.fetch_po_token,
+                    context=_PoTokenContext.SUBS,
+                    **fetch_po_token_args,
+                )
 
-            if pr_id := self._invalid_player_response(pr, video_id):
-                skipped_clients[client] = pr_id
-            elif pr:
-                # Save client details for introspection later
-                innertube_context = traverse_obj(player_ytcfg or self._get_default_ytcfg(client), 'INNERTUBE_CONTEXT')
-                sd = pr.setdefault('streamingData', {})
-                sd[STREAMING_DATA_CLIENT_NAME] = client
-                sd[STREAMING_DATA_INITIAL_PO_TOKEN] = gvs_po_token
-                sd[STREAMING_DATA_INNERTUBE_CONTEXT] = innertube_context
-                sd[STREAMING_DATA_FETCH_SUBS_PO_TOKEN] = fetch_subs_po_token_func
-                for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
-                    f[STREAMING_DATA_CLIENT_NAME] = client
-                    f[STREAMING_DATA_INITIAL_PO_TOKEN] = gvs_po_token
-                if deprioritize_pr:
-                    deprioritized_prs.append(pr)
-                else:
-                    prs.append(pr)
+                required_pot_contexts = self._get_default_ytcfg(client)['PO_TOKEN_REQUIRED_CONTEXTS']
 
-            # web_embedded can work around age-gate and age-verification for some embeddable videos
-            if self._is_agegated(pr) and variant != 'web_embedded':
-                append_client(f'web_embedded.{base_client}')
-            # Unauthenticated users will only get web_embedded client formats if age-gated
-            if self._is_agegated(pr) and not self.is_authenticated:
-                self.to_screen(
-                    f'{video_id}: This video is age-restricted; some formats may be missing '
-                    f'without authentication. {self._youtube_login_hint}', only_once=True)
+                if (
+                    not player_po_token
+                    and _PoTokenContext.PLAYER in required_pot_contexts
+                ):
+                    # TODO: may need to skip player response request. Unsure yet..
+                    self.report_warning(
+                        f'No Player PO Token provided for {client} client, '
+                        f'which may be required for working {client} formats. This client will be deprioritized'
+                        f'You can manually pass a Player PO Token for this client with --extractor-args "youtube:po_token={client}.player+XXX". '
+                        f'For more information, refer to {PO_TOKEN_GUIDE_URL} .', only_once=True)
+                    deprioritize_pr = True
+
+                if (
+                    not gvs_po_token
+                    and _PoTokenContext.GVS in required_pot_contexts
+                    and 'missing_pot' in self._configuration_arg('formats')
+                ):
+                    # note: warning with help message is provided later during format processing
+                    self.report_warning(
+                        f'No GVS PO Token provided for {client} client, '
+                        f'which may be required for working {client} formats. This client will be deprioritized',
+                        only_once=True)
+                    deprioritize_pr = True
 
-            # EU countries require age-verification for accounts to access age-restricted videos
-            # If account is not age-verified, _is_agegated() will be truthy for non-embedded clients
-            embedding_is_disabled = variant == 'web_embedded' and self._is_unplayable(pr)
-            if self.is_authenticated and (self._is_agegated(pr) or embedding_is_disabled):
-                self.to_screen(
-                    f'{video_id}: This video is age-restricted and YouTube is requiring '
-                    'account age-verification; some formats may be missing', only_once=True)
-                # tv_embedded can work around the age-verification requirement for embeddable videos
-                # web_creator may work around age-verification for all videos but requires PO token
-                append_client('tv_embedded', 'web_creator')
+                fetch_pr = None
+                if not pr:
+                    if player_url:
+                        # Load the player before its signature timestamp is needed by the concurrent requests
+                        self._extract_signature_timestamp(video_id, player_url, player_ytcfg or master_ytcfg, fatal=False)
+                    fetch_pr = functools.partial(
+                        self._extract_player_response,
+                        client, video_id,
+                        master_ytcfg=player_ytcfg or master_ytcfg,
+                        player_ytcfg=player_ytcfg,
+                        player_url=player_url,
+                        initial_pr=initial_pr,
+                        visitor_data=visitor_data,
+                        data_sync_id=data_sync_id,
+                        po_token=player_po_token)
+                requests.append(fetch_pr)
+                jobs.append((
+                    key, client, base_client, variant, player_ytcfg, pr,
+                    gvs_po_token, fetch_subs_po_token_func, deprioritize_pr))
+
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=len(jobs), thread_name_prefix='youtube-player') as executor:
+                futures = [fetch_pr and executor.submit(fetch_pr) for fetch_pr in requests]
+
+            for future, job in zip(futures, jobs):
+                (key, client, base_client, variant, player_ytcfg, pr,
+                 gvs_po_token, fetch_subs_po_token_func, deprioritize_pr) = job
+                try:
+                    pr = pr or future.result()
+                except ExtractorError as e:
+                    self.report_warning(e)
+                    continue
 
-        prs.extend(deprioritized_prs)
+                if pr_id := self._invalid_player_response(pr, video_id):
+                    skipped_clients[client] = pr_id
+                elif pr:
+                    # Save client details for introspection later
+                    innertube_context = traverse_obj(player_ytcfg or self._get_default_ytcfg(client), 'INNERTUBE_CONTEXT')
+                    sd = pr.setdefault('streamingData', {})
+                    sd[STREAMING_DATA_CLIENT_NAME] = client
+                    sd[STREAMING_DATA_INITIAL_PO_TOKEN] = gvs_po_token
+                    sd[STREAMING_DATA_INNERTUBE_CONTEXT] = innertube_context
+                    sd[STREAMING_DATA_FETCH_SUBS_PO_TOKEN] = fetch_subs_po_token_func
+                    for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
+                        f[STREAMING_DATA_CLIENT_NAME] = client
+                        f[STREAMING_DATA_INITIAL_PO_TOKEN] = gvs_po_token
+                    if deprioritize_pr:
+                        ordered_deprioritized_prs.append((key, pr))
+                    else:
+                        ordered_prs.append((key, pr))
+
+                # web_embedded can work around age-gate and age-verification for some embeddable videos
+                if self._is_agegated(pr) and variant != 'web_embedded':
+                    append_client(key, f'web_embedded.{base_client}')
+                # Unauthenticated users will only get web_embedded client formats if age-gated
+                if self._is_agegated(pr) and not self.is_authenticated:
+                    self.to_screen(
+                        f'{video_id}: This video is age-restricted; some formats may be missing '
+                        f'without authentication. {self._youtube_login_hint}', only_once=True)
+
+                # EU countries require age-verification for accounts to access age-restricted videos
+                # If account is not age-verified, _is_agegated() will be truthy for non-embedded clients
+                embedding_is_disabled = variant == 'web_embedded' and self._is_unplayable(pr)
+                if self.is_authenticated and (self._is_agegated(pr) or embedding_is_disabled):
+                    self.to_screen(
+                        f'{video_id}: This video is age-restricted and YouTube is requiring '
+                        'account age-verification; some formats may be missing', only_once=True)
+                    # tv_embedded can work around the age-verification requirement for embeddable videos
+                    # web_creator may work around age-verification for all videos but requires PO token
+                    append_client(key, 'tv_embedded', 'web_creator')
+
+        for ordered in (ordered_prs, ordered_deprioritized_prs):
+            prs.extend(pr for _, pr in sorted(ordered, key=lambda x: x[0]))
 
         if skipped_clients:
             self.report_warning(
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import time
+from threading import Lock
+
+from yt_dlp.dependencies import sqlite3
+from yt_dlp.extractor.youtube.pot._provider import BuiltinIEContentProvider
+from yt_dlp.extractor.youtube.pot.cache import (
+    PoTokenCacheProvider,
+    PoTokenCacheProviderError,
+    register_preference,
+    register_provider,
+)
+from yt_dlp.utils import int_or_none
+
+
+@register_provider
+class SQLiteFilePCP(PoTokenCacheProvider, BuiltinIEContentProvider):
+    """
+    Persistent cache in an SQLite database in the cache dir, shared by all processes using it.
+
+    The database is opened in WAL mode, so that concurrent workers can read while one of them writes.
+    Expired entries are dropped on write, and the least recently used entries
+    are evicted once there are more than max_size entries.
+    """
+    PROVIDER_NAME = 'sqlite'
+    DEFAULT_CACHE_SIZE = 1000
+    CACHE_SECTION = 'youtube-pot'
+    TIMEOUT = 10
+
+    def __init__(self, *args, db_path: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._db_path = db_path
+        self._conn = None
+        self._lock = Lock()
+        max_size = self._configuration_arg('max_size', [str(self.DEFAULT_CACHE_SIZE)])[0]
+        self.max_size = int_or_none(max_size)
+        if not self.max_size or self.max_size < 0:
+            self.logger.warning(
+                f'Invalid max_size "{max_size}" for the SQLite PO Token cache; '
+                f'using the default of {self.DEFAULT_CACHE_SIZE}')
+            self.max_size = self.DEFAULT_CACHE_SIZE
+
+    def is_available(self) -> bool:
+        return sqlite3 is not None and (self._db_path is not None or self.ie._downloader.cache.enabled)
+
+    def _connect(self):
+        if self._conn is None:
+            if self._db_path is None:
+                self._db_path = self.ie._downloader.cache._get_cache_fn(self.CACHE_SECTION, 'tokens', 'sqlite')
+            os.makedirs(os.path.dirname(self._db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self._db_path, timeout=self.TIMEOUT, check_same_thread=False)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                with conn:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS pot_cache ('
+                        'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                        'expires_at INTEGER NOT NULL, accessed_at REAL NOT NULL)')
+                    conn.execute('CREATE INDEX IF NOT EXISTS pot_cache_expires_at ON pot_cache (expires_at)')
+                    conn.execute('CREATE INDEX IF NOT EXISTS pot_cache_accessed_at ON pot_cache (accessed_at)')
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._conn = conn
+            self.logger.trace(f'Opened PO Token cache database {self._db_path}')
+        return self._conn
+
+    def _execute(self, func):
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    return func(conn)
+            except (sqlite3.Error, OSError) as e:
+                raise PoTokenCacheProviderError(
+                    f'Unable to access PO Token cache database {self._db_path}: {e}',
+                    expected=isinstance(e, (sqlite3.OperationalError, OSError))) from e
+
+    def get(self, key: str) -> str | None:
+        def get_value(conn):
+            now = time.time()
+            row = conn.execute(
+                'SELECT value FROM pot_cache WHERE key = ? AND expires_at >= ?', (key, int(now))).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE pot_cache SET accessed_at = ? WHERE key = ?', (now, key))
+            return row[0]
+
+        return self._execute(get_value)
+
+    def store(self, key: str, value: str, expires_at: int):
+        now = time.time()
+        if expires_at < int(now):
+            return
+
+        def store_value(conn):
+            conn.execute(
+                'INSERT OR REPLACE INTO pot_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, value, expires_at, now))
+            conn.execute('DELETE FROM pot_cache WHERE expires_at < ?', (int(now),))
+            conn.execute(
+                'DELETE FROM pot_cache WHERE key IN ('
+                'SELECT key FROM pot_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)', (self.max_size,))
+
+        self._execute(store_value)
+
+    def delete(self, key: str):
+        self._execute(lambda conn: conn.execute('DELETE FROM pot_cache WHERE key = ?', (key,)))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@register_preference(SQLiteFilePCP)
+def sqlitefile_preference(*_, **__):
+    # Lookups are slower than the memory cache, but faster than external caches and providers
+    return 1000
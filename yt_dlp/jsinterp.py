@@ -5,6 +5,7 @@
 import math
 import operator
 import re
+import threading
 
 from .utils import (
     NO_DEFAULT,
@@ -151,7 +152,7 @@ def js_number_to_string(val: float, radix: int = 10):
 
 
 # Ref: https://developer.mozilla.org/en-US/docs/Web/JavaScript/Reference/Operators/Operator_Precedence
-_OPERATORS = {  # None => Defined in JSInterpreter._operator
+_OPERATORS = {  # None => Defined in JSInterpreter._compile_operator
     '?': None,
     '??': None,
     '||': None,
@@ -253,7 +254,9 @@ def interpret_statement(self, stmt, local_vars, allow_recursion, *args, **kwargs
 
 
 class JSInterpreter:
-    __named_object_counter = 0
+    __named_object_counter = itertools.count(1)
+    # Parsed statements kept per interpreter; the oldest ones are dropped beyond this
+    _MAX_COMPILED = 8192
 
     _RE_FLAGS = {
         # special knowledge: Python's re flags are bitmask values, current max 128
@@ -269,7 +272,8 @@ class JSInterpreter:
     }
 
     def __init__(self, code, objects=None):
-        self.code, self._functions = code, {}
+        self.code, self._functions, self._compiled = code, {}, {}
+        self._compiled_lock = threading.Lock()
         self._objects = {} if objects is None else objects
 
     class Exception(ExtractorError):  # noqa: A001
@@ -279,11 +283,8 @@ def __init__(self, msg, expr=None, *args, **kwargs):
             super().__init__(msg, *args, **kwargs)
 
     def _named_object(self, namespace, obj):
-        self.__named_object_counter += 1
-        name = f'__yt_dlp_jsinterp_obj{self.__named_object_counter}'
-        if callable(obj) and not isinstance(obj, function_with_repr):
-            obj = function_with_repr(obj, f'F<{self.__named_object_counter}>')
-        namespace[name] = obj
+        name = self._placeholder()
+        self._store(namespace, name, obj)
         return name
 
     @classmethod
@@ -345,24 +346,32 @@ def _separate_at_paren(cls, expr, delim=None):
             raise cls.Exception(f'No terminating paren {delim}', expr)
         return separated[0][1:].strip(), separated[1].strip()
 
-    def _operator(self, op, left_val, right_expr, expr, local_vars, allow_recursion):
-        if op in ('||', '&&'):
-            if (op == '&&') ^ _js_ternary(left_val):
-                return left_val  # short circuiting
-        elif op == '??':
-            if left_val not in (None, JS_Undefined):
-                return left_val
-        elif op == '?':
-            right_expr = _js_ternary(left_val, *self._separate(right_expr, ':', 1))
-
-        right_val = self.interpret_expression(right_expr, local_vars, allow_recursion)
-        if not _OPERATORS.get(op):
-            return right_val
+    def _compile_operator(self, op, right_expr, expr):
+        """ Compile `<left> op right_expr` into a function of the evaluated left side """
+        if op == '?':
+            branches = list(self._separate(right_expr, ':', 1))
+        evaluate = _OPERATORS.get(op)
+
+        def operator(left_val, local_vars, allow_recursion):
+            right = right_expr
+            if op in ('||', '&&'):
+                if (op == '&&') ^ _js_ternary(left_val):
+                    return left_val  # short circuiting
+            elif op == '??':
+                if left_val not in (None, JS_Undefined):
+                    return left_val
+            elif op == '?':
+                right = _js_ternary(left_val, *branches)
+
+            right_val = self.interpret_expression(right, local_vars, allow_recursion)
+            if not evaluate:
+                return right_val
 
-        try:
-            return _OPERATORS[op](left_val, right_val)
-        except Exception as e:
-            raise self.Exception(f'Failed to evaluate {left_val!r} {op} {right_val!r}', expr, cause=e)
+            try:
+                return evaluate(left_val, right_val)
+            except Exception as e:
+                raise self.Exception(f'Failed to evaluate {left_val!r} {op} {right_val!r}', expr, cause=e)
+        return operator
 
     def _index(self, obj, idx, allow_undefined=False):
         if idx == 'length':
@@ -374,35 +383,112 @@ def _index(self, obj, idx, allow_undefined=False):
                 return JS_Undefined
             raise self.Exception(f'Cannot get index {idx}', repr(obj), cause=e)
 
-    def _dump(self, obj, namespace):
-        try:
-            return json.dumps(obj)
-        except TypeError:
-            return self._named_object(namespace, obj)
-
     @Debugger.wrap_interpreter
     def interpret_statement(self, stmt, local_vars, allow_recursion=100):
         if allow_recursion < 0:
             raise self.Exception('Recursion limit reached')
-        allow_recursion -= 1
-
-        should_return = False
+        compiled = self._compiled.get(stmt)
+        if compiled is None:
+            compiled = self._compile_statement(stmt)
+            with self._compiled_lock:
+                if len(self._compiled) >= self._MAX_COMPILED:
+                    del self._compiled[next(iter(self._compiled))]
+                self._compiled[stmt] = compiled
+        return compiled(local_vars, allow_recursion - 1)
+
+    def _compile_statement(self, stmt):
+        """
+        Parse a statement into a function of (local_vars, allow_recursion),
+        that returns the same (value, should_return) as interpreting it would
+
+        Parsing does not depend on the values of variables, so the result is
+        cached by the code of the statement, and each piece of JS code is usually
+        only parsed once per interpreter. The ;-separated parts are parsed when
+        they are first reached, so that errors are raised at the same point
+        """
         sub_statements = list(self._separate(stmt, ';')) or ['']
-        expr = stmt = sub_statements.pop().strip()
-
-        for sub_stmt in sub_statements:
-            ret, should_return = self.interpret_statement(sub_stmt, local_vars, allow_recursion)
-            if should_return:
-                return ret, should_return
-
+        last = sub_statements.pop().strip()
+        if not sub_statements:
+            return self._compile_part(last)
+        compiled = None
+
+        def statements(local_vars, allow_recursion):
+            nonlocal compiled
+            for sub_stmt in sub_statements:
+                ret, should_return = self.interpret_statement(sub_stmt, local_vars, allow_recursion)
+                if should_return:
+                    return ret, should_return
+            if compiled is None:
+                compiled = self._compile_part(last)
+            return compiled(local_vars, allow_recursion)
+        return statements
+
+    def _compile_part(self, stmt):
         m = re.match(r'(?P<var>(?:var|const|let)\s)|return(?:\s+|(?=["\'])|$)|(?P<throw>throw\s+)', stmt)
-        if m:
-            expr = stmt[len(m.group(0)):].strip()
-            if m.group('throw'):
+        if not m:
+            return self._compile_expression(stmt, stmt, False)
+        expr = stmt[len(m.group(0)):].strip()
+        if m.group('throw'):
+            def throw(local_vars, allow_recursion):
                 raise JS_Throw(self.interpret_expression(expr, local_vars, allow_recursion))
-            should_return = not m.group('var')
+            return throw
+        return self._compile_expression(expr, stmt, not m.group('var'))
+
+    def _placeholder(self):
+        # next() of a count is atomic, so interpreters can be used from several threads
+        return f'__yt_dlp_jsinterp_obj{next(self.__named_object_counter)}'
+
+    def _continuation(self, outer, stmt, should_return):
+        """
+        Intermediate values are stored in the namespace under a placeholder
+        name that is fixed at parse time, so that the rest of the expression
+        is always the same code. Returns the name and a function evaluating
+        the rest of the expression
+        """
+        name = self._placeholder()
+        expr = name + outer
+        compiled = None
+
+        def continuation(local_vars, allow_recursion):
+            nonlocal compiled
+            if compiled is None:
+                compiled = self._compile_expression(expr, stmt, should_return)
+            return compiled(local_vars, allow_recursion)
+        return name, continuation
+
+    @staticmethod
+    def _store(local_vars, name, obj):
+        if callable(obj) and not isinstance(obj, function_with_repr):
+            obj = function_with_repr(obj, f'F<{name[len("__yt_dlp_jsinterp_obj"):]}>')
+        local_vars[name] = obj
+
+    def _compile_expression(self, expr, stmt, should_return):
+        def constant(value):
+            return lambda local_vars, allow_recursion: (value, should_return)
+
+        def then(outer, evaluate):
+            """ Evaluate the value, then `outer` applied to it """
+            name, continuation = self._continuation(outer, stmt, should_return)
+
+            def compiled(local_vars, allow_recursion):
+                self._store(local_vars, name, evaluate(local_vars, allow_recursion))
+                return continuation(local_vars, allow_recursion)
+            return compiled
+
+        def block(inner, outer):
+            """ Interpret the inner statement, then `outer` applied to its value """
+            name, continuation = self._continuation(outer, stmt, should_return) if outer else (None, None)
+
+            def compiled(local_vars, allow_recursion):
+                ret, should_abort = self.interpret_statement(inner, local_vars, allow_recursion)
+                if not outer or should_abort:
+                    return ret, should_abort or should_return
+                self._store(local_vars, name, ret)
+                return continuation(local_vars, allow_recursion)
+            return compiled
+
         if not expr:
-            return None, should_return
+            return constant(None)
 
         if expr[0] in _QUOTES:
             inner, outer = self._separate(expr, expr[0], 1)
@@ -415,58 +501,57 @@ def interpret_statement(self, stmt, local_vars, allow_recursion=100):
             else:
                 inner = json.loads(js_to_json(f'{inner}{expr[0]}', strict=True))
             if not outer:
-                return inner, should_return
-            expr = self._named_object(local_vars, inner) + outer
+                return constant(inner)
+            return then(outer, lambda local_vars, allow_recursion: inner)
 
         if expr.startswith('new '):
             obj = expr[4:]
             if obj.startswith('Date('):
                 left, right = self._separate_at_paren(obj[4:])
-                date = unified_timestamp(
-                    self.interpret_expression(left, local_vars, allow_recursion), False)
-                if date is None:
-                    raise self.Exception(f'Failed to parse date {left!r}', expr)
-                expr = self._dump(int(date * 1000), local_vars) + right
+
+                def new_date(local_vars, allow_recursion):
+                    date = unified_timestamp(
+                        self.interpret_expression(left, local_vars, allow_recursion), False)
+                    if date is None:
+                        raise self.Exception(f'Failed to parse date {left!r}', expr)
+                    return int(date * 1000)
+                return then(right, new_date)
             else:
                 raise self.Exception(f'Unsupported object {obj}', expr)
 
         if expr.startswith('void '):
-            left = self.interpret_expression(expr[5:], local_vars, allow_recursion)
-            return None, should_return
+            def void(local_vars, allow_recursion):
+                self.interpret_expression(expr[5:], local_vars, allow_recursion)
+                return None, should_return
+            return void
 
         if expr.startswith('{'):
             inner, outer = self._separate_at_paren(expr)
             # try for object expression (Map)
             sub_expressions = [list(self._separate(sub_expr.strip(), ':', 1)) for sub_expr in self._separate(inner)]
             if all(len(sub_expr) == 2 for sub_expr in sub_expressions):
-                def dict_item(key, val):
-                    val = self.interpret_expression(val, local_vars, allow_recursion)
-                    if re.match(_NAME_RE, key):
-                        return key, val
-                    return self.interpret_expression(key, local_vars, allow_recursion), val
+                items = [(key, bool(re.match(_NAME_RE, key)), val) for key, val in sub_expressions]
 
-                return dict(dict_item(k, v) for k, v in sub_expressions), should_return
+                def object_literal(local_vars, allow_recursion):
+                    obj = {}
+                    for key, is_name, val in items:
+                        val = self.interpret_expression(val, local_vars, allow_recursion)
+                        obj[key if is_name else self.interpret_expression(key, local_vars, allow_recursion)] = val
+                    return obj, should_return
+                return object_literal
 
-            inner, should_abort = self.interpret_statement(inner, local_vars, allow_recursion)
-            if not outer or should_abort:
-                return inner, should_abort or should_return
-            else:
-                expr = self._dump(inner, local_vars) + outer
+            return block(inner, outer)
 
         if expr.startswith('('):
-            inner, outer = self._separate_at_paren(expr)
-            inner, should_abort = self.interpret_statement(inner, local_vars, allow_recursion)
-            if not outer or should_abort:
-                return inner, should_abort or should_return
-            else:
-                expr = self._dump(inner, local_vars) + outer
+            return block(*self._separate_at_paren(expr))
 
         if expr.startswith('['):
             inner, outer = self._separate_at_paren(expr)
-            name = self._named_object(local_vars, [
-                self.interpret_expression(item, local_vars, allow_recursion)
-                for item in self._separate(inner)])
-            expr = name + outer
+            items = list(self._separate(inner))
+
+            def array_literal(local_vars, allow_recursion):
+                return [self.interpret_expression(item, local_vars, allow_recursion) for item in items]
+            return then(outer, array_literal)
 
         m = re.match(r'''(?x)
                 (?P<try>try)\s*\{|
@@ -474,121 +559,19 @@ def dict_item(key, val):
                 (?P<switch>switch)\s*\(|
                 (?P<for>for)\s*\(
                 ''', expr)
-        md = m.groupdict() if m else {}
-        if md.get('if'):
-            cndn, expr = self._separate_at_paren(expr[m.end() - 1:])
-            if_expr, expr = self._separate_at_paren(expr.lstrip())
-            # TODO: "else if" is not handled
-            else_expr = None
-            m = re.match(r'else\s*{', expr)
-            if m:
-                else_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-            cndn = _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion))
-            ret, should_abort = self.interpret_statement(
-                if_expr if cndn else else_expr, local_vars, allow_recursion)
-            if should_abort:
-                return ret, True
-
-        if md.get('try'):
-            try_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-            err = None
-            try:
-                ret, should_abort = self.interpret_statement(try_expr, local_vars, allow_recursion)
-                if should_abort:
-                    return ret, True
-            except Exception as e:
-                # XXX: This works for now, but makes debugging future issues very hard
-                err = e
-
-            pending = (None, False)
-            m = re.match(fr'catch\s*(?P<err>\(\s*{_NAME_RE}\s*\))?\{{', expr)
-            if m:
-                sub_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-                if err:
-                    catch_vars = {}
-                    if m.group('err'):
-                        catch_vars[m.group('err')] = err.error if isinstance(err, JS_Throw) else err
-                    catch_vars = local_vars.new_child(catch_vars)
-                    err, pending = None, self.interpret_statement(sub_expr, catch_vars, allow_recursion)
-
-            m = re.match(r'finally\s*\{', expr)
-            if m:
-                sub_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-                ret, should_abort = self.interpret_statement(sub_expr, local_vars, allow_recursion)
-                if should_abort:
-                    return ret, True
-
-            ret, should_abort = pending
-            if should_abort:
-                return ret, True
-
-            if err:
-                raise err
-
-        elif md.get('for'):
-            constructor, remaining = self._separate_at_paren(expr[m.end() - 1:])
-            if remaining.startswith('{'):
-                body, expr = self._separate_at_paren(remaining)
-            else:
-                switch_m = re.match(r'switch\s*\(', remaining)  # FIXME: ?
-                if switch_m:
-                    switch_val, remaining = self._separate_at_paren(remaining[switch_m.end() - 1:])
-                    body, expr = self._separate_at_paren(remaining, '}')
-                    body = 'switch(%s){%s}' % (switch_val, body)
-                else:
-                    body, expr = remaining, ''
-            start, cndn, increment = self._separate(constructor, ';')
-            self.interpret_expression(start, local_vars, allow_recursion)
-            while True:
-                if not _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion)):
-                    break
-                try:
-                    ret, should_abort = self.interpret_statement(body, local_vars, allow_recursion)
-                    if should_abort:
-                        return ret, True
-                except JS_Break:
-                    break
-                except JS_Continue:
-                    pass
-                self.interpret_expression(increment, local_vars, allow_recursion)
-
-        elif md.get('switch'):
-            switch_val, remaining = self._separate_at_paren(expr[m.end() - 1:])
-            switch_val = self.interpret_expression(switch_val, local_vars, allow_recursion)
-            body, expr = self._separate_at_paren(remaining, '}')
-            items = body.replace('default:', 'case default:').split('case ')[1:]
-            for default in (False, True):
-                matched = False
-                for item in items:
-                    case, stmt = (i.strip() for i in self._separate(item, ':', 1))
-                    if default:
-                        matched = matched or case == 'default'
-                    elif not matched:
-                        matched = (case != 'default'
-                                   and switch_val == self.interpret_expression(case, local_vars, allow_recursion))
-                    if not matched:
-                        continue
-                    try:
-                        ret, should_abort = self.interpret_statement(stmt, local_vars, allow_recursion)
-                        if should_abort:
-                            return ret
-                    except JS_Break:
-                        break
-                if matched:
-                    break
-
-        if md:
-            ret, should_abort = self.interpret_statement(expr, local_vars, allow_recursion)
-            return ret, should_abort or should_return
+        if m:
+            return self._compile_control(m, expr, should_return)
 
         # Comma separated statements
         sub_expressions = list(self._separate(expr))
         if len(sub_expressions) > 1:
-            for sub_expr in sub_expressions:
-                ret, should_abort = self.interpret_statement(sub_expr, local_vars, allow_recursion)
-                if should_abort:
-                    return ret, True
-            return ret, False
+            def comma(local_vars, allow_recursion):
+                for sub_expr in sub_expressions:
+                    ret, should_abort = self.interpret_statement(sub_expr, local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+                return ret, False
+            return comma
 
         m = re.match(fr'''(?x)
                 (?P<out>{_NAME_RE})(?:\[(?P<index>{_NESTED_BRACKETS})\])?\s*
@@ -596,37 +579,46 @@ def dict_item(key, val):
                 =(?!=)(?P<expr>.*)$
             ''', expr)
         if m:  # We are assigning a value to a variable
-            left_val = local_vars.get(m.group('out'))
-
-            if not m.group('index'):
-                local_vars[m.group('out')] = self._operator(
-                    m.group('op'), left_val, m.group('expr'), expr, local_vars, allow_recursion)
-                return local_vars[m.group('out')], should_return
-            elif left_val in (None, JS_Undefined):
-                raise self.Exception(f'Cannot index undefined variable {m.group("out")}', expr)
-
-            idx = self.interpret_expression(m.group('index'), local_vars, allow_recursion)
-            if not isinstance(idx, (int, float)):
-                raise self.Exception(f'List index {idx} must be integer', expr)
-            idx = int(idx)
-            left_val[idx] = self._operator(
-                m.group('op'), self._index(left_val, idx), m.group('expr'), expr, local_vars, allow_recursion)
-            return left_val[idx], should_return
-
+            out, index = m.group('out', 'index')
+            operator = self._compile_operator(m.group('op'), m.group('expr'), expr)
+
+            if not index:
+                def assign(local_vars, allow_recursion):
+                    local_vars[out] = operator(local_vars.get(out), local_vars, allow_recursion)
+                    return local_vars[out], should_return
+                return assign
+
+            def assign_index(local_vars, allow_recursion):
+                left_val = local_vars.get(out)
+                if left_val in (None, JS_Undefined):
+                    raise self.Exception(f'Cannot index undefined variable {out}', expr)
+                idx = self.interpret_expression(index, local_vars, allow_recursion)
+                if not isinstance(idx, (int, float)):
+                    raise self.Exception(f'List index {idx} must be integer', expr)
+                idx = int(idx)
+                left_val[idx] = operator(self._index(left_val, idx), local_vars, allow_recursion)
+                return left_val[idx], should_return
+            return assign_index
+
+        updates, parts, end = [], [], 0
         for m in re.finditer(rf'''(?x)
                 (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
                 (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''', expr):
-            var = m.group('var1') or m.group('var2')
-            start, end = m.span()
+            name = self._placeholder()
             sign = m.group('pre_sign') or m.group('post_sign')
-            ret = local_vars[var]
-            local_vars[var] += 1 if sign[0] == '+' else -1
-            if m.group('pre_sign'):
-                ret = local_vars[var]
-            expr = expr[:start] + self._dump(ret, local_vars) + expr[end:]
-
-        if not expr:
-            return None, should_return
+            updates.append((m.group('var1') or m.group('var2'), 1 if sign[0] == '+' else -1, bool(m.group('pre_sign')), name))
+            parts.extend((expr[end:m.start()], name))
+            end = m.end()
+        if updates:
+            rest = self._compile_expression(''.join(parts) + expr[end:], stmt, should_return)
+
+            def update(local_vars, allow_recursion):
+                for var, step, pre, name in updates:
+                    ret = local_vars[var]
+                    local_vars[var] += step
+                    self._store(local_vars, name, local_vars[var] if pre else ret)
+                return rest(local_vars, allow_recursion)
+            return update
 
         m = re.match(fr'''(?x)
             (?P<return>
@@ -642,27 +634,36 @@ def dict_item(key, val):
                 (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
             )''', expr)
         if expr.isdigit():
-            return int(expr), should_return
+            return constant(int(expr))
+
+        elif expr in ('break', 'continue'):
+            exception = JS_Break if expr == 'break' else JS_Continue
 
-        elif expr == 'break':
-            raise JS_Break
-        elif expr == 'continue':
-            raise JS_Continue
+            def jump(local_vars, allow_recursion):
+                raise exception
+            return jump
         elif expr == 'undefined':
-            return JS_Undefined, should_return
+            return constant(JS_Undefined)
         elif expr == 'NaN':
-            return float('NaN'), should_return
+            return constant(float('NaN'))
 
         elif m and m.group('return'):
-            return local_vars.get(m.group('name'), JS_Undefined), should_return
+            name = m.group('name')
+            return lambda local_vars, allow_recursion: (local_vars.get(name, JS_Undefined), should_return)
 
         with contextlib.suppress(ValueError):
-            return json.loads(js_to_json(expr, strict=True)), should_return
+            value = json.loads(js_to_json(expr, strict=True))
+            if not isinstance(value, (list, dict)):
+                return constant(value)
+            return lambda local_vars, allow_recursion: (json.loads(js_to_json(expr, strict=True)), should_return)
 
         if m and m.group('indexing'):
-            val = local_vars[m.group('in')]
-            idx = self.interpret_expression(m.group('idx'), local_vars, allow_recursion)
-            return self._index(val, idx), should_return
+            name, idx = m.group('in', 'idx')
+
+            def indexing(local_vars, allow_recursion):
+                val = local_vars[name]
+                return self._index(val, self.interpret_expression(idx, local_vars, allow_recursion)), should_return
+            return indexing
 
         for op in _OPERATORS:
             separated = list(self._separate(expr, op))
@@ -677,175 +678,305 @@ def dict_item(key, val):
                     right_expr = f'{separated.pop()}{op}{right_expr}'
             if not separated:
                 continue
-            left_val = self.interpret_expression(op.join(separated), local_vars, allow_recursion)
-            return self._operator(op, left_val, right_expr, expr, local_vars, allow_recursion), should_return
+            left_expr = op.join(separated)
+            operator = self._compile_operator(op, right_expr, expr)
+
+            def operation(local_vars, allow_recursion):
+                left_val = self.interpret_expression(left_expr, local_vars, allow_recursion)
+                return operator(left_val, local_vars, allow_recursion), should_return
+            return operation
 
         if m and m.group('attribute'):
-            variable, member, nullish = m.group('var', 'member', 'nullish')
-            if not member:
-                member = self.interpret_expression(m.group('member2'), local_vars, allow_recursion)
-            arg_str = expr[m.end():]
-            if arg_str.startswith('('):
-                arg_str, remaining = self._separate_at_paren(arg_str)
-            else:
-                arg_str, remaining = None, arg_str
-
-            def assertion(cndn, msg):
-                """ assert, but without risk of getting optimized out """
-                if not cndn:
-                    raise self.Exception(f'{member} {msg}', expr)
-
-            def eval_method():
-                nonlocal member
-
-                if (variable, member) == ('console', 'debug'):
-                    if Debugger.ENABLED:
-                        Debugger.write(self.interpret_expression(f'[{arg_str}]', local_vars, allow_recursion))
-                    return
-
-                types = {
-                    'String': str,
-                    'Math': float,
-                    'Array': list,
-                }
-                obj = local_vars.get(variable, types.get(variable, NO_DEFAULT))
-                if obj is NO_DEFAULT:
-                    if variable not in self._objects:
-                        try:
-                            self._objects[variable] = self.extract_object(variable, local_vars)
-                        except self.Exception:
-                            if not nullish:
-                                raise
-                    obj = self._objects.get(variable, JS_Undefined)
-
-                if nullish and obj is JS_Undefined:
-                    return JS_Undefined
-
-                # Member access
-                if arg_str is None:
-                    return self._index(obj, member, nullish)
-
-                # Function call
-                argvals = [
-                    self.interpret_expression(v, local_vars, allow_recursion)
-                    for v in self._separate(arg_str)]
-
-                # Fixup prototype call
-                if isinstance(obj, type) and member.startswith('prototype.'):
-                    new_member, _, func_prototype = member.partition('.')[2].partition('.')
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(isinstance(argvals[0], obj), f'needs binding to type {obj}')
-                    if func_prototype == 'call':
-                        obj, *argvals = argvals
-                    elif func_prototype == 'apply':
-                        assertion(len(argvals) == 2, 'takes two arguments')
-                        obj, argvals = argvals
-                        assertion(isinstance(argvals, list), 'second argument needs to be a list')
-                    else:
-                        raise self.Exception(f'Unsupported Function method {func_prototype}', expr)
-                    member = new_member
-
-                if obj is str:
-                    if member == 'fromCharCode':
-                        assertion(argvals, 'takes one or more arguments')
-                        return ''.join(map(chr, argvals))
-                    raise self.Exception(f'Unsupported String method {member}', expr)
-                elif obj is float:
-                    if member == 'pow':
-                        assertion(len(argvals) == 2, 'takes two arguments')
-                        return argvals[0] ** argvals[1]
-                    raise self.Exception(f'Unsupported Math method {member}', expr)
-
-                if member == 'split':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) == 1, 'with limit argument is not implemented')
-                    return obj.split(argvals[0]) if argvals[0] else list(obj)
-                elif member == 'join':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    return argvals[0].join(obj)
-                elif member == 'reverse':
-                    assertion(not argvals, 'does not take any arguments')
-                    obj.reverse()
-                    return obj
-                elif member == 'slice':
-                    assertion(isinstance(obj, (list, str)), 'must be applied on a list or string')
-                    assertion(len(argvals) <= 2, 'takes between 0 and 2 arguments')
-                    return obj[slice(*argvals, None)]
-                elif member == 'splice':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(argvals, 'takes one or more arguments')
-                    index, how_many = map(int, ([*argvals, len(obj)])[:2])
-                    if index < 0:
-                        index += len(obj)
-                    add_items = argvals[2:]
-                    res = []
-                    for _ in range(index, min(index + how_many, len(obj))):
-                        res.append(obj.pop(index))
-                    for i, item in enumerate(add_items):
-                        obj.insert(index + i, item)
-                    return res
-                elif member == 'unshift':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(argvals, 'takes one or more arguments')
-                    for item in reversed(argvals):
-                        obj.insert(0, item)
-                    return obj
-                elif member == 'pop':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(not argvals, 'does not take any arguments')
-                    if not obj:
-                        return
-                    return obj.pop()
-                elif member == 'push':
-                    assertion(argvals, 'takes one or more arguments')
-                    obj.extend(argvals)
-                    return obj
-                elif member == 'forEach':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
-                    f, this = ([*argvals, ''])[:2]
-                    return [f((item, idx, obj), {'this': this}, allow_recursion) for idx, item in enumerate(obj)]
-                elif member == 'indexOf':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
-                    idx, start = ([*argvals, 0])[:2]
-                    try:
-                        return obj.index(idx, start)
-                    except ValueError:
-                        return -1
-                elif member == 'charCodeAt':
-                    assertion(isinstance(obj, str), 'must be applied on a string')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    idx = argvals[0] if isinstance(argvals[0], int) else 0
-                    if idx >= len(obj):
-                        return None
-                    return ord(obj[idx])
-
-                idx = int(member) if isinstance(obj, list) else member
-                return obj[idx](argvals, allow_recursion=allow_recursion)
-
-            if remaining:
-                ret, should_abort = self.interpret_statement(
-                    self._named_object(local_vars, eval_method()) + remaining,
-                    local_vars, allow_recursion)
-                return ret, should_return or should_abort
-            else:
-                return eval_method(), should_return
+            return self._compile_attribute(m, expr, should_return)
 
         elif m and m.group('function'):
             fname = m.group('fname')
-            argvals = [self.interpret_expression(v, local_vars, allow_recursion)
-                       for v in self._separate(m.group('args'))]
-            if fname in local_vars:
-                return local_vars[fname](argvals, allow_recursion=allow_recursion), should_return
-            elif fname not in self._functions:
-                self._functions[fname] = self.extract_function(fname)
-            return self._functions[fname](argvals, allow_recursion=allow_recursion), should_return
+            args = list(self._separate(m.group('args')))
+
+            def call(local_vars, allow_recursion):
+                argvals = [self.interpret_expression(v, local_vars, allow_recursion) for v in args]
+                if fname in local_vars:
+                    return local_vars[fname](argvals, allow_recursion=allow_recursion), should_return
+                elif fname not in self._functions:
+                    self._functions[fname] = self.extract_function(fname)
+                return self._functions[fname](argvals, allow_recursion=allow_recursion), should_return
+            return call
 
         raise self.Exception(
             f'Unsupported JS expression {truncate_string(expr, 20, 20) if expr != stmt else ""}', stmt)
 
+    def _compile_control(self, m, expr, should_return):
+        """ Compile a try, if, switch or for statement and the code that follows it """
+        md = m.groupdict()
+        if md.get('if'):
+            cndn, expr = self._separate_at_paren(expr[m.end() - 1:])
+            if_expr, expr = self._separate_at_paren(expr.lstrip())
+            # TODO: "else if" is not handled
+            else_expr = None
+            m = re.match(r'else\s*{', expr)
+            if m:
+                else_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+
+            def control(local_vars, allow_recursion):
+                cndn_val = _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion))
+                return self.interpret_statement(if_expr if cndn_val else else_expr, local_vars, allow_recursion)
+
+        elif md.get('try'):
+            try_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+            catch_expr = catch_name = finally_expr = None
+            m = re.match(fr'catch\s*(?P<err>\(\s*{_NAME_RE}\s*\))?\{{', expr)
+            if m:
+                catch_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+                catch_name = m.group('err')
+            m = re.match(r'finally\s*\{', expr)
+            if m:
+                finally_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+
+            def control(local_vars, allow_recursion):
+                err = None
+                try:
+                    ret, should_abort = self.interpret_statement(try_expr, local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+                except Exception as e:
+                    # XXX: This works for now, but makes debugging future issues very hard
+                    err = e
+
+                pending = (None, False)
+                if catch_expr is not None and err:
+                    catch_vars = {}
+                    if catch_name:
+                        catch_vars[catch_name] = err.error if isinstance(err, JS_Throw) else err
+                    catch_vars = local_vars.new_child(catch_vars)
+                    err, pending = None, self.interpret_statement(catch_expr, catch_vars, allow_recursion)
+
+                if finally_expr is not None:
+                    ret, should_abort = self.interpret_statement(finally_expr, local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+
+                if err:
+                    raise err
+                return pending
+
+        elif md.get('for'):
+            constructor, remaining = self._separate_at_paren(expr[m.end() - 1:])
+            if remaining.startswith('{'):
+                body, expr = self._separate_at_paren(remaining)
+            else:
+                switch_m = re.match(r'switch\s*\(', remaining)  # FIXME: ?
+                if switch_m:
+                    switch_val, remaining = self._separate_at_paren(remaining[switch_m.end() - 1:])
+                    body, expr = self._separate_at_paren(remaining, '}')
+                    body = 'switch(%s){%s}' % (switch_val, body)
+                else:
+                    body, expr = remaining, ''
+            start, cndn, increment = self._separate(constructor, ';')
+
+            def control(local_vars, allow_recursion):
+                self.interpret_expression(start, local_vars, allow_recursion)
+                while True:
+                    if not _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion)):
+                        break
+                    try:
+                        ret, should_abort = self.interpret_statement(body, local_vars, allow_recursion)
+                        if should_abort:
+                            return ret, True
+                    except JS_Break:
+                        break
+                    except JS_Continue:
+                        pass
+                    self.interpret_expression(increment, local_vars, allow_recursion)
+                return None, False
+
+        elif md.get('switch'):
+            switch_expr, remaining = self._separate_at_paren(expr[m.end() - 1:])
+            body, expr = self._separate_at_paren(remaining, '}')
+            items = body.replace('default:', 'case default:').split('case ')[1:]
+            cases = [tuple(i.strip() for i in self._separate(item, ':', 1)) for item in items]
+
+            def control(local_vars, allow_recursion):
+                switch_val = self.interpret_expression(switch_expr, local_vars, allow_recursion)
+                for default in (False, True):
+                    matched = False
+                    for case, case_stmt in cases:
+                        if default:
+                            matched = matched or case == 'default'
+                        elif not matched:
+                            matched = (case != 'default'
+                                       and switch_val == self.interpret_expression(case, local_vars, allow_recursion))
+                        if not matched:
+                            continue
+                        try:
+                            ret, should_abort = self.interpret_statement(case_stmt, local_vars, allow_recursion)
+                            if should_abort:
+                                return ret, True
+                        except JS_Break:
+                            break
+                    if matched:
+                        break
+                return None, False
+
+        def statement(local_vars, allow_recursion):
+            ret, should_abort = control(local_vars, allow_recursion)
+            if should_abort:
+                return ret, True
+            ret, should_abort = self.interpret_statement(expr, local_vars, allow_recursion)
+            return ret, should_abort or should_return
+        return statement
+
+    def _compile_attribute(self, m, expr, should_return):
+        variable, member, nullish, member2 = m.group('var', 'member', 'nullish', 'member2')
+        arg_str = expr[m.end():]
+        if arg_str.startswith('('):
+            arg_str, remaining = self._separate_at_paren(arg_str)
+            args = list(self._separate(arg_str))
+        else:
+            arg_str, remaining = None, arg_str
+        name = remaining and self._placeholder()
+
+        def attribute(local_vars, allow_recursion):
+            member_name = member or self.interpret_expression(member2, local_vars, allow_recursion)
+            ret = self._eval_method(
+                variable, member_name, nullish, arg_str, arg_str is not None and args, expr, local_vars, allow_recursion)
+            if not remaining:
+                return ret, should_return
+            self._store(local_vars, name, ret)
+            ret, should_abort = self.interpret_statement(name + remaining, local_vars, allow_recursion)
+            return ret, should_return or should_abort
+        return attribute
+
+    def _eval_method(self, variable, member, nullish, arg_str, args, expr, local_vars, allow_recursion):
+        def assertion(cndn, msg):
+            """ assert, but without risk of getting optimized out """
+            if not cndn:
+                raise self.Exception(f'{member} {msg}', expr)
+
+        if (variable, member) == ('console', 'debug'):
+            if Debugger.ENABLED:
+                Debugger.write(self.interpret_expression(f'[{arg_str}]', local_vars, allow_recursion))
+            return
+
+        types = {
+            'String': str,
+            'Math': float,
+            'Array': list,
+        }
+        obj = local_vars.get(variable, types.get(variable, NO_DEFAULT))
+        if obj is NO_DEFAULT:
+            if variable not in self._objects:
+                try:
+                    self._objects[variable] = self.extract_object(variable, local_vars)
+                except self.Exception:
+                    if not nullish:
+                        raise
+            obj = self._objects.get(variable, JS_Undefined)
+
+        if nullish and obj is JS_Undefined:
+            return JS_Undefined
+
+        # Member access
+        if arg_str is None:
+            return self._index(obj, member, nullish)
+
+        # Function call
+        argvals = [self.interpret_expression(v, local_vars, allow_recursion) for v in args]
+
+        # Fixup prototype call
+        if isinstance(obj, type) and member.startswith('prototype.'):
+            new_member, _, func_prototype = member.partition('.')[2].partition('.')
+            assertion(argvals, 'takes one or more arguments')
+            assertion(isinstance(argvals[0], obj), f'needs binding to type {obj}')
+            if func_prototype == 'call':
+                obj, *argvals = argvals
+            elif func_prototype == 'apply':
+                assertion(len(argvals) == 2, 'takes two arguments')
+                obj, argvals = argvals
+                assertion(isinstance(argvals, list), 'second argument needs to be a list')
+            else:
+                raise self.Exception(f'Unsupported Function method {func_prototype}', expr)
+            member = new_member
+
+        if obj is str:
+            if member == 'fromCharCode':
+                assertion(argvals, 'takes one or more arguments')
+                return ''.join(map(chr, argvals))
+            raise self.Exception(f'Unsupported String method {member}', expr)
+        elif obj is float:
+            if member == 'pow':
+                assertion(len(argvals) == 2, 'takes two arguments')
+                return argvals[0] ** argvals[1]
+            raise self.Exception(f'Unsupported Math method {member}', expr)
+
+        if member == 'split':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) == 1, 'with limit argument is not implemented')
+            return obj.split(argvals[0]) if argvals[0] else list(obj)
+        elif member == 'join':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            return argvals[0].join(obj)
+        elif member == 'reverse':
+            assertion(not argvals, 'does not take any arguments')
+            obj.reverse()
+            return obj
+        elif member == 'slice':
+            assertion(isinstance(obj, (list, str)), 'must be applied on a list or string')
+            assertion(len(argvals) <= 2, 'takes between 0 and 2 arguments')
+            return obj[slice(*argvals, None)]
+        elif member == 'splice':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(argvals, 'takes one or more arguments')
+            index, how_many = map(int, ([*argvals, len(obj)])[:2])
+            if index < 0:
+                index += len(obj)
+            add_items = argvals[2:]
+            res = []
+            for _ in range(index, min(index + how_many, len(obj))):
+                res.append(obj.pop(index))
+            for i, item in enumerate(add_items):
+                obj.insert(index + i, item)
+            return res
+        elif member == 'unshift':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(argvals, 'takes one or more arguments')
+            for item in reversed(argvals):
+                obj.insert(0, item)
+            return obj
+        elif member == 'pop':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(not argvals, 'does not take any arguments')
+            if not obj:
+                return
+            return obj.pop()
+        elif member == 'push':
+            assertion(argvals, 'takes one or more arguments')
+            obj.extend(argvals)
+            return obj
+        elif member == 'forEach':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
+            f, this = ([*argvals, ''])[:2]
+            return [f((item, idx, obj), {'this': this}, allow_recursion) for idx, item in enumerate(obj)]
+        elif member == 'indexOf':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
+            idx, start = ([*argvals, 0])[:2]
+            try:
+                return obj.index(idx, start)
+            except ValueError:
+                return -1
+        elif member == 'charCodeAt':
+            assertion(isinstance(obj, str), 'must be applied on a string')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            idx = argvals[0] if isinstance(argvals[0], int) else 0
+            if idx >= len(obj):
+                return None
+            return ord(obj[idx])
+
+        idx = int(member) if isinstance(obj, list) else member
+        return obj[idx](argvals, allow_recursion=allow_recursion)
+
     def interpret_expression(self, expr, local_vars, allow_recursion):
         ret, should_return = self.interpret_statement(expr, local_vars, allow_recursion)
         if should_return:
@@ -921,12 +1052,13 @@ def call_function(self, funcname, *args):
     def build_function(self, argnames, code, *global_stack):
         global_stack = list(global_stack) or [{}]
         argnames = tuple(argnames)
+        code = code.replace('\n', ' ')
 
         def resf(args, kwargs={}, allow_recursion=100):
             global_stack[0].update(itertools.zip_longest(argnames, args, fillvalue=None))
             global_stack[0].update(kwargs)
             var_stack = LocalNameSpace(*global_stack)
-            ret, should_abort = self.interpret_statement(code.replace('\n', ' '), var_stack, allow_recursion - 1)
+            ret, should_abort = self.interpret_statement(code, var_stack, allow_recursion - 1)
             if should_abort:
                 return ret
         return resf
@@ -530,6 +530,7 @@ def _preset_alias_callback(option, opt_str, value, parser):
                 'embed-metadata', 'seperate-video-versions', 'no-clean-infojson', 'no-keep-subs', 'no-certifi',
                 'no-youtube-channel-redirect', 'no-youtube-unavailable-videos', 'no-youtube-prefer-utc-upload-date',
                 'prefer-legacy-http-handler', 'manifest-filesize-approx', 'allow-unsafe-ext', 'prefer-vp9-sort',
+                'no-fused-postprocessors',
             }, 'aliases': {
                 'youtube-dl': ['all', '-multistreams', '-playlist-match-filter', '-manifest-filesize-approx', '-allow-unsafe-ext', '-prefer-vp9-sort'],
                 'youtube-dlc': ['all', '-no-youtube-channel-redirect', '-no-live-chat', '-playlist-match-filter', '-manifest-filesize-approx', '-allow-unsafe-ext', '-prefer-vp9-sort'],
@@ -744,7 +745,10 @@ def _preset_alias_callback(option, opt_str, value, parser):
     selection.add_option(
         '--download-archive', metavar='FILE',
         dest='download_archive',
-        help='Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it')
+        help=(
+            'Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it. '
+            'SQLite databases, and new files ending in .sqlite, .sqlite3 or .db, are used as an indexed SQLite archive, '
+            'which is faster for large archives and can be shared by several concurrent processes'))
     selection.add_option(
         '--no-download-archive',
         dest='download_archive', action='store_const', const=None,
@@ -1029,6 +1033,13 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-keep-fragments',
         action='store_false', dest='keep_fragments',
         help='Delete downloaded fragments after downloading is finished (default)')
+    downloader.add_option(
+        '--fragment-buffer-size',
+        dest='fragment_buffer_size', metavar='SIZE', default=None,
+        help=(
+            'Download fragments of up to this size to memory instead of writing them to disk first, '
+            'e.g. 10M (default). Larger fragments are written to disk as before. '
+            'Use 0 to always write fragments to disk'))
     downloader.add_option(
         '--buffer-size',
         dest='buffersize', metavar='SIZE', default='1024',
@@ -1071,6 +1082,13 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-lazy-playlist',
         action='store_false', dest='lazy_playlist',
         help='Process videos in the playlist only after the entire playlist is parsed (default)')
+    downloader.add_option(
+        '--concurrent-playlist-entries',
+        dest='concurrent_playlist_entries', metavar='N', default=1, type=int,
+        help=(
+            'Number of upcoming playlist entries whose information is extracted in the background '
+            'while the current one is being downloaded (default is %default). '
+            'Entries are still downloaded one at a time and in playlist order'))
     downloader.add_option(
         '--xattr-set-filesize',
         dest='xattr_set_filesize', action='store_true',
@@ -51,6 +51,9 @@ class PostProcessor(metaclass=PostProcessorMetaClass):
     """
 
     _downloader = None
+    # Whether the PP accesses the media file at "filepath". Changes to the file
+    # that are pending in an FFmpegPass are written out before such PPs run
+    _USES_MEDIA_FILE = True
 
     def __init__(self, downloader=None):
         self._progress_hooks = []
@@ -117,7 +120,7 @@ def _restrict_to(*, video=True, audio=True, images=True, simulated=True):
 
         def decorator(func):
             @functools.wraps(func)
-            def wrapper(self, info):
+            def wrapper(self, info, *args, **kwargs):
                 if not simulated and (self.get_param('simulate') or self.get_param('skip_download')):
                     return [], info
                 format_type = (
@@ -125,7 +128,7 @@ def wrapper(self, info):
                     else 'audio' if info.get('acodec') != 'none'
                     else 'images')
                 if allowed[format_type]:
-                    return func(self, info)
+                    return func(self, info, *args, **kwargs)
                 else:
                     self.to_screen(f'Skipping {format_type}')
                     return [], info
@@ -149,6 +152,17 @@ def run(self, information):
         """
         return [], information  # by default, keep file and do nothing
 
+    def fuse(self, information, ffmpeg_pass):
+        """Add the changes that run() would make to a pending FFmpegPass
+
+        PostProcessors whose changes are a stream copy of the media file can
+        implement this, so that the file is rewritten only once for all of
+        them. The return value is the same as for run(), and the files are
+        deleted after the pass has been run. NotImplemented is returned if the
+        changes can not be made as part of the pass in its current state.
+        """
+        return NotImplemented
+
     def try_utime(self, path, atime, mtime, errnote='Cannot update utime of file'):
         try:
             os.utime(path, (atime, mtime))
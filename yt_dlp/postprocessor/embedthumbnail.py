@@ -1,4 +1,5 @@
 import base64
+import functools
 import os
 import re
 import subprocess
@@ -53,23 +54,19 @@ def guess():
     def _report_run(self, exe, filename):
         self.to_screen(f'{exe}: Adding thumbnail to "{filename}"')
 
-    @PostProcessor._restrict_to(images=False)
-    def run(self, info):
-        filename = info['filepath']
-        temp_filename = prepend_extension(filename, 'temp')
-
+    def _prepare_thumbnail(self, info):
         if not info.get('thumbnails'):
             self.to_screen('There aren\'t any thumbnails to embed')
-            return [], info
+            return None
 
         idx = next((-i for i, t in enumerate(info['thumbnails'][::-1], 1) if t.get('filepath')), None)
         if idx is None:
             self.to_screen('There are no thumbnails on disk')
-            return [], info
+            return None
         thumbnail_filename = info['thumbnails'][idx]['filepath']
         if not os.path.exists(thumbnail_filename):
             self.report_warning('Skipping embedding the thumbnail because the file is missing.')
-            return [], info
+            return None
 
         # Correct extension for WebP file with wrong extension (see #25687, #25717)
         convertor = FFmpegThumbnailsConvertorPP(self._downloader)
@@ -83,6 +80,35 @@ def run(self, info):
         if info['ext'] not in ('mkv', 'mka') and thumbnail_ext not in ('jpg', 'jpeg', 'png'):
             thumbnail_filename = convertor.convert_thumbnail(thumbnail_filename, 'png')
             thumbnail_ext = 'png'
+        return idx, original_thumbnail, thumbnail_filename, thumbnail_ext
+
+    def _thumbnails_to_delete(self, original_thumbnail, thumbnail_filename):
+        converted = original_thumbnail != thumbnail_filename
+        return (
+            thumbnail_filename if converted or not self._already_have_thumbnail else None,
+            original_thumbnail if converted and not self._already_have_thumbnail else None)
+
+    @staticmethod
+    def _attachment_opts(thumbnail_filename, thumbnail_ext, stream_number):
+        mimetype = f'image/{thumbnail_ext.replace("jpg", "jpeg")}'
+        old_stream, new_stream = stream_number(('tags', 'mimetype'), mimetype)
+        if old_stream is not None:
+            yield from ('-map', f'-0:{old_stream}')
+            new_stream -= 1
+        yield from (
+            '-attach', FFmpegPostProcessor._ffmpeg_filename_argument(thumbnail_filename),
+            f'-metadata:s:{new_stream}', f'mimetype={mimetype}',
+            f'-metadata:s:{new_stream}', f'filename=cover.{thumbnail_ext}')
+
+    @PostProcessor._restrict_to(images=False)
+    def run(self, info):
+        filename = info['filepath']
+        temp_filename = prepend_extension(filename, 'temp')
+
+        thumbnail = self._prepare_thumbnail(info)
+        if not thumbnail:
+            return [], info
+        idx, original_thumbnail, thumbnail_filename, thumbnail_ext = thumbnail
 
         mtime = os.stat(filename).st_mtime
 
@@ -96,18 +122,11 @@ def run(self, info):
             self.run_ffmpeg_multiple_files([filename, thumbnail_filename], temp_filename, options)
 
         elif info['ext'] in ['mkv', 'mka']:
-            options = list(self.stream_copy_opts())
-
-            mimetype = f'image/{thumbnail_ext.replace("jpg", "jpeg")}'
-            old_stream, new_stream = self.get_stream_number(
-                filename, ('tags', 'mimetype'), mimetype)
-            if old_stream is not None:
-                options.extend(['-map', f'-0:{old_stream}'])
-                new_stream -= 1
-            options.extend([
-                '-attach', self._ffmpeg_filename_argument(thumbnail_filename),
-                f'-metadata:s:{new_stream}', f'mimetype={mimetype}',
-                f'-metadata:s:{new_stream}', f'filename=cover.{thumbnail_ext}'])
+            options = [
+                *self.stream_copy_opts(),
+                *self._attachment_opts(
+                    thumbnail_filename, thumbnail_ext, functools.partial(self.get_stream_number, filename)),
+            ]
 
             self._report_run('ffmpeg', filename)
             self.run_ffmpeg(filename, temp_filename, options)
@@ -225,9 +244,24 @@ def run(self, info):
             os.replace(temp_filename, filename)
 
         self.try_utime(filename, mtime, mtime)
-        converted = original_thumbnail != thumbnail_filename
         self._delete_downloaded_files(
-            thumbnail_filename if converted or not self._already_have_thumbnail else None,
-            original_thumbnail if converted and not self._already_have_thumbnail else None,
-            info=info)
+            *self._thumbnails_to_delete(original_thumbnail, thumbnail_filename), info=info)
+        return [], info
+
+    @PostProcessor._restrict_to(images=False)
+    def fuse(self, info, ffmpeg_pass):
+        # Only attachments to matroska are a stream copy with ffmpeg
+        if info['ext'] not in ('mkv', 'mka') or not ffmpeg_pass.can_number_streams:
+            return NotImplemented
+
+        thumbnail = self._prepare_thumbnail(info)
+        if not thumbnail:
+            return [], info
+        _, original_thumbnail, thumbnail_filename, thumbnail_ext = thumbnail
+
+        self._report_run('ffmpeg', ffmpeg_pass.filename)
+        ffmpeg_pass.opts.extend(self._attachment_opts(
+            thumbnail_filename, thumbnail_ext, functools.partial(ffmpeg_pass.attachment_number, self)))
+        ffmpeg_pass.temp_files.extend(filter(None, self._thumbnails_to_delete(original_thumbnail, thumbnail_filename)))
+        ffmpeg_pass.steps.append(self)
         return [], info
@@ -1,11 +1,13 @@
 import collections
 import contextvars
+import copy
 import functools
 import itertools
 import json
 import os
 import re
 import subprocess
+import threading
 import time
 
 from .common import PostProcessor
@@ -239,6 +241,13 @@ def check_version(self):
     def get_audio_codec(self, path):
         if not self.probe_available and not self.available:
             raise PostProcessingError('ffprobe and ffmpeg not found. Please install or provide the path using --ffmpeg-location')
+        if self.probe_basename == 'ffprobe':
+            try:
+                streams = self._probe(path).get('streams') or []
+            except (OSError, ValueError):
+                return None
+            return next((
+                stream.get('codec_name') for stream in streams if stream.get('codec_type') == 'audio'), None)
         try:
             if self.probe_available:
                 cmd = [
@@ -279,12 +288,37 @@ def get_metadata_object(self, path, opts=[]):
                 self.report_warning('Only ffprobe is supported for metadata extraction')
             raise PostProcessingError('ffprobe not found. Please install or provide the path using --ffmpeg-location')
         self.check_version()
+        return self._probe(path, opts)
+
+    # Full ffprobe output of the files probed so far. The key includes the size,
+    # times and inode of the file, so that files which were changed are probed again
+    _probe_cache = collections.OrderedDict()
+    _probe_cache_lock = threading.Lock()
+    _PROBE_CACHE_SIZE = 256
+
+    @staticmethod
+    def _probe_cache_key(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino
+
+    def _probe(self, path, opts=[]):
+        key = None if opts else self._probe_cache_key(path)
+        if key:
+            with self._probe_cache_lock:
+                metadata = self._probe_cache.get(key)
+                if metadata is not None:
+                    self._probe_cache.move_to_end(key)
+                    return copy.deepcopy(metadata)
 
         cmd = [
             self.probe_executable,
             encodeArgument('-hide_banner'),
             encodeArgument('-show_format'),
             encodeArgument('-show_streams'),
+            encodeArgument('-show_chapters'),
             encodeArgument('-print_format'),
             encodeArgument('json'),
         ]
@@ -292,8 +326,15 @@ def get_metadata_object(self, path, opts=[]):
         cmd += opts
         cmd.append(self._ffmpeg_filename_argument(path))
         self.write_debug(f'ffprobe command line: {shell_quote(cmd)}')
-        stdout, _, _ = Popen.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-        return json.loads(stdout)
+        stdout, _, returncode = Popen.run(
+            cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+        metadata = json.loads(stdout)
+        if key and returncode == 0:
+            with self._probe_cache_lock:
+                self._probe_cache[key] = copy.deepcopy(metadata)
+                while len(self._probe_cache) > self._PROBE_CACHE_SIZE:
+                    self._probe_cache.popitem(last=False)
+        return metadata
 
     def get_stream_number(self, path, keys, value):
         streams = self.get_metadata_object(path)['streams']
@@ -592,24 +633,21 @@ def __init__(self, downloader=None, already_have_subtitle=False):
         super().__init__(downloader)
         self._already_have_subtitle = already_have_subtitle
 
-    @PostProcessor._restrict_to(images=False)
-    def run(self, info):
+    def _select_subtitles(self, info):
         if info['ext'] not in self.SUPPORTED_EXTS:
             self.to_screen(f'Subtitles can only be embedded in {", ".join(self.SUPPORTED_EXTS)} files')
-            return [], info
+            return [], [], []
         subtitles = info.get('requested_subtitles')
         if not subtitles:
             self.to_screen('There aren\'t any subtitles to embed')
-            return [], info
-
-        filename = info['filepath']
+            return [], [], []
 
         # Disabled temporarily. There needs to be a way to override this
         # in case of duration actually mismatching in extractor
         # See: https://github.com/yt-dlp/yt-dlp/issues/1870, https://github.com/yt-dlp/yt-dlp/issues/1385
         '''
         if info.get('duration') and not info.get('__real_download') and self._duration_mismatch(
-                self._get_real_video_duration(filename, False), info['duration']):
+                self._get_real_video_duration(info['filepath'], False), info['duration']):
             self.to_screen(f'Skipping {self.pp_key()} since the real and expected durations mismatch')
             return [], info
         '''
@@ -638,24 +676,33 @@ def run(self, info):
                 mp4_ass_warn = True
                 self.report_warning('ASS subtitles cannot be properly embedded in mp4 files; expect issues')
 
+        return sub_langs, sub_names, sub_filenames
+
+    @staticmethod
+    def _subtitle_opts(first_input, sub_langs, sub_names):
+        # Don't copy the existing subtitles, we may be running the
+        # postprocessor a second time
+        yield from ('-map', '-0:s')
+        for i, (lang, name) in enumerate(zip(sub_langs, sub_names)):
+            yield from ('-map', f'{first_input + i}:0')
+            lang_code = ISO639Utils.short2long(lang) or lang
+            yield from (f'-metadata:s:s:{i}', f'language={lang_code}')
+            if name:
+                yield from (f'-metadata:s:s:{i}', f'handler_name={name}',
+                            f'-metadata:s:s:{i}', f'title={name}')
+
+    @PostProcessor._restrict_to(images=False)
+    def run(self, info):
+        sub_langs, sub_names, sub_filenames = self._select_subtitles(info)
         if not sub_langs:
             return [], info
 
+        filename = info['filepath']
         input_files = [filename, *sub_filenames]
-
         opts = [
             *self.stream_copy_opts(ext=info['ext']),
-            # Don't copy the existing subtitles, we may be running the
-            # postprocessor a second time
-            '-map', '-0:s',
+            *self._subtitle_opts(1, sub_langs, sub_names),
         ]
-        for i, (lang, name) in enumerate(zip(sub_langs, sub_names)):
-            opts.extend(['-map', f'{i + 1}:0'])
-            lang_code = ISO639Utils.short2long(lang) or lang
-            opts.extend([f'-metadata:s:s:{i}', f'language={lang_code}'])
-            if name:
-                opts.extend([f'-metadata:s:s:{i}', f'handler_name={name}',
-                             f'-metadata:s:s:{i}', f'title={name}'])
 
         temp_filename = prepend_extension(filename, 'temp')
         self.to_screen(f'Embedding subtitles in "{filename}"')
@@ -665,6 +712,25 @@ def run(self, info):
         files_to_delete = [] if self._already_have_subtitle else sub_filenames
         return files_to_delete, info
 
+    @PostProcessor._restrict_to(images=False)
+    def fuse(self, info, ffmpeg_pass):
+        if ffmpeg_pass.subtitles or ffmpeg_pass.attachments:
+            # The numbers of the streams would change
+            return NotImplemented
+        sub_langs, sub_names, sub_filenames = self._select_subtitles(info)
+        if not sub_langs:
+            return [], info
+
+        self.to_screen(f'Embedding subtitles in "{ffmpeg_pass.filename}"')
+        first_input = len(ffmpeg_pass.inputs)
+        ffmpeg_pass.inputs.extend(sub_filenames)
+        ffmpeg_pass.maps.extend(self._subtitle_opts(first_input, sub_langs, sub_names))
+        ffmpeg_pass.add_subtitles(len(sub_filenames))
+        ffmpeg_pass.steps.append(self)
+
+        files_to_delete = [] if self._already_have_subtitle else sub_filenames
+        return files_to_delete, info
+
 
 class FFmpegMetadataPP(FFmpegPostProcessor):
 
@@ -681,14 +747,12 @@ def _options(target_ext):
         if audio_only:
             yield from ('-vn', '-acodec', 'copy')
 
-    @PostProcessor._restrict_to(images=False)
-    def run(self, info):
-        self._fixup_chapters(info)
+    def _get_options(self, info, metadata_input, stream_number):
         filename, metadata_filename = info['filepath'], None
         files_to_delete, options = [], []
         if self._add_chapters and info.get('chapters'):
             metadata_filename = replace_extension(filename, 'meta')
-            options.extend(self._get_chapter_opts(info['chapters'], metadata_filename))
+            options.extend(self._get_chapter_opts(info['chapters'], metadata_filename, metadata_input))
             files_to_delete.append(metadata_filename)
         if self._add_metadata:
             options.extend(self._get_metadata_opts(info))
@@ -696,12 +760,19 @@ def run(self, info):
         if self._add_infojson:
             if info['ext'] in ('mkv', 'mka'):
                 infojson_filename = info.get('infojson_filename')
-                options.extend(self._get_infojson_opts(info, infojson_filename))
+                options.extend(self._get_infojson_opts(info, infojson_filename, stream_number))
                 if not infojson_filename:
                     files_to_delete.append(info.get('infojson_filename'))
             elif self._add_infojson is True:
                 self.to_screen('The info-json can only be attached to mkv/mka files')
+        return options, metadata_filename, files_to_delete
 
+    @PostProcessor._restrict_to(images=False)
+    def run(self, info):
+        self._fixup_chapters(info)
+        filename = info['filepath']
+        options, metadata_filename, files_to_delete = self._get_options(
+            info, 1, functools.partial(self.get_stream_number, filename))
         if not options:
             self.to_screen('There isn\'t any metadata to add')
             return [], info
@@ -715,8 +786,35 @@ def run(self, info):
         os.replace(temp_filename, filename)
         return [], info
 
+    @PostProcessor._restrict_to(images=False)
+    def fuse(self, info, ffmpeg_pass):
+        last_chapter = traverse_obj(info, ('chapters', -1))
+        if ffmpeg_pass.steps and last_chapter and not last_chapter.get('end_time'):
+            # The duration has to be probed from the file
+            return NotImplemented
+        if self._add_infojson and info['ext'] in ('mkv', 'mka') and not ffmpeg_pass.can_number_streams:
+            return NotImplemented
+
+        self._fixup_chapters(info)
+        options, metadata_filename, files_to_delete = self._get_options(
+            info, len(ffmpeg_pass.inputs), functools.partial(ffmpeg_pass.attachment_number, self))
+        if not options:
+            self.to_screen('There isn\'t any metadata to add')
+            return [], info
+
+        self.to_screen(f'Adding metadata to "{ffmpeg_pass.filename}"')
+        if metadata_filename:
+            ffmpeg_pass.inputs.append(metadata_filename)
+        ffmpeg_pass.opts.extend(itertools.chain.from_iterable(options))
+        if info['ext'] == 'm4a':
+            ffmpeg_pass.opts.append('-vn')
+            ffmpeg_pass.remove_streams()
+        ffmpeg_pass.temp_files.extend(filter(None, files_to_delete))
+        ffmpeg_pass.steps.append(self)
+        return [], info
+
     @staticmethod
-    def _get_chapter_opts(chapters, metadata_filename):
+    def _get_chapter_opts(chapters, metadata_filename, metadata_input=1):
         with open(metadata_filename, 'w', encoding='utf-8') as f:
             def ffmpeg_escape(text):
                 return re.sub(r'([\\=;#\n])', r'\\\1', text)
@@ -730,7 +828,7 @@ def ffmpeg_escape(text):
                 if chapter_title:
                     metadata_file_content += f'title={ffmpeg_escape(chapter_title)}\n'
             f.write(metadata_file_content)
-        yield ('-map_metadata', '1')
+        yield ('-map_metadata', str(metadata_input))
 
     def _get_metadata_opts(self, info):
         meta_prefix = 'meta'
@@ -792,7 +890,7 @@ def add(meta_list, info_list=None):
                     yield (f'-metadata:s:{i}', f'{name}={value}')
             stream_idx += stream_count
 
-    def _get_infojson_opts(self, info, infofn):
+    def _get_infojson_opts(self, info, infofn, stream_number=None):
         if not infofn or not os.path.exists(infofn):
             if self._add_infojson is not True:
                 return
@@ -805,7 +903,9 @@ def _get_infojson_opts(self, info, infofn):
             write_json_file(self._downloader.sanitize_info(info, self.get_param('clean_infojson', True)), infofn)
             info['infojson_filename'] = infofn
 
-        old_stream, new_stream = self.get_stream_number(info['filepath'], ('tags', 'mimetype'), 'application/json')
+        if stream_number is None:
+            stream_number = functools.partial(self.get_stream_number, info['filepath'])
+        old_stream, new_stream = stream_number(('tags', 'mimetype'), 'application/json')
         if old_stream is not None:
             yield ('-map', f'-0:{old_stream}')
             new_stream -= 1
@@ -820,11 +920,8 @@ def _get_infojson_opts(self, info, infofn):
 class FFmpegMergerPP(FFmpegPostProcessor):
     SUPPORTED_EXTS = MEDIA_EXTENSIONS.common_video
 
-    @PostProcessor._restrict_to(images=False)
-    def run(self, info):
-        filename = info['filepath']
-        temp_filename = prepend_extension(filename, 'temp')
-        args = ['-c', 'copy']
+    def _merge_args(self, info):
+        args = []
         audio_streams = 0
         for (i, fmt) in enumerate(info['requested_formats']):
             if fmt.get('acodec') != 'none':
@@ -835,11 +932,27 @@ def run(self, info):
                 audio_streams += 1
             if fmt.get('vcodec') != 'none':
                 args.extend(['-map', f'{i}:v:0'])
+        return args
+
+    @PostProcessor._restrict_to(images=False)
+    def run(self, info):
+        filename = info['filepath']
+        temp_filename = prepend_extension(filename, 'temp')
+        args = ['-c', 'copy', *self._merge_args(info)]
         self.to_screen(f'Merging formats into "{filename}"')
         self.run_ffmpeg_multiple_files(info['__files_to_merge'], temp_filename, args)
         os.rename(temp_filename, filename)
         return info['__files_to_merge'], info
 
+    @PostProcessor._restrict_to(images=False)
+    def fuse(self, info, ffmpeg_pass):
+        if ffmpeg_pass.steps:
+            return NotImplemented
+        args = self._merge_args(info)
+        self.to_screen(f'Merging formats into "{info["filepath"]}"')
+        ffmpeg_pass.merge(self, info['__files_to_merge'], args, args.count('-map'))
+        return info['__files_to_merge'], info
+
     def can_merge(self):
         # TODO: figure out merge-capable ffmpeg version
         if self.basename != 'avconv':
@@ -865,6 +978,11 @@ def _fixup(self, msg, filename, options):
 
         os.replace(temp_filename, filename)
 
+    def _fuse_fixup(self, msg, ffmpeg_pass, options):
+        self.to_screen(f'{msg} of "{ffmpeg_pass.filename}"')
+        ffmpeg_pass.opts.extend(options)
+        ffmpeg_pass.steps.append(self)
+
 
 class FFmpegFixupStretchedPP(FFmpegFixupPostProcessor):
     @PostProcessor._restrict_to(images=False, audio=False)
@@ -875,6 +993,13 @@ def run(self, info):
                 *self.stream_copy_opts(), '-aspect', f'{stretched_ratio:f}'])
         return [], info
 
+    @PostProcessor._restrict_to(images=False, audio=False)
+    def fuse(self, info, ffmpeg_pass):
+        stretched_ratio = info.get('stretched_ratio')
+        if stretched_ratio not in (None, 1):
+            self._fuse_fixup('Fixing aspect ratio', ffmpeg_pass, ['-aspect', f'{stretched_ratio:f}'])
+        return [], info
+
 
 class FFmpegFixupM4aPP(FFmpegFixupPostProcessor):
     @PostProcessor._restrict_to(images=False, video=False)
@@ -883,6 +1008,12 @@ def run(self, info):
             self._fixup('Correcting container', info['filepath'], [*self.stream_copy_opts(), '-f', 'mp4'])
         return [], info
 
+    @PostProcessor._restrict_to(images=False, video=False)
+    def fuse(self, info, ffmpeg_pass):
+        if info.get('container') == 'm4a_dash':
+            self._fuse_fixup('Correcting container', ffmpeg_pass, ['-f', 'mp4'])
+        return [], info
+
 
 class FFmpegFixupM3u8PP(FFmpegFixupPostProcessor):
     def _needs_fixup(self, info):
@@ -896,14 +1027,26 @@ def _needs_fixup(self, info):
         else:
             yield traverse_obj(metadata, ('format', 'format_name'), casesense=False) == 'mpegts'
 
+    def _fixup_args(self, info):
+        args = ['-f', 'mp4']
+        if self.get_audio_codec(info['filepath']) == 'aac':
+            args.extend(['-bsf:a', 'aac_adtstoasc'])
+        return args
+
     @PostProcessor._restrict_to(images=False)
     def run(self, info):
         if all(self._needs_fixup(info)):
-            args = ['-f', 'mp4']
-            if self.get_audio_codec(info['filepath']) == 'aac':
-                args.extend(['-bsf:a', 'aac_adtstoasc'])
             self._fixup('Fixing MPEG-TS in MP4 container', info['filepath'], [
-                *self.stream_copy_opts(), *args])
+                *self.stream_copy_opts(), *self._fixup_args(info)])
+        return [], info
+
+    @PostProcessor._restrict_to(images=False)
+    def fuse(self, info, ffmpeg_pass):
+        if ffmpeg_pass.steps:
+            # The downloaded file has to be probed
+            return NotImplemented
+        if all(self._needs_fixup(info)):
+            self._fuse_fixup('Fixing MPEG-TS in MP4 container', ffmpeg_pass, self._fixup_args(info))
         return [], info
 
 
@@ -936,6 +1079,11 @@ def run(self, info):
         self._fixup(self.MESSAGE, info['filepath'], self.stream_copy_opts())
         return [], info
 
+    @PostProcessor._restrict_to(images=False)
+    def fuse(self, info, ffmpeg_pass):
+        self._fuse_fixup(self.MESSAGE, ffmpeg_pass, [])
+        return [], info
+
 
 class FFmpegFixupDurationPP(FFmpegCopyStreamPP):
     MESSAGE = 'Fixing video duration'
@@ -947,6 +1095,7 @@ class FFmpegFixupDuplicateMoovPP(FFmpegCopyStreamPP):
 
 class FFmpegSubtitlesConvertorPP(FFmpegPostProcessor):
     SUPPORTED_EXTS = MEDIA_EXTENSIONS.subtitles
+    _USES_MEDIA_FILE = False
 
     def __init__(self, downloader=None, format=None):
         super().__init__(downloader)
@@ -1071,6 +1220,7 @@ def run(self, info):
 class FFmpegThumbnailsConvertorPP(FFmpegPostProcessor):
     SUPPORTED_EXTS = MEDIA_EXTENSIONS.thumbnails
     FORMAT_RE = create_mapping_re(SUPPORTED_EXTS)
+    _USES_MEDIA_FILE = False
 
     def __init__(self, downloader=None, format=None):
         super().__init__(downloader)
@@ -1189,3 +1339,150 @@ def run(self, info):
             'ext': ie_copy['ext'],
         }]
         return files_to_delete, info
+
+
+class FFmpegPass:
+    """
+    A stream copy of a media file, with the changes of several postprocessors
+
+    The output has the streams of input 0 selected by `maps`, or those of the
+    formats that are merged into the file. Postprocessors add their inputs and
+    options, and add themselves to `steps` if they changed anything.
+    `stream_count` is the number of output streams, if it is known.
+    """
+
+    def __init__(self, filename, ext):
+        self.filename, self.ext = filename, ext
+        self.inputs = [filename]
+        self.maps = list(FFmpegPostProcessor.stream_copy_opts(False))
+        self.opts = []
+        self.merged = False
+        self.stream_count = None
+        # Whether streams were removed without knowing their number
+        self.streams_changed = False
+        self.subtitles = self.attachments = 0
+        self.steps = []
+        self.files_to_delete, self.temp_files = [], []
+        self._streams, self._removed = None, set()
+
+    def merge(self, pp, files, maps, stream_count):
+        assert not self.steps, 'Formats can only be merged into a new pass'
+        self.inputs, self.maps = list(files), list(maps)
+        self.merged, self.stream_count = True, stream_count
+        self.steps.append(pp)
+
+    @property
+    def can_number_streams(self):
+        return self.stream_count is not None or not self.streams_changed
+
+    def remove_streams(self):
+        """Record that an unknown number of the streams of input 0 were removed"""
+        self.stream_count, self.streams_changed = None, True
+
+    def add_subtitles(self, count):
+        # The subtitles replace those of input 0
+        if not self.merged:
+            self.remove_streams()
+        elif self.stream_count is not None:
+            self.stream_count += count
+        self.subtitles += count
+
+    def attachment_number(self, pp, keys, value):
+        """
+        Number an attachment that is added to the output
+
+        Returns the same as FFmpegPostProcessor.get_stream_number would for
+        the output before the attachment is added. The stream of input 0 with
+        `value` at `keys` is assumed to be replaced by the attachment
+        """
+        assert self.can_number_streams
+        if self.stream_count is None:
+            self._streams = pp.get_metadata_object(self.filename)['streams']
+            self.stream_count = len(self._streams)
+        old_stream = next((
+            i for i, stream in enumerate(self._streams or [])
+            if i not in self._removed and traverse_obj(stream, keys, casesense=False) == value), None)
+        stream_count = self.stream_count
+        if old_stream is not None:
+            self._removed.add(old_stream)
+            self.stream_count -= 1
+        self.stream_count += 1
+        self.attachments += 1
+        return old_stream, stream_count
+
+    def output_opts(self):
+        yield from self.maps
+        yield from ('-c', 'copy')
+        if self.subtitles and self.ext in ('mp4', 'mov', 'm4a'):
+            yield from ('-c:s', 'mov_text')
+        yield from self.opts
+
+
+class FFmpegFusedPP(FFmpegPostProcessor):
+    """
+    Run the stream copies of consecutive postprocessors as a single ffmpeg pass
+
+    Postprocessors are added to the pending pass with add(), and run() writes
+    out the changes of all of them. If that fails, they are run one by one
+    """
+
+    def __init__(self, downloader=None):
+        super().__init__(downloader)
+        self._pass = None
+
+    @property
+    def pending(self):
+        return bool(self._pass and self._pass.steps)
+
+    def _has_own_args(self, pp):
+        args = self.get_param('postprocessor_args') or {}
+        return isinstance(args, dict) and any(
+            key.split('+')[0] == pp.pp_key().lower() for key in args)
+
+    def add(self, pp, info):
+        """
+        Add the changes of pp to the pending pass
+
+        Returns the same as pp.run(), except that the files of changes that
+        are pending are only returned once the pass has been run.
+        NotImplemented is returned if pp has to be run by itself
+        """
+        if not self.available or self._has_own_args(pp):
+            return NotImplemented
+        if not self.pending:
+            self._pass = FFmpegPass(info['filepath'], info['ext'])
+        elif (self._pass.filename, self._pass.ext) != (info.get('filepath'), info.get('ext')):
+            return NotImplemented
+
+        steps = len(self._pass.steps)
+        ret = pp.fuse(info, self._pass)
+        if ret is NotImplemented or len(self._pass.steps) == steps:
+            return ret
+        files_to_delete, info = ret
+        self._pass.files_to_delete.extend(files_to_delete)
+        return [], info
+
+    def run(self, info):
+        ffmpeg_pass, self._pass = self._pass, None
+        if not ffmpeg_pass or not ffmpeg_pass.steps:
+            return [], info
+        filename = ffmpeg_pass.filename
+        temp_filename = prepend_extension(filename, 'temp')
+        if len(ffmpeg_pass.steps) > 1:
+            self.to_screen(f'Writing the changes of {len(ffmpeg_pass.steps)} postprocessors '
+                           f'to "{filename}" in a single pass')
+        try:
+            self.run_ffmpeg_multiple_files(ffmpeg_pass.inputs, temp_filename, list(ffmpeg_pass.output_opts()))
+        except FFmpegPostProcessorError as e:
+            if len(ffmpeg_pass.steps) == 1:
+                raise
+            self.report_warning(f'Unable to write the changes in a single pass: {e.msg}. Running the postprocessors separately')
+            if os.path.exists(temp_filename):
+                self._delete_downloaded_files(temp_filename)
+            for pp in ffmpeg_pass.steps:
+                info = self._downloader.run_pp(pp, info)
+            self._delete_downloaded_files(*filter(os.path.exists, ffmpeg_pass.temp_files), info=info)
+            return [], info
+        os.replace(temp_filename, filename)
+        self._delete_downloaded_files(*ffmpeg_pass.temp_files, info=info)
+        return ffmpeg_pass.files_to_delete, info
@@ -5,6 +5,8 @@
 
 
 class MetadataParserPP(PostProcessor):
+    _USES_MEDIA_FILE = False
+
     def __init__(self, downloader, actions):
         super().__init__(downloader)
         self._actions = []
@@ -29,6 +29,7 @@ class SponsorBlockPP(FFmpegPostProcessor):
         'music_offtopic': 'Non-Music Section',
         **NON_SKIPPABLE_CATEGORIES,
     }
+    _USES_MEDIA_FILE = False
 
     def __init__(self, downloader, categories=None, api='https://sponsor.ajay.app'):
         FFmpegPostProcessor.__init__(self, downloader)
@@ -3210,86 +3210,126 @@ def filter_using_list(row, filter_array):
     return '\n'.join(''.join(row).rstrip() for row in table)
 
 
-def _match_one(filter_part, dct, incomplete):
-    # TODO: Generalize code with YoutubeDL._build_format_filter
-    STRING_OPERATORS = {
-        '*=': operator.contains,
-        '^=': lambda attr, value: attr.startswith(value),
-        '$=': lambda attr, value: attr.endswith(value),
-        '~=': lambda attr, value: re.search(value, attr),
-    }
-    COMPARISON_OPERATORS = {
-        **STRING_OPERATORS,
-        '<=': operator.le,  # "<=" must be defined above "<"
-        '<': operator.lt,
-        '>=': operator.ge,
-        '>': operator.gt,
-        '=': operator.eq,
-    }
-
-    if isinstance(incomplete, bool):
-        is_incomplete = lambda _: incomplete
-    else:
-        is_incomplete = lambda k: k in incomplete
+_STRING_FILTER_OPERATORS = {
+    '*=': operator.contains,
+    '^=': lambda attr, value: attr.startswith(value),
+    '$=': lambda attr, value: attr.endswith(value),
+    # The value is compiled together with the filter
+    '~=': lambda attr, value: value.search(attr),
+}
+_NUMERIC_FILTER_OPERATORS = {
+    '<=': operator.le,  # "<=" must be defined above "<"
+    '<': operator.lt,
+    '>=': operator.ge,
+    '>': operator.gt,
+    '=': operator.eq,
+}
 
-    operator_rex = re.compile(r'''(?x)
-        (?P<key>[a-z_]+)
-        \s*(?P<negation>!\s*)?(?P<op>{})(?P<none_inclusive>\s*\?)?\s*
-        (?:
-            (?P<quote>["\'])(?P<quotedstrval>.+?)(?P=quote)|
-            (?P<strval>.+?)
-        )
-        '''.format('|'.join(map(re.escape, COMPARISON_OPERATORS.keys()))))
-    m = operator_rex.fullmatch(filter_part.strip())
+_MATCH_OPERATORS = {**_STRING_FILTER_OPERATORS, **_NUMERIC_FILTER_OPERATORS}
+_MATCH_OPERATOR_RE = re.compile(r'''(?x)
+    (?P<key>[a-z_]+)
+    \s*(?P<negation>!\s*)?(?P<op>{})(?P<none_inclusive>\s*\?)?\s*
+    (?:
+        (?P<quote>["\'])(?P<quotedstrval>.+?)(?P=quote)|
+        (?P<strval>.+?)
+    )
+    '''.format('|'.join(map(re.escape, _MATCH_OPERATORS))))
+_MATCH_UNARY_OPERATORS = {
+    '': lambda v: (v is True) if isinstance(v, bool) else (v is not None),
+    '!': lambda v: (v is False) if isinstance(v, bool) else (v is None),
+}
+_MATCH_UNARY_RE = re.compile(r'''(?x)
+    (?P<op>{})\s*(?P<key>[a-z_]+)
+    '''.format('|'.join(map(re.escape, _MATCH_UNARY_OPERATORS))))
+
+
+def _filter_operator(op, value, negation=False):
+    """The function of a comparison operator, and the value to compare with"""
+    func = _STRING_FILTER_OPERATORS.get(op) or _NUMERIC_FILTER_OPERATORS[op]
+    if op == '~=':
+        value = re.compile(value)
+    if negation:
+        return (lambda attr, value: not func(attr, value)), value
+    return func, value
+
+
+def _parse_filter_number(value):
+    # If the original field is a string and matching comparisonvalue is
+    # a number we should respect the origin of the original field
+    # and process comparison value as a string (see
+    # https://github.com/ytdl-org/youtube-dl/issues/11082)
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    number = parse_filesize(value)
+    if number is None:
+        number = parse_filesize(f'{value}B')
+    if number is None:
+        number = parse_duration(value)
+    return number
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_match_one(filter_part):
+    """Compile a filter part of match_str into a function of (dct, is_incomplete)"""
+    m = _MATCH_OPERATOR_RE.fullmatch(filter_part.strip())
     if m:
-        m = m.groupdict()
-        unnegated_op = COMPARISON_OPERATORS[m['op']]
-        if m['negation']:
-            op = lambda attr, value: not unnegated_op(attr, value)
-        else:
-            op = unnegated_op
+        key, op_name, none_inclusive = m['key'], m['op'], m['none_inclusive']
         comparison_value = m['quotedstrval'] or m['strval']
         if m['quote']:
             comparison_value = comparison_value.replace(r'\{}'.format(m['quote']), m['quote'])
-        actual_value = dct.get(m['key'])
-        numeric_comparison = None
-        if isinstance(actual_value, (int, float)):
-            # If the original field is a string and matching comparisonvalue is
-            # a number we should respect the origin of the original field
-            # and process comparison value as a string (see
-            # https://github.com/ytdl-org/youtube-dl/issues/11082)
-            try:
-                numeric_comparison = int(comparison_value)
-            except ValueError:
-                numeric_comparison = parse_filesize(comparison_value)
-                if numeric_comparison is None:
-                    numeric_comparison = parse_filesize(f'{comparison_value}B')
-                if numeric_comparison is None:
-                    numeric_comparison = parse_duration(comparison_value)
-        if numeric_comparison is not None and m['op'] in STRING_OPERATORS:
-            raise ValueError('Operator {} only supports string values!'.format(m['op']))
-        if actual_value is None:
-            return is_incomplete(m['key']) or m['none_inclusive']
-        return op(actual_value, comparison_value if numeric_comparison is None else numeric_comparison)
-
-    UNARY_OPERATORS = {
-        '': lambda v: (v is True) if isinstance(v, bool) else (v is not None),
-        '!': lambda v: (v is False) if isinstance(v, bool) else (v is None),
-    }
-    operator_rex = re.compile(r'''(?x)
-        (?P<op>{})\s*(?P<key>[a-z_]+)
-        '''.format('|'.join(map(re.escape, UNARY_OPERATORS.keys()))))
-    m = operator_rex.fullmatch(filter_part.strip())
+        numeric_value = _parse_filter_number(comparison_value)
+        if op_name in _STRING_FILTER_OPERATORS:
+            numeric_op = None
+            op, comparison_value = _filter_operator(op_name, comparison_value, m['negation'])
+        else:
+            op, _ = _filter_operator(op_name, None, m['negation'])
+            numeric_op = op
+
+        def match_comparison(dct, is_incomplete):
+            actual_value = dct.get(key)
+            if numeric_value is not None and isinstance(actual_value, (int, float)):
+                if numeric_op is None:
+                    raise ValueError(f'Operator {op_name} only supports string values!')
+                return numeric_op(actual_value, numeric_value)
+            if actual_value is None:
+                return is_incomplete(key) or none_inclusive
+            return op(actual_value, comparison_value)
+        return match_comparison
+
+    m = _MATCH_UNARY_RE.fullmatch(filter_part.strip())
     if m:
-        op = UNARY_OPERATORS[m.group('op')]
-        actual_value = dct.get(m.group('key'))
-        if is_incomplete(m.group('key')) and actual_value is None:
-            return True
-        return op(actual_value)
+        key, op = m['key'], _MATCH_UNARY_OPERATORS[m['op']]
+
+        def match_unary(dct, is_incomplete):
+            actual_value = dct.get(key)
+            if is_incomplete(key) and actual_value is None:
+                return True
+            return op(actual_value)
+        return match_unary
 
     raise ValueError(f'Invalid filter part {filter_part!r}')
 
 
+def _incomplete_func(incomplete):
+    if isinstance(incomplete, bool):
+        return lambda _: incomplete
+    return lambda k: k in incomplete
+
+
+def _match_one(filter_part, dct, incomplete):
+    return _compile_match_one(filter_part)(dct, _incomplete_func(incomplete))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_match_str(filter_str):
+    """The compiled filter parts of a filter of match_str"""
+    return tuple(
+        _compile_match_one(filter_part.replace(r'\&', '&'))
+        for filter_part in re.split(r'(?<!\\)&', filter_str))
+
+
 def match_str(filter_str, dct, incomplete=False):
     """ Filter a dictionary with a simple string syntax.
     @returns           Whether the filter passes
@@ -3297,9 +3337,58 @@ def match_str(filter_str, dct, incomplete=False):
                        Can be True/False to indicate all/none of the keys may be missing.
                        All conditions on incomplete keys pass if the key is missing
     """
-    return all(
-        _match_one(filter_part.replace(r'\&', '&'), dct, incomplete)
-        for filter_part in re.split(r'(?<!\\)&', filter_str))
+    is_incomplete = _incomplete_func(incomplete)
+    return all(match(dct, is_incomplete) for match in _compile_match_str(filter_str))
+
+
+_FORMAT_NUMERIC_OPERATORS = {**_NUMERIC_FILTER_OPERATORS, '!=': operator.ne}
+_FORMAT_NUMERIC_RE = re.compile(r'''(?x)\s*
+    (?P<key>[\w.-]+)\s*
+    (?P<op>{})(?P<none_inclusive>\s*\?)?\s*
+    (?P<value>[0-9.]+(?:[kKmMgGtTpPeEzZyY]i?[Bb]?)?)\s*
+    '''.format('|'.join(map(re.escape, _FORMAT_NUMERIC_OPERATORS))))
+_FORMAT_STRING_OPERATORS = {'=': operator.eq, **_STRING_FILTER_OPERATORS}
+_FORMAT_STRING_RE = re.compile(r'''(?x)\s*
+    (?P<key>[a-zA-Z0-9._-]+)\s*
+    (?P<negation>!\s*)?(?P<op>{})\s*(?P<none_inclusive>\?\s*)?
+    (?P<quote>["'])?
+    (?P<value>(?(quote)(?:(?!(?P=quote))[^\\]|\\.)+|[\w.-]+))
+    (?(quote)(?P=quote))\s*
+    '''.format('|'.join(map(re.escape, _FORMAT_STRING_OPERATORS))))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_format_filter(filter_spec):
+    """Compile a filter of a format selector into a function of the format"""
+    m = _FORMAT_NUMERIC_RE.fullmatch(filter_spec)
+    if m:
+        try:
+            comparison_value = float(m['value'])
+        except ValueError:
+            comparison_value = parse_filesize(m['value'])
+            if comparison_value is None:
+                comparison_value = parse_filesize(m['value'] + 'B')
+            if comparison_value is None:
+                raise ValueError(
+                    'Invalid value {!r} in format specification {!r}'.format(m['value'], filter_spec))
+        op = _FORMAT_NUMERIC_OPERATORS[m['op']]
+    else:
+        m = _FORMAT_STRING_RE.fullmatch(filter_spec)
+        if not m:
+            raise SyntaxError(f'Invalid filter specification {filter_spec!r}')
+        comparison_value = m['value']
+        if m['op'] != '~=':
+            comparison_value = re.sub(r'''\\([\\"'])''', r'\1', comparison_value)
+        op, comparison_value = _filter_operator(m['op'], comparison_value, m['negation'])
+
+    key, none_inclusive = m['key'], m['none_inclusive']
+
+    def format_filter(f):
+        actual_value = f.get(key)
+        if actual_value is None:
+            return none_inclusive
+        return op(actual_value, comparison_value)
+    return format_filter
 
 
 def match_filter_func(filters, breaking_filters=None):
@@ -0,0 +1,287 @@
+import functools
+import json
+import re
+import string
+import unicodedata
+
+from ._utils import (
+    NUMBER_RE,
+    STR_FORMAT_RE_TMPL,
+    STR_FORMAT_TYPES,
+    LazyList,
+    escapeHTML,
+    float_or_none,
+    format_decimal_suffix,
+    int_or_none,
+    shell_quote,
+    strftime_or_none,
+    variadic,
+)
+from .traversal import traverse_obj
+
+EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
+MATH_FUNCTIONS = {
+    '+': float.__add__,
+    '-': float.__sub__,
+    '*': float.__mul__,
+}
+# Field is of the form key1.key2...
+# where keys (except first) can be string, int, slice or "{field, ...}"
+FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
+FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
+    'inner': FIELD_INNER_RE,
+    'field': rf'\w*(?:\.{FIELD_INNER_RE})*',
+}
+MATH_FIELD_RE = rf'(?:{FIELD_RE}|-?{NUMBER_RE})'
+MATH_OPERATORS_RE = r'(?:{})'.format('|'.join(map(re.escape, MATH_FUNCTIONS.keys())))
+INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
+    (?P<negate>-)?
+    (?P<fields>{FIELD_RE})
+    (?P<maths>(?:{MATH_OPERATORS_RE}{MATH_FIELD_RE})*)
+    (?:>(?P<strf_format>.+?))?
+    (?P<remaining>
+        (?P<alternate>(?<!\\),[^|&)]+)?
+        (?:&(?P<replacement>.*?))?
+        (?:\|(?P<default>.*?))?
+    )$''')
+
+
+def _from_user_input(field):
+    if field == ':':
+        return ...
+    elif ':' in field:
+        return slice(*map(int_or_none, field.split(':')))
+    elif int_or_none(field) is not None:
+        return int(field)
+    return field
+
+
+def _parse_fields(fields):
+    """The path for traverse_obj of a field like key1.key2.{key3,key4}"""
+    fields = [f for x in re.split(r'\.({.+?})\.?', fields)
+              for f in ([x] if x.startswith('{') else x.split('.'))]
+    for i in (0, -1):
+        if fields and not fields[i]:
+            fields.pop(i)
+
+    for i, f in enumerate(fields):
+        if not f.startswith('{'):
+            fields[i] = _from_user_input(f)
+            continue
+        assert f.endswith('}'), f'No closing brace for {f} in {fields}'
+        fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
+    return fields
+
+
+def _parse_maths(maths):
+    """The operations of a field, as (function, sign, number, path) with either a number or a path"""
+    operations, operator = [], None
+    while maths:
+        item = re.match(MATH_FIELD_RE if operator else MATH_OPERATORS_RE, maths).group(0)
+        maths = maths[len(item):]
+        if operator is None:
+            operator = MATH_FUNCTIONS[item]
+            continue
+        item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
+        offset = float_or_none(item)
+        operations.append((operator, multiplier, offset, None if offset is not None else _parse_fields(item)))
+        operator = None
+    return tuple(operations)
+
+
+class _ReplacementFormatter(string.Formatter):
+    def get_field(self, field_name, args, kwargs):
+        if field_name.isdigit():
+            return args[0], -1
+        raise ValueError('Unsupported field')
+
+
+_replacement_formatter = _ReplacementFormatter()
+
+
+def _dumpjson_default(obj):
+    if isinstance(obj, (set, LazyList)):
+        return list(obj)
+    return repr(obj)
+
+
+class _Alternative:
+    """One of the fields of a template key, like "title" in "%(track,title)s" """
+    __slots__ = ('alternate', 'default', 'fields', 'maths', 'negate', 'path', 'replacement', 'strf_format')
+
+    def __init__(self, mobj):
+        self.negate = bool(mobj['negate'])
+        self.fields = mobj['fields']
+        self.path = _parse_fields(mobj['fields'])
+        self.maths = _parse_maths(mobj['maths'])
+        self.strf_format = mobj['strf_format'] and mobj['strf_format'].replace('\\,', ',')
+        self.alternate = bool(mobj['alternate'])
+        self.replacement, self.default = mobj['replacement'], mobj['default']
+
+    def get_value(self, info_dict, sanitize):
+        # Object traversal
+        value = traverse_obj(info_dict, self.path, traverse_string=True)
+        # Negative
+        if self.negate:
+            value = float_or_none(value)
+            if value is not None:
+                value *= -1
+        # Do maths
+        if self.maths:
+            value = float_or_none(value)
+            for operator, multiplier, offset, path in self.maths:
+                if path is not None:
+                    offset = float_or_none(traverse_obj(info_dict, path, traverse_string=True))
+                try:
+                    value = operator(value, multiplier * offset)
+                except (TypeError, ZeroDivisionError):
+                    return None
+        # Datetime formatting
+        if self.strf_format:
+            value = strftime_or_none(value, self.strf_format)
+
+        # XXX: Workaround for https://github.com/yt-dlp/yt-dlp/issues/4485
+        if sanitize and value == '':
+            value = None
+        return value
+
+
+class _Field:
+    """A "%(key)s" of the template"""
+    __slots__ = ('alternatives', 'flags', 'format', 'key', 'prefix', 'str_format')
+
+    def __init__(self, mobj):
+        self.prefix, self.format = mobj.group('prefix'), mobj.group('format')
+        self.flags = mobj.group('conversion') or ''
+        self.str_format = f'{self.format[:-1]}s'
+        key = mobj.group('key')
+        self.key = '{}\0{}'.format(key.replace('%', '%\0'), self.format)
+        self.alternatives = []
+        alternative = INTERNAL_FORMAT_RE.match(key)
+        while alternative:
+            self.alternatives.append(_Alternative(alternative))
+            if not alternative['alternate']:
+                break
+            alternative = INTERNAL_FORMAT_RE.match(alternative['remaining'][1:])
+
+    def evaluate(self, info_dict, na, sanitize, filename_sanitizer, field_sizes):
+        value, replacement, default, last_field = None, None, na, ''
+        for alternative in self.alternatives:
+            default = alternative.default if alternative.default is not None else default
+            value = alternative.get_value(info_dict, sanitize)
+            last_field, replacement = alternative.fields, alternative.replacement
+            if value is not None or not alternative.alternate:
+                break
+
+        if None not in (value, replacement):
+            try:
+                value = _replacement_formatter.format(replacement, value)
+            except ValueError:
+                value, default = None, na
+
+        fmt, flags, str_fmt = self.format, self.flags, self.str_format
+        if fmt == 's' and isinstance(value, int):
+            field_size = field_sizes(last_field)
+            if field_size:
+                fmt = f'0{field_size:d}d'
+
+        if value is None:
+            value, fmt = default, 's'
+        elif fmt[-1] == 'l':  # list
+            delim = '\n' if '#' in flags else ', '
+            value, fmt = delim.join(map(str, variadic(value, allowed_types=(str, bytes)))), str_fmt
+        elif fmt[-1] == 'j':  # json
+            value, fmt = json.dumps(
+                value, default=_dumpjson_default,
+                indent=4 if '#' in flags else None, ensure_ascii='+' not in flags), str_fmt
+        elif fmt[-1] == 'h':  # html
+            value, fmt = escapeHTML(str(value)), str_fmt
+        elif fmt[-1] == 'q':  # quoted
+            value = map(str, variadic(value) if '#' in flags else [value])
+            value, fmt = shell_quote(value, shell=True), str_fmt
+        elif fmt[-1] == 'B':  # bytes
+            value = f'%{str_fmt}'.encode() % str(value).encode()
+            value, fmt = value.decode('utf-8', 'ignore'), 's'
+        elif fmt[-1] == 'U':  # unicode normalized
+            value, fmt = unicodedata.normalize(
+                # "+" = compatibility equivalence, "#" = NFD
+                'NF{}{}'.format('K' if '+' in flags else '', 'D' if '#' in flags else 'C'),
+                value), str_fmt
+        elif fmt[-1] == 'D':  # decimal suffix
+            num_fmt, fmt = fmt[:-1].replace('#', ''), 's'
+            value = format_decimal_suffix(value, f'%{num_fmt}f%s' if num_fmt else '%d%s',
+                                          factor=1024 if '#' in flags else 1000)
+        elif fmt[-1] == 'S':  # filename sanitization
+            value, fmt = filename_sanitizer(last_field, value, restricted='#' in flags), str_fmt
+        elif fmt[-1] == 'c':
+            if value:
+                value = str(value)[0]
+            else:
+                fmt = str_fmt
+        elif fmt[-1] not in 'rsa':  # numeric
+            value = float_or_none(value)
+            if value is None:
+                value, fmt = default, 's'
+
+        if sanitize:
+            # If value is an object, sanitize might convert it to a string
+            # So we manually convert it before sanitizing
+            if fmt[-1] == 'r':
+                value, fmt = repr(value), str_fmt
+            elif fmt[-1] == 'a':
+                value, fmt = ascii(value), str_fmt
+            if fmt[-1] in 'csra':
+                value = sanitize(last_field, value)
+        return value, fmt
+
+
+class OutputTemplate:
+    """An output template, parsed once for all the dicts it is evaluated with
+
+    Use OutputTemplate.compile() to get the cached instance for a template
+    """
+
+    def __init__(self, outtmpl):
+        self._parts = []
+        end = 0
+        for mobj in EXTERNAL_FORMAT_RE.finditer(outtmpl):
+            if mobj.group('has_key'):
+                self._parts.extend((outtmpl[end:mobj.start()], _Field(mobj)))
+                end = mobj.end()
+        self._parts.append(outtmpl[end:])
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def compile(cls, outtmpl):
+        return cls(outtmpl)
+
+    def substitute(self, info_dict, *, na='NA', sanitize=None, filename_sanitizer=None, field_sizes=lambda _: None):
+        """
+        Evaluate the fields of the template
+        @returns  The template with the keys replaced, and the dict to substitute it with
+        @param sanitize            A function of (field, value) that is applied to string values
+        @param filename_sanitizer  A function of (field, value, restricted) used by the "S" conversion
+        @param field_sizes         A function that returns the width of an integer field, or None
+        """
+        parts, tmpl_dict = [], {}
+        for part in self._parts:
+            if isinstance(part, str):
+                parts.append(part)
+                continue
+            value, fmt = part.evaluate(info_dict, na, sanitize, filename_sanitizer, field_sizes)
+            tmpl_dict[part.key] = value
+            parts.append(f'{part.prefix}%({part.key}){fmt}')
+        return ''.join(parts), tmpl_dict
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def escape(outtmpl):
+        """ Escape any remaining strings like %s, %abc% etc. """
+        return re.sub(
+            STR_FORMAT_RE_TMPL.format('', '(?![%(\0])'),
+            lambda mobj: ('' if mobj.group('has_key') else '%') + mobj.group(0),
+            outtmpl)
+
+    def evaluate(self, info_dict, **kwargs):
+        outtmpl, tmpl_dict = self.substitute(info_dict, **kwargs)
+        return self.escape(outtmpl) % tmpl_dict